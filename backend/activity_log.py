@@ -0,0 +1,169 @@
+"""Buffered, append-only admin activity log.
+
+log() only puts the entry on a queue; a background thread appends batches
+as JSON lines to rotating segment files:
+
+    admin_activity/segment-000001.jsonl, segment-000002.jsonl, ...
+
+A segment is closed once it reaches segment_bytes and only the newest
+max_segments are kept. The last tail_size entries stay in memory for the
+admin "recent activity" view.
+
+'api_access' entries arrive on every admin request, so they are not written
+one by one: they are counted per (user, endpoint, method) and written as a
+single 'api_access_summary' per aggregate_seconds. One in sample_every raw
+entries is still written verbatim so individual requests remain traceable.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+HIGH_FREQUENCY_ACTIONS = ('api_access',)
+
+
+class ActivityLog:
+    def __init__(self, directory: str, segment_bytes: int = 1 << 20, max_segments: int = 20, tail_size: int = 500,
+                 aggregate_seconds: float = 10.0, sample_every: int = 100, batch_size: int = 256):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.aggregate_seconds = aggregate_seconds
+        self.sample_every = sample_every
+        self.batch_size = batch_size
+        self.tail = deque(maxlen=tail_size)
+        self.stats = {'logged': 0, 'written': 0, 'aggregated': 0, 'segments_rotated': 0}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._counts = {}      # (user_id, endpoint, method) -> count since last summary
+        self._seen = 0
+        self._window_start = time.time()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls, directory):
+        return cls(
+            directory,
+            segment_bytes=int(os.getenv('ACTIVITY_SEGMENT_BYTES') or (1 << 20)),
+            max_segments=int(os.getenv('ACTIVITY_MAX_SEGMENTS') or 20),
+            tail_size=int(os.getenv('ACTIVITY_TAIL_SIZE') or 500),
+            aggregate_seconds=float(os.getenv('ACTIVITY_AGGREGATE_SECONDS') or 10),
+            sample_every=int(os.getenv('ACTIVITY_SAMPLE_EVERY') or 100),
+        )
+
+    def _ensure_writer(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True, name='activity-log')
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def log(self, entry: dict):
+        """Record an activity entry without touching the disk on the caller's thread."""
+        self.tail.append(entry)
+        with self._lock:
+            self.stats['logged'] += 1
+            if entry.get('action') in HIGH_FREQUENCY_ACTIONS:
+                details = entry.get('details') or {}
+                key = (entry.get('user_id'), details.get('endpoint'), details.get('method'))
+                self._counts[key] = self._counts.get(key, 0) + 1
+                self._seen += 1
+                self.stats['aggregated'] += 1
+                if not (self.sample_every > 0 and (self._seen - 1) % self.sample_every == 0):
+                    return
+                entry = dict(entry, sampled=True)
+        self._ensure_writer()
+        self._queue.put(entry)
+
+    def recent(self, limit: int = 100):
+        """Newest-first entries from the in-memory tail."""
+        items = list(self.tail)
+        return items[::-1][:limit]
+
+    def flush(self, timeout: float = 5.0):
+        """Write pending summaries and wait until the queue is on disk."""
+        self._emit_summaries(force=True)
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _emit_summaries(self, force=False):
+        now = time.time()
+        with self._lock:
+            if not self._counts or (not force and now - self._window_start < self.aggregate_seconds):
+                return
+            counts, self._counts = self._counts, {}
+            start, self._window_start = self._window_start, now
+        since = datetime.utcfromtimestamp(start).isoformat() + 'Z'
+        until = datetime.utcfromtimestamp(now).isoformat() + 'Z'
+        self._ensure_writer()
+        for (user_id, endpoint, method), count in counts.items():
+            self._queue.put({'user_id': user_id, 'action': 'api_access_summary', 'timestamp': until,
+                             'details': {'endpoint': endpoint, 'method': method, 'count': count, 'since': since}})
+
+    # --- writer thread -------------------------------------------------------
+    def _segments(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(n for n in names if n.startswith('segment-') and n.endswith('.jsonl'))
+
+    def _current_segment(self):
+        segments = self._segments()
+        if segments:
+            path = os.path.join(self.directory, segments[-1])
+            if os.path.getsize(path) < self.segment_bytes:
+                return path
+            number = int(segments[-1][len('segment-'):-len('.jsonl')]) + 1
+            self.stats['segments_rotated'] += 1
+        else:
+            number = 1
+        for old in segments[:max(0, len(segments) + 1 - self.max_segments)]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except Exception:
+                pass
+        return os.path.join(self.directory, f'segment-{number:06d}.jsonl')
+
+    def _write(self, batch):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._current_segment(), 'a') as f:
+            for entry in batch:
+                f.write(json.dumps(entry, default=str) + '\n')
+        self.stats['written'] += len(batch)
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.aggregate_seconds)
+            except queue.Empty:
+                self._emit_summaries()
+                continue
+            batch, waiters = [], []
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    pass
+            for w in waiters:
+                w.set()
+            self._emit_summaries()
@@ -0,0 +1,162 @@
+"""Incrementally maintained passenger/flight counters for dashboards and reports.
+
+Every passenger record contributes a small tuple to the counters of its
+flight and to the global totals: (bookings, checked_in, bags, fees,
+paid_fees). The aggregator remembers the last contribution it saw for each
+record, so update(p) after a mutation is O(1): subtract the old
+contribution, add the new one.
+
+Bulk changes (clearing, filtering the list) call invalidate() instead and
+the next read rebuilds from the store. Reads also rebuild when the record
+count no longer matches or reconcile_seconds have passed, which catches any
+mutation that slipped past update(). reconcile() reports how far the
+counters had drifted.
+
+Boarded counts and flight status counts come from the boarding state and
+flights files, which are small and rewritten whole; set_boarding() and
+set_flights() recount them. The app calls them when it saves those files
+and again before a read if a file's version changed on disk, so edits made
+by other processes are counted as well.
+"""
+import threading
+import time
+
+FIELDS = ('bookings', 'checked_in', 'bags', 'fees', 'paid_fees')
+
+
+def _num(value, cast):
+    try:
+        return cast(value or 0)
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+def contribution(p):
+    """(flight, counters) a passenger record adds to the aggregates."""
+    fee = _num(p.get('baggage_fee'), float)
+    return p.get('flight'), (
+        1,
+        1 if p.get('checked_in') else 0,
+        _num(p.get('baggage_count'), int),
+        fee,
+        fee if p.get('baggage_paid') else 0.0,
+    )
+
+
+def _add(target, values, sign):
+    for i, v in enumerate(values):
+        target[i] += sign * v
+
+
+class PassengerAggregates:
+    def __init__(self, reconcile_seconds: float = 300.0):
+        self.reconcile_seconds = reconcile_seconds
+        self._lock = threading.RLock()
+        self._seen = {}        # id(record) -> (record, flight, counters)
+        self._flights = {}     # flight -> [bookings, checked_in, bags, fees, paid_fees]
+        self._totals = [0, 0, 0, 0.0, 0.0]
+        self._boarded = {}     # flight -> count
+        self._flight_status = {}
+        self._flight_count = 0
+        self._dirty = True
+        self._reconciled_at = 0.0
+        self.stats = {'updates': 0, 'reconciles': 0, 'last_drift': None}
+
+    # --- passenger records ---------------------------------------------------
+    def _apply(self, flight, counters, sign):
+        _add(self._totals, counters, sign)
+        row = self._flights.get(flight)
+        if row is None:
+            row = self._flights[flight] = [0, 0, 0, 0.0, 0.0]
+        _add(row, counters, sign)
+        if sign < 0 and row[0] <= 0:
+            self._flights.pop(flight, None)
+
+    def update(self, *records):
+        """Account for added or modified records in O(1) each."""
+        with self._lock:
+            if self._dirty:
+                return
+            for p in records:
+                flight, counters = contribution(p)
+                prev = self._seen.get(id(p))
+                if prev is not None:
+                    self._apply(prev[1], prev[2], -1)
+                self._apply(flight, counters, 1)
+                self._seen[id(p)] = (p, flight, counters)
+                self.stats['updates'] += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._dirty = True
+
+    def reconcile(self, passengers):
+        """Rebuild the passenger counters from the store. Returns the drift found."""
+        seen, flights, totals = {}, {}, [0, 0, 0, 0.0, 0.0]
+        for p in list(passengers):
+            flight, counters = contribution(p)
+            seen[id(p)] = (p, flight, counters)
+            _add(totals, counters, 1)
+            _add(flights.setdefault(flight, [0, 0, 0, 0.0, 0.0]), counters, 1)
+        with self._lock:
+            drift = None
+            if not self._dirty:
+                drift = {f: round(totals[i] - self._totals[i], 2) for i, f in enumerate(FIELDS) if abs(totals[i] - self._totals[i]) > 1e-6}
+            self._seen, self._flights, self._totals = seen, flights, totals
+            self._dirty = False
+            self._reconciled_at = time.monotonic()
+            self.stats['reconciles'] += 1
+            self.stats['last_drift'] = drift
+            return drift
+
+    def ensure(self, passengers):
+        """Reconcile if invalidated, out of step with the store or due."""
+        with self._lock:
+            due = (self._dirty or len(self._seen) != len(passengers)
+                   or time.monotonic() - self._reconciled_at > self.reconcile_seconds)
+        if due:
+            self.reconcile(passengers)
+
+    # --- boarding / flights --------------------------------------------------
+    def set_boarding(self, state):
+        counts = {}
+        for flight, entry in (state or {}).items():
+            if isinstance(entry, dict):
+                counts[flight] = len(entry.get('boarded') or [])
+        with self._lock:
+            self._boarded = counts
+
+    def set_flights(self, flights):
+        status = {}
+        for f in flights or []:
+            s = f.get('status')
+            status[s] = status.get(s, 0) + 1
+        with self._lock:
+            self._flight_status = status
+            self._flight_count = len(flights or [])
+
+    # --- reads ---------------------------------------------------------------
+    @staticmethod
+    def _row(values, boarded):
+        out = dict(zip(FIELDS, values))
+        out['fees'] = round(out['fees'], 2)
+        out['paid_fees'] = round(out['paid_fees'], 2)
+        out['boarded'] = boarded
+        return out
+
+    def totals(self):
+        with self._lock:
+            return self._row(self._totals, sum(self._boarded.values()))
+
+    def flight(self, flight_id):
+        with self._lock:
+            return self._row(self._flights.get(flight_id, [0, 0, 0, 0.0, 0.0]), self._boarded.get(flight_id, 0))
+
+    def flights(self):
+        with self._lock:
+            keys = set(self._flights) | set(self._boarded)
+            return {f: self._row(self._flights.get(f, [0, 0, 0, 0.0, 0.0]), self._boarded.get(f, 0)) for f in keys}
+
+    def flight_status(self):
+        with self._lock:
+            return dict(self._flight_status), self._flight_count
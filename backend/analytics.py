@@ -0,0 +1,204 @@
+"""Columnar passenger snapshot for ad-hoc reporting.
+
+Reports used to walk the passenger list (a list of heterogeneous dicts) once
+per figure. A PassengerSnapshot instead holds one NumPy array per field:
+
+    numeric      baggage_count (int32), baggage_fee (float64)
+    flags        checked_in, baggage_paid, boarded (bool)
+    categorical  flight, airline (int32 codes into a list of labels, -1 = none)
+    time         departure (int64 epoch seconds of the booked flight, -1 = unknown)
+
+Filters become boolean masks and group-bys become np.bincount over the code
+columns. Passengers carry no booking timestamp, so date ranges select by the
+departure time of the booked flight.
+
+AnalyticsEngine rebuilds the snapshot lazily: when the passenger store has
+changed and the current snapshot is older than min_age seconds.
+Snapshots can be exported to / loaded from a single .npz blob.
+"""
+import io
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+CATEGORICAL = ('flight', 'airline')
+UNKNOWN_TIME = -1
+
+
+def parse_bound(value, end=False):
+    """ISO date or datetime -> epoch seconds; a bare end date covers the whole day."""
+    if not value:
+        return None
+    text = str(value).strip().replace('Z', '+00:00')
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f'invalid date: {value}')
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    seconds = int(dt.timestamp())
+    if end and len(str(value).strip()) == 10:
+        seconds += 86399
+    return seconds
+
+
+def _encode(values):
+    """Dictionary-encode a list of labels -> (codes int32, labels list)."""
+    labels, index, codes = [], {}, np.empty(len(values), dtype=np.int32)
+    for i, v in enumerate(values):
+        if v is None or v == '':
+            codes[i] = -1
+            continue
+        code = index.get(v)
+        if code is None:
+            code = index[v] = len(labels)
+            labels.append(v)
+        codes[i] = code
+    return codes, labels
+
+
+def _num(value, cast):
+    try:
+        return cast(value or 0)
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+class PassengerSnapshot:
+    def __init__(self, columns, labels, built_at=None, version=None):
+        self.columns = columns
+        self.labels = labels
+        self.built_at = built_at if built_at is not None else time.time()
+        self.version = version
+
+    def __len__(self):
+        return len(self.columns['flight'])
+
+    @classmethod
+    def build(cls, passengers, flights=(), boarding_state=None, version=None):
+        records = list(passengers)
+        by_flight = {f.get('flight'): f for f in flights or []}
+        boarded = set()
+        for flight_id, entry in (boarding_state or {}).items():
+            if isinstance(entry, dict):
+                boarded.update((flight_id, p) for p in entry.get('boarded') or [])
+        departures = {}
+        for fid, f in by_flight.items():
+            try:
+                departures[fid] = parse_bound(f.get('time'))
+            except ValueError:
+                departures[fid] = None
+
+        flight_ids = [p.get('flight') for p in records]
+        flight_codes, flight_labels = _encode(flight_ids)
+        airline_codes, airline_labels = _encode([(by_flight.get(fid) or {}).get('airline') for fid in flight_ids])
+        columns = {
+            'flight': flight_codes,
+            'airline': airline_codes,
+            'departure': np.fromiter((departures.get(fid) or UNKNOWN_TIME for fid in flight_ids), dtype=np.int64, count=len(records)),
+            'baggage_count': np.fromiter((_num(p.get('baggage_count'), int) for p in records), dtype=np.int32, count=len(records)),
+            'baggage_fee': np.fromiter((_num(p.get('baggage_fee'), float) for p in records), dtype=np.float64, count=len(records)),
+            'checked_in': np.fromiter((bool(p.get('checked_in')) for p in records), dtype=bool, count=len(records)),
+            'baggage_paid': np.fromiter((bool(p.get('baggage_paid')) for p in records), dtype=bool, count=len(records)),
+            'boarded': np.fromiter(((p.get('flight'), p.get('passport')) in boarded for p in records), dtype=bool, count=len(records)),
+        }
+        return cls(columns, {'flight': flight_labels, 'airline': airline_labels}, version=version)
+
+    # --- queries -------------------------------------------------------------
+    def mask(self, start=None, end=None, flights=None, airline=None):
+        """Boolean row selector. start/end are epoch seconds on the departure column."""
+        m = np.ones(len(self), dtype=bool)
+        dep = self.columns['departure']
+        if start is not None:
+            m &= (dep != UNKNOWN_TIME) & (dep >= start)
+        if end is not None:
+            m &= (dep != UNKNOWN_TIME) & (dep <= end)
+        if flights:
+            codes = [self.labels['flight'].index(f) for f in flights if f in self.labels['flight']]
+            m &= np.isin(self.columns['flight'], codes)
+        if airline is not None:
+            code = self.labels['airline'].index(airline) if airline in self.labels['airline'] else -2
+            m &= self.columns['airline'] == code
+        return m
+
+    def totals(self, mask=None):
+        c = self.columns
+        m = mask if mask is not None else slice(None)
+        fees = c['baggage_fee'][m]
+        return {
+            'bookings': int(len(fees)),
+            'checked_in': int(np.count_nonzero(c['checked_in'][m])),
+            'boarded': int(np.count_nonzero(c['boarded'][m])),
+            'bags': int(c['baggage_count'][m].sum()),
+            'fees': round(float(fees.sum()), 2),
+            'paid_fees': round(float(fees[c['baggage_paid'][m]].sum()), 2),
+        }
+
+    def group_by(self, column, mask=None):
+        """Per-label totals for a categorical column, via bincount over the codes."""
+        codes = self.columns[column]
+        labels = self.labels[column]
+        if mask is not None:
+            codes = codes[mask]
+        c = {k: (v[mask] if mask is not None else v) for k, v in self.columns.items()}
+        # shift so 'none' (-1) lands in bucket 0
+        idx = codes + 1
+        n = len(labels) + 1
+        bookings = np.bincount(idx, minlength=n)
+        checked = np.bincount(idx, weights=c['checked_in'], minlength=n)
+        boarded = np.bincount(idx, weights=c['boarded'], minlength=n)
+        bags = np.bincount(idx, weights=c['baggage_count'], minlength=n)
+        fees = np.bincount(idx, weights=c['baggage_fee'], minlength=n)
+        paid = np.bincount(idx, weights=c['baggage_fee'] * c['baggage_paid'], minlength=n)
+        out = {}
+        for i in np.nonzero(bookings)[0]:
+            label = labels[i - 1] if i else None
+            out[label if label is not None else 'unassigned'] = {
+                'bookings': int(bookings[i]), 'checked_in': int(checked[i]), 'boarded': int(boarded[i]),
+                'bags': int(bags[i]), 'fees': round(float(fees[i]), 2), 'paid_fees': round(float(paid[i]), 2),
+            }
+        return out
+
+    # --- binary export -------------------------------------------------------
+    def to_bytes(self):
+        """Compressed .npz with every column plus the label tables (no pickle)."""
+        buf = io.BytesIO()
+        arrays = dict(self.columns)
+        for name, labels in self.labels.items():
+            arrays[f'labels_{name}'] = np.array(labels, dtype=str)
+        arrays['meta_built_at'] = np.array([self.built_at])
+        np.savez_compressed(buf, **arrays)
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        with np.load(io.BytesIO(data), allow_pickle=False) as z:
+            columns = {k: z[k] for k in z.files if not k.startswith(('labels_', 'meta_'))}
+            labels = {name: [str(v) for v in z[f'labels_{name}']] for name in CATEGORICAL}
+            built_at = float(z['meta_built_at'][0])
+        return cls(columns, labels, built_at=built_at)
+
+
+class AnalyticsEngine:
+    def __init__(self, source_fn, version_fn, min_age: float = 5.0):
+        """source_fn() -> (passengers, flights, boarding_state); version_fn() -> store version."""
+        self.source_fn = source_fn
+        self.version_fn = version_fn
+        self.min_age = min_age
+        self.builds = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, force=False):
+        with self._lock:
+            snap = self._snapshot
+            version = self.version_fn()
+            fresh = snap is not None and (snap.version == version or time.time() - snap.built_at < self.min_age)
+            if fresh and not force:
+                return snap
+            passengers, flights, boarding_state = self.source_fn()
+            self._snapshot = PassengerSnapshot.build(passengers, flights, boarding_state, version=version)
+            self.builds += 1
+            return self._snapshot
@@ -1,15 +1,39 @@
 # ...existing code...
 from flask import Flask, request, jsonify, send_from_directory, redirect
-from security_utils import security_manager, require_admin, sanitize_input, validate_passport
+from security_utils import security_manager, require_admin, sanitize_input, validate_passport, TokenCache
+from sanitizer import sanitize_fields, TEXT
 from flight_manager import FlightManager
+from face_index import FaceIndex, TemplateCache, make_template, dhash, DEFAULT_RADIUS as DEFAULT_FACE_RADIUS
+from face_store import FaceStore
+import face_ingest
+from concurrent.futures import ThreadPoolExecutor
 import json
+import hmac
 import os
-import threading
 from PIL import Image, ImageChops, ImageStat
 import io
 import qrcode
 from flask import send_file
-import smtplib
+import smtp_pool
+import rate_limit
+from notifications import NotificationDispatcher
+from jobqueue import JobQueue, WorkerPool
+from disruptions import DisruptionBroadcaster
+from password_hasher import PasswordHasher, HasherBusy
+from aggregates import PassengerAggregates
+from analytics import AnalyticsEngine, parse_bound
+from timeseries import TimeSeriesStore
+from funnel import FunnelEngine, STAGES as FUNNEL_STAGES
+import pagination
+import streaming
+import serialization
+import compression
+from conditional import conditional, file_version
+from static_assets import StaticAssets
+import metrics
+import slowlog
+from profiler import Profiler
+import sys
 from email.message import EmailMessage
 # Load .env for local development if present
 try:
@@ -19,9 +43,8 @@ except Exception:
     pass
 import random
 from datetime import datetime, timedelta, timezone
-import bcrypt
 import time
-from flask import Response, stream_with_context
+from flask import Response, stream_with_context, g
 
 PASSENGER_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "passengers.json"))
 FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
@@ -33,6 +56,9 @@ FLIGHTS_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "flights.
 BOARDING_STATE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "boarding_state.json"))
 OPENAPI_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "openapi.json"))
 HOLDS_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "holds.json"))
+JOBS_DB_FILE = os.path.abspath(os.getenv('JOBS_DB') or os.path.join(os.path.dirname(__file__), "jobs.db"))
+# Optional cold storage for untouched enrollment uploads (canonical copies always go to FACE_DIR)
+FACE_ORIGINALS_DIR = os.getenv('FACE_ORIGINALS_DIR') or None
 
 # Try to initialize Redis/RQ if configured
 RQ_QUEUE = None
@@ -45,6 +71,17 @@ try:
 except Exception:
     RQ_QUEUE = None
 
+# Durable local queue used when Redis is not available. Tasks are resolved by import path
+# ('app.<func>'), so make sure running this file as a script does not import it a second time.
+sys.modules.setdefault('app', sys.modules[__name__])
+job_queue = JobQueue(JOBS_DB_FILE, visibility_timeout=float(os.getenv('JOBS_VISIBILITY_TIMEOUT') or 300))
+job_workers = None
+if RQ_QUEUE is None and os.getenv('JOBS_INPROCESS', '1').lower() in ('1', 'true', 'yes'):
+    # set JOBS_INPROCESS=0 when jobs are drained by a separate `python worker.py`
+    # completed jobs older than JOBS_PURGE_AFTER seconds are deleted while workers are idle
+    job_workers = WorkerPool(job_queue, workers=int(os.getenv('JOBS_WORKERS') or 2),
+                             purge_after=float(os.getenv('JOBS_PURGE_AFTER') or 86400)).start()
+
 
 # Ensure face_store exists
 if not os.path.exists(FACE_DIR):
@@ -53,10 +90,21 @@ if not os.path.exists(FACE_DIR):
     except Exception:
         pass
 
-# Load passengers if file exists
+# Content-addressed enrollment images plus the perceptual-hash prefilter for 1:N search.
+# Hashes are persisted in the store index; legacy flat files are hashed on startup.
+face_store = FaceStore(FACE_DIR)
+face_index = FaceIndex()
+face_templates = TemplateCache(int(os.getenv('FACE_TEMPLATE_CACHE', '1024')))
+try:
+    face_index.load(face_store.phashes())
+    face_index.rebuild((p, face_store.path_for(p)) for p in face_store.legacy_passports())
+except Exception:
+    pass
+
+# Load passengers if file exists. A corrupt or unreadable file must stop startup:
+# defaulting to [] would let the first save_passengers() overwrite every booking.
 if os.path.exists(PASSENGER_FILE):
-    with open(PASSENGER_FILE, "r") as file:
-        passengers = json.load(file)
+    passengers = serialization.load_file(PASSENGER_FILE, [], strict=True)
 else:
     passengers = []
 
@@ -84,35 +132,37 @@ if not os.path.exists(FLIGHTS_FILE):
     except Exception:
         pass
 
+# Dashboard/report counters, maintained on every save instead of recomputed per request
+passenger_aggregates = PassengerAggregates(reconcile_seconds=float(os.getenv('AGGREGATES_RECONCILE_SECONDS') or 300))
+
+@metrics.timed('load_flights')
 def _load_flights():
-    try:
-        with open(FLIGHTS_FILE, 'r') as f:
-            return json.load(f) or []
-    except Exception:
-        return []
+    return serialization.load_file(FLIGHTS_FILE) or []
+
+# bumped on every save so same-process rewrites within one mtime tick still change ETags
+_flights_saves = 0
 
+@metrics.timed('save_flights')
 def _save_flights(flights: list):
+    global _flights_saves
+    _flights_saves += 1
+    passenger_aggregates.set_flights(flights)
     try:
-        with open(FLIGHTS_FILE, 'w') as f:
-            json.dump(flights, f, indent=2)
+        serialization.dump_file(flights, FLIGHTS_FILE)
     except Exception:
         pass
 
 
+@metrics.timed('load_boarding_state')
 def _load_boarding_state():
-    try:
-        if os.path.exists(BOARDING_STATE_FILE):
-            with open(BOARDING_STATE_FILE, 'r') as f:
-                return json.load(f) or {}
-    except Exception:
-        pass
-    return {}
+    return serialization.load_file(BOARDING_STATE_FILE) or {}
 
 
+@metrics.timed('save_boarding_state')
 def _save_boarding_state(state: dict):
+    passenger_aggregates.set_boarding(state)
     try:
-        with open(BOARDING_STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=2)
+        serialization.dump_file(state, BOARDING_STATE_FILE)
     except Exception:
         pass
 
@@ -216,24 +266,70 @@ def _load_access_codes():
     except Exception:
         return {}
 
+# bcrypt runs on a bounded pool so login bursts cannot starve request threads
+password_hasher = PasswordHasher.from_env()
+
+# admin users file contents, re-read only when its mtime/size changes
+_admin_users_cache = {'stamp': None, 'users': {}}
+
 def _load_admin_users():
     try:
-        if os.path.exists(ADMIN_USERS_FILE):
+        st = os.stat(ADMIN_USERS_FILE)
+    except OSError:
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _admin_users_cache['stamp'] != stamp:
+        try:
             with open(ADMIN_USERS_FILE, 'r') as f:
-                return json.load(f) or {}
-    except Exception:
-        pass
-    return {}
+                users = json.load(f) or {}
+        except Exception:
+            return {}
+        _admin_users_cache['users'] = users
+        _admin_users_cache['stamp'] = stamp
+    return dict(_admin_users_cache['users'])
 
 
 def _save_admin_users(users: dict):
     try:
-        with open(ADMIN_USERS_FILE, 'w') as f:
+        # write-then-rename so concurrent readers never see a truncated file
+        tmp = ADMIN_USERS_FILE + '.tmp'
+        with open(tmp, 'w') as f:
             json.dump(users, f, indent=2)
+        os.replace(tmp, ADMIN_USERS_FILE)
+        st = os.stat(ADMIN_USERS_FILE)
+        _admin_users_cache['users'] = dict(users)
+        _admin_users_cache['stamp'] = (st.st_mtime_ns, st.st_size)
     except Exception:
         pass
 
 
+def _check_admin_password(username, password):
+    """True if password matches the stored admin hash. Raises HasherBusy when the
+    bcrypt pool is saturated. Hashes at an outdated work factor are upgraded in the
+    background after a successful check."""
+    users = _load_admin_users()
+    if not (username and password and username in users):
+        return False
+    stored = users[username].get('password_hash')
+    if not password_hasher.verify(password, stored):
+        return False
+    if password_hasher.needs_rehash(stored):
+        def store(new_hash):
+            current = _load_admin_users()
+            if username in current and current[username].get('password_hash') == stored:
+                current[username] = dict(current[username], password_hash=new_hash)
+                _save_admin_users(current)
+        password_hasher.rehash_async(password, store)
+    return True
+
+
+def _hasher_busy_response():
+    resp = jsonify({'error': 'busy', 'detail': 'too many concurrent logins, retry shortly'})
+    resp.status_code = 503
+    resp.headers['Retry-After'] = '1'
+    return resp
+
+
 def _init_admin_users_from_env():
     # If no admin user file exists, but env vars present, create hashed entry
     users = _load_admin_users()
@@ -245,7 +341,7 @@ def _init_admin_users_from_env():
         try:
             # bcrypt may not be available - fall back to plain storage if missing
             try:
-                ph = bcrypt.hashpw(admin_pass.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                ph = password_hasher.hash(admin_pass)
             except Exception:
                 ph = admin_pass
             users = {admin_user: {'password_hash': ph}}
@@ -315,19 +411,27 @@ if not os.path.exists(SESSIONS_FILE):
     except Exception:
         pass
 
+# Verified sessions by token, so authenticated requests skip re-reading sessions.json.
+# Entries expire with the session (or after SESSION_CACHE_TTL seconds) and are all
+# dropped when the file changes under us, e.g. a logout handled by another worker.
+session_cache = TokenCache(
+    max_entries=int(os.getenv('SESSION_CACHE_SIZE') or 1024),
+    max_ttl=float(os.getenv('SESSION_CACHE_TTL') or 60)
+)
+
+
+@metrics.timed('load_sessions')
 def _load_sessions():
-    try:
-        with open(SESSIONS_FILE, 'r') as f:
-            return json.load(f) or {}
-    except Exception:
-        return {}
+    return serialization.load_file(SESSIONS_FILE) or {}
 
+@metrics.timed('save_sessions')
 def _save_sessions(sessions: dict):
     try:
-        with open(SESSIONS_FILE, 'w') as f:
-            json.dump(sessions, f, indent=2)
+        serialization.dump_file(sessions, SESSIONS_FILE)
     except Exception:
         pass
+    # our own write; callers discard the tokens they removed
+    session_cache.sync(file_version(SESSIONS_FILE), keep=True)
 
 def _create_session(role: str, passport: str = None, ttl_minutes: int = 60, ttl_seconds: float = None):
     """Create a session token.
@@ -346,6 +450,10 @@ def _create_session(role: str, passport: str = None, ttl_minutes: int = 60, ttl_
 def _get_session(token: str):
     if not token:
         return None
+    session_cache.sync(file_version(SESSIONS_FILE))
+    entry = session_cache.get(token)
+    if entry is not None:
+        return entry
     sessions = _load_sessions()
     entry = sessions.get(token)
     if not entry:
@@ -361,9 +469,11 @@ def _get_session(token: str):
         except Exception:
             pass
         return None
+    session_cache.put(token, entry, exp=exp.replace(tzinfo=timezone.utc).timestamp())
     return entry
 
 def _delete_session(token: str):
+    session_cache.discard(token)
     sessions = _load_sessions()
     if token in sessions:
         try:
@@ -374,34 +484,340 @@ def _delete_session(token: str):
 
 def log_event(event: dict):
     """Append an event dict to events.json (simple audit log)."""
+    log_events([event])
+
+# Per-minute throughput for ops dashboards, fed from the events as they are logged
+throughput = TimeSeriesStore(max_series=int(os.getenv('TIMESERIES_MAX_SERIES') or 2000))
+THROUGHPUT_EVENTS = {'checkin': 'checkins', 'verify': 'verifies', 'enroll': 'enrollments', 'identify': 'identifies'}
+
+# Enroll -> verify -> check-in -> board funnel, also updated as events are logged
+funnel = FunnelEngine()
+
+
+def _record_throughput(events):
+    now = time.time()
+    for e in events:
+        kind = e.get('type')
+        metric = THROUGHPUT_EVENTS.get(kind)
+        if metric is None and kind == 'boarding_action' and e.get('action') == 'mark_boarded':
+            metric = 'boardings'
+        if metric is not None:
+            throughput.record(metric, e.get('flight'), ts=now)
+        funnel.observe(e)
+
+
+@metrics.timed('log_events')
+def log_events(new_events: list):
+    """Append several events with a single rewrite of events.json."""
+    if not new_events:
+        return
+    try:
+        _record_throughput(new_events)
+    except Exception:
+        pass
+    try:
+        events = serialization.load_file(EVENTS_FILE) or []
+        events.extend(new_events)
+        serialization.dump_file(events, EVENTS_FILE)
+    except Exception:
+        # Logging must not break main flows
+        pass
+
+# Background delivery for admin notifications (bounded workers, per-domain rate limits, retries)
+notification_dispatcher = NotificationDispatcher.from_env()
+
+# Every passenger mutation ends in save_passengers(), which bumps this version so
+# derived indexes know when to rebuild.
+_passengers_version = 0
+_flight_index = {'key': None, 'by_flight': {}}
+
+@metrics.timed('save_passengers')
+def save_passengers(*changed):
+    """Persist passengers. Pass the records that were added or modified so the
+    aggregate counters update in O(1); with no arguments (bulk edits, deletions)
+    the counters are rebuilt on next read."""
+    global _passengers_version
+    _passengers_version += 1
+    if changed:
+        passenger_aggregates.update(*changed)
+        funnel.update(*changed)
+    else:
+        passenger_aggregates.invalidate()
+        funnel.sync(passengers)
+    serialization.dump_file(passengers, PASSENGER_FILE, indent=4)
+
+def passengers_for_flight(flight_id):
+    """Passenger records booked on a flight via a flight -> passengers index."""
+    key = (_passengers_version, len(passengers))
+    if _flight_index['key'] != key:
+        by_flight = {}
+        for p in passengers:
+            by_flight.setdefault(p.get('flight'), []).append(p)
+        _flight_index['by_flight'] = by_flight
+        _flight_index['key'] = key
+    return list(_flight_index['by_flight'].get(flight_id, ()))
+
+_sorted_index = {'key': None, 'index': None}
+PAGE_DEFAULT_LIMIT = int(os.getenv('PAGE_DEFAULT_LIMIT') or 100)
+PAGE_MAX_LIMIT = int(os.getenv('PAGE_MAX_LIMIT') or 1000)
+LIST_PARAMS = ('limit', 'cursor', 'fields', 'flight', 'checked_in', 'baggage_paid')
+
+
+def _passenger_index(flight_id=None):
+    """Passengers sorted by the pagination key; rebuilt only when the store changes."""
+    if flight_id is not None:
+        return pagination.SortedIndex(passengers_for_flight(flight_id))
+    key = (_passengers_version, len(passengers))
+    if _sorted_index['key'] != key:
+        _sorted_index['index'] = pagination.SortedIndex(passengers)
+        _sorted_index['key'] = key
+    return _sorted_index['index']
+
+
+def _wants_page(args):
+    return any(args.get(name) is not None for name in LIST_PARAMS)
+
+
+def _passenger_page(args, flight_id=None):
+    """One page of passengers for the list endpoints.
+       Query params: limit, cursor (from next_cursor), flight, checked_in, baggage_paid, fields.
+       Returns (records, next_cursor, fields); raises ValueError on bad parameters.
+    """
+    filters = pagination.parse_filters(args)
+    if flight_id is not None:
+        filters.pop('flight', None)
+    after = pagination.decode_cursor(args.get('cursor')) if args.get('cursor') else None
+    limit = args.get('limit')
+    if limit is not None or after is not None:
+        try:
+            limit = int(limit) if limit is not None else PAGE_DEFAULT_LIMIT
+        except ValueError:
+            raise ValueError('limit must be an integer')
+        limit = max(1, min(limit, PAGE_MAX_LIMIT))
+    index = _passenger_index(flight_id if flight_id is not None else filters.pop('flight', None))
+    records, next_cursor = index.page(after, limit, filters)
+    return records, next_cursor, pagination.parse_fields(args.get('fields'))
+
+
+def _invalid_page(e):
+    return jsonify({'error': 'invalid_parameter', 'detail': str(e)}), 400
+
+
+# free-text passenger fields that are sanitized on create; other fields pass through untouched
+PASSENGER_TEXT_FIELDS = {'name': TEXT, 'passport': TEXT, 'flight': TEXT, 'email': TEXT}
+
+passenger_aggregates.set_flights(_load_flights())
+passenger_aggregates.set_boarding(_load_boarding_state())
+
+
+def _seed_funnel():
+    """Seed the funnel from the stores; verify/email outcomes only exist in the audit log."""
+    past = []
     try:
-        events = []
         if os.path.exists(EVENTS_FILE):
             with open(EVENTS_FILE, 'r') as f:
+                past = [e for e in (json.load(f) or []) if e.get('type') in ('verify', 'email_sent')]
+    except Exception:
+        past = []
+    enrolled = set(face_store.entries()) | set(face_store.legacy_passports())
+    funnel.rebuild(passengers, enrolled, _load_boarding_state(), past)
+
+_seed_funnel()
+
+
+# file versions the aggregates' flight and boarding counts were last read from
+_aggregate_sources = {'flights': None, 'boarding': None}
+
+
+def _aggregates():
+    """The aggregate counters, reconciled against the store if needed.
+    Flight status and boarded counts are re-read whenever flights.json or the boarding
+    state file changes on disk, so edits made by other processes are picked up too."""
+    passenger_aggregates.ensure(passengers)
+    version = file_version(FLIGHTS_FILE)
+    if version != _aggregate_sources['flights']:
+        passenger_aggregates.set_flights(_load_flights())
+        _aggregate_sources['flights'] = version
+    version = file_version(BOARDING_STATE_FILE)
+    if version != _aggregate_sources['boarding']:
+        passenger_aggregates.set_boarding(_load_boarding_state())
+        _aggregate_sources['boarding'] = version
+    return passenger_aggregates
+
+
+def _file_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+# Columnar snapshot for filtered / grouped reports, rebuilt when the stores change
+analytics_engine = AnalyticsEngine(
+    lambda: (list(passengers), _load_flights(), _load_boarding_state()),
+    lambda: (_passengers_version, _file_mtime(FLIGHTS_FILE), _file_mtime(BOARDING_STATE_FILE)),
+    min_age=float(os.getenv('ANALYTICS_SNAPSHOT_SECONDS') or 5)
+)
+
+
+# Conditional GET: ETags come from these store versions, never from hashing the body.
+# Cache-Control per route family; kiosks revalidate seat maps on every poll.
+CACHE_POLICIES = {
+    'flights': 'public, max-age=5',
+    'seats': 'no-cache',
+    'openapi': 'public, max-age=3600',
+    'admin': 'private, no-cache',
+}
+_holds_expiry = {'key': None, 'by_flight': {}}
+
+
+def _holds_version(flight_id):
+    """(holds file version, whether a hold on this flight has expired since it was written)."""
+    key = file_version(HOLDS_FILE)
+    if _holds_expiry['key'] != key:
+        by_flight = {}
+        for fid, holds in (serialization.load_file(HOLDS_FILE) or {}).items():
+            for h in holds or []:
                 try:
-                    events = json.load(f) or []
+                    exp = datetime.fromisoformat(h.get('expires').replace('Z', ''))
                 except Exception:
-                    events = []
-        events.append(event)
-        with open(EVENTS_FILE, 'w') as f:
-            json.dump(events, f, indent=2)
-    except Exception:
-        # Logging must not break main flows
-        pass
+                    continue
+                if fid not in by_flight or exp < by_flight[fid]:
+                    by_flight[fid] = exp
+        _holds_expiry['by_flight'] = by_flight
+        _holds_expiry['key'] = key
+    first = _holds_expiry['by_flight'].get(flight_id)
+    return key, first is not None and first <= datetime.utcnow()
+
+
+def _flights_version(*_args, **_kwargs):
+    return file_version(FLIGHTS_FILE), _flights_saves
+
+
+def _catalog_version():
+    return _flights_version(), _passengers_version
+
+
+def _seats_version(flight_id):
+    return _flights_version(), _passengers_version, _holds_version(flight_id)
+
+
+def _admin_guard():
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    g.admin_session = session
+    return None
+
+
+def _admin_session():
+    """The request's admin session, reusing the one _admin_guard already resolved
+    so a guarded request is authenticated (and audited) once."""
+    session = g.get('admin_session')
+    if session is None:
+        session = _require_session(request, require_role='admin')
+    return session
 
-def save_passengers():
-    with open(PASSENGER_FILE, "w") as file:
-        json.dump(passengers, file, indent=4)
 
 def find_duplicate(passport, flight):
     return any(p.get("passport") == passport and p.get("flight") == flight for p in passengers)
 
 app = Flask(__name__, static_folder=FRONTEND_DIR)
+# orjson-backed jsonify / request parsing when orjson is installed
+app.json = serialization.JSONProvider(app)
+
+
+# Requests slower than SLOW_REQUEST_MS, with their per-stage breakdown (GET /api/admin/slow-requests)
+slow_log = slowlog.SlowLog.from_env()
+
+
+# Request metrics. Registered before the other after_request hooks so it runs last
+# and sees the final (compressed) response.
+@app.before_request
+def _metrics_start():
+    g.metrics_start = time.perf_counter()
+    g.slowlog_token = slowlog.begin()
+    metrics.in_flight(1)
+
+
+@app.after_request
+def _metrics_finish(resp):
+    start = g.pop('metrics_start', None)
+    token = g.pop('slowlog_token', None)
+    if start is not None:
+        try:
+            elapsed = time.perf_counter() - start
+            route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+            size = None if resp.is_streamed or resp.direct_passthrough else resp.calculate_content_length()
+            metrics.request_finished(request.method, route, resp.status_code, elapsed,
+                                     request.content_length, size)
+            if token is not None:
+                slow_log.record(slowlog.finish(token), elapsed, request.method, route, resp.status_code)
+                token = None
+        except Exception:
+            pass
+    if token is not None:
+        slowlog.finish(token)
+    return resp
+
+
+@app.teardown_request
+def _metrics_teardown(_exc):
+    metrics.in_flight(-1)
+    token = g.pop('slowlog_token', None)
+    if token is not None:
+        slowlog.finish(token)
+
+
+# Admin-triggered profiling (POST /api/admin/profile); a single flag check while off
+profiler = Profiler()
+
+
+@app.before_request
+def _profile_start():
+    if profiler.active:
+        g.profile_token = profiler.begin(request.url_rule.rule if request.url_rule is not None else None)
+
+
+@app.teardown_request
+def _profile_end(_exc):
+    token = g.pop('profile_token', None)
+    if token is not None:
+        profiler.end(token)
+
+# Per-client throttles for kiosk-facing endpoints (RATE_LIMIT_LOGIN, RATE_LIMIT_FACE_VERIFY)
+login_limiter = rate_limit.from_env('login', '120/60')
+face_verify_limiter = rate_limit.from_env('face_verify', '300/60')
+
+
+def _throttle(limiter, cost=1):
+    """429 response if the caller's IP is over the limiter's budget, else None."""
+    if os.getenv('RATE_LIMIT_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        return None
+    allowed, retry_after = limiter.hit(request.remote_addr or 'unknown', cost)
+    if allowed:
+        return None
+    retry_after = max(1, int(retry_after + 0.999))
+    resp = jsonify({'error': 'rate_limited', 'retry_after': retry_after})
+    resp.status_code = 429
+    resp.headers['Retry-After'] = str(retry_after)
+    return resp
+
 
 @app.route("/api/passengers", methods=["GET", "DELETE"])
 def api_get_passengers():
     if request.method == "GET":
-        return jsonify(passengers)
+        if not _wants_page(request.args):
+            return jsonify(passengers)
+        # paged: still a plain array; the next page's cursor is in X-Next-Cursor
+        try:
+            records, next_cursor, fields = _passenger_page(request.args)
+        except ValueError as e:
+            return _invalid_page(e)
+        resp = jsonify([pagination.project(p, fields) for p in records])
+        if next_cursor:
+            resp.headers['X-Next-Cursor'] = next_cursor
+        return resp
     
     if request.method == "DELETE":
         # Clear all passengers
@@ -422,10 +838,11 @@ def api_admin_passengers():
         return jsonify({'error': 'unauthorized'}), 401
     data = request.get_json() or {}
     if request.method == 'POST':
-        name = sanitize_input(data.get('name') or '')
-        passport = sanitize_input(data.get('passport') or '')
-        flight = sanitize_input(data.get('flight') or '')
-        email = sanitize_input(data.get('email') or '')
+        data = sanitize_fields(data, PASSENGER_TEXT_FIELDS)
+        name = data.get('name') or ''
+        passport = data.get('passport') or ''
+        flight = data.get('flight') or ''
+        email = data.get('email') or ''
         seat = data.get('seat')
         if not (name and passport and flight):
             return jsonify({'error': 'name, passport and flight are required'}), 400
@@ -442,7 +859,7 @@ def api_admin_passengers():
             p['email'] = email
         passengers.append(p)
         try:
-            save_passengers()
+            save_passengers(p)
         except Exception:
             pass
         log_event({'type': 'admin_create_passenger', 'passport': passport, 'flight': flight, 'by': session.get('role'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
@@ -465,7 +882,7 @@ def api_admin_passengers():
                 passengers[idx][k] = v
                 changed[k] = v
         try:
-            save_passengers()
+            save_passengers(passengers[idx])
         except Exception:
             pass
         log_event({'type': 'admin_update_passenger', 'passport': passport, 'flight': flight, 'changed': changed, 'by': session.get('role'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
@@ -492,6 +909,207 @@ def api_admin_passengers():
         return jsonify({'status': 'deleted', 'removed': removed}), 200
 
 
+@app.route('/api/admin/activity', methods=['GET'])
+def api_admin_activity():
+    """Recent admin activity from the in-memory tail, newest first, plus writer stats.
+       Query params: limit (default 100)
+    """
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    try:
+        limit = int(request.args.get('limit') or 100)
+    except Exception:
+        limit = 100
+    activity = security_manager.activity_log
+    return jsonify({'activity': activity.recent(limit), 'stats': dict(activity.stats)}), 200
+
+
+@app.route('/api/admin/metrics/timeseries', methods=['GET'])
+def api_admin_timeseries():
+    """Throughput series from the in-memory ring buffers (no audit log access).
+       Query params:
+         - metric: comma-separated subset of checkins, verifies, boardings, enrollments, identifies (default: all)
+         - flight: restrict to one flight (default: all flights)
+         - resolution: 1s | 1m | 1h (default 1m)
+         - points: number of buckets, newest last (default 60)
+       Returns { resolution, step, start, series: { metric: [counts...] } }
+    """
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    resolution = request.args.get('resolution') or '1m'
+    if resolution not in throughput.resolutions:
+        return jsonify({'error': 'invalid_resolution', 'allowed': list(throughput.resolutions)}), 400
+    try:
+        points = int(request.args.get('points') or 60)
+    except Exception:
+        points = 60
+    known = sorted(set(THROUGHPUT_EVENTS.values()) | {'boardings'})
+    wanted = [m for m in (request.args.get('metric') or '').split(',') if m] or known
+    flight = request.args.get('flight') or None
+    now = time.time()
+    series, start, step = {}, None, None
+    for metric in wanted:
+        q = throughput.query(metric, flight, resolution, points, now=now)
+        series[metric] = q['values']
+        start, step = q['start'], q['step']
+    return jsonify({'resolution': resolution, 'step': step, 'start': start, 'flight': flight, 'series': series}), 200
+
+
+@app.route('/api/admin/metrics', methods=['GET'])
+def api_admin_metrics():
+    """Request and stage metrics in Prometheus text format.
+       Auth: an admin session, or `Authorization: Bearer <METRICS_TOKEN>` for scrapers.
+       ?format=json returns count/mean/p50/p95/p99 per route and per stage instead.
+    """
+    token = os.getenv('METRICS_TOKEN')
+    auth = request.headers.get('Authorization') or ''
+    scraper = bool(token) and auth.startswith('Bearer ') and hmac.compare_digest(auth[7:], token)
+    if not scraper:
+        session = _require_session(request, require_role='admin')
+        if not session:
+            return jsonify({'error': 'unauthorized'}), 401
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'routes': metrics.registry.summary('http_request_duration_seconds'),
+            'stages': metrics.registry.summary('app_stage_duration_seconds'),
+        }), 200
+    return Response(metrics.registry.render(), mimetype='text/plain', headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+
+@app.route('/api/admin/profile', methods=['GET', 'POST'])
+def api_admin_profile():
+    """Control the request profiler.
+       GET: status (active, config, profiled request count, samples).
+       POST { action: start|stop|reset, mode?: sample|cprofile, sample_rate?: 0..1, route?: '/api/checkin',
+              duration_seconds?: 60, max_requests?: int, interval_ms?: 5 }
+    """
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    if request.method == 'GET':
+        return jsonify(profiler.status()), 200
+    data = request.get_json() or {}
+    action = data.get('action')
+    if action == 'start':
+        try:
+            profiler.start(
+                mode=data.get('mode') or 'sample',
+                sample_rate=float(data.get('sample_rate') or 1.0),
+                route=data.get('route'),
+                duration=float(data.get('duration_seconds') or 60),
+                max_requests=data.get('max_requests'),
+                interval=float(data.get('interval_ms') or 5) / 1000.0,
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': 'invalid_profile_config', 'detail': str(e)}), 400
+        log_event({'type': 'profiler_started', 'config': profiler.status()['config'], 'by': session.get('role'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+    elif action == 'stop':
+        profiler.stop()
+    elif action == 'reset':
+        profiler.reset()
+    else:
+        return jsonify({'error': 'unknown_action'}), 400
+    return jsonify(profiler.status()), 200
+
+
+@app.route('/api/admin/profile/report', methods=['GET'])
+def api_admin_profile_report():
+    """Aggregated profile. ?format=text (pstats listing, default) | collapsed (flamegraph input) | pstats (binary dump)
+       text also takes sort (default cumulative) and limit (default 50).
+    """
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    fmt = request.args.get('format') or 'text'
+    if fmt == 'pstats':
+        data = profiler.dump()
+        if data is None:
+            return jsonify({'error': 'no_cprofile_data'}), 404
+        return Response(data, mimetype='application/octet-stream', headers={'Content-Disposition': 'attachment; filename="profile.pstats"'})
+    if fmt == 'collapsed':
+        return Response(profiler.collapsed(), mimetype='text/plain')
+    if fmt == 'text':
+        try:
+            limit = int(request.args.get('limit') or 50)
+        except Exception:
+            limit = 50
+        try:
+            body = profiler.text(sort=request.args.get('sort') or 'cumulative', limit=limit)
+        except KeyError:
+            return jsonify({'error': 'invalid_sort'}), 400
+        return Response(body, mimetype='text/plain')
+    return jsonify({'error': 'invalid_format', 'allowed': ['text', 'collapsed', 'pstats']}), 400
+
+
+@app.route('/api/admin/slow-requests', methods=['GET', 'POST', 'DELETE'])
+def api_admin_slow_requests():
+    """Requests slower than the threshold, newest first, with time per stage
+       (session, load_flights, seat_map, save_passengers, log_events, render_boarding_pass, smtp_send, ...).
+       GET ?route=/api/checkin&limit=50 -> { threshold_ms, capacity, recorded, stage_totals_ms, entries }
+       POST { threshold_ms } changes the threshold; DELETE clears the buffer.
+    """
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    if request.method == 'DELETE':
+        slow_log.clear()
+    elif request.method == 'POST':
+        data = request.get_json() or {}
+        try:
+            threshold = float(data.get('threshold_ms'))
+            if threshold < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            return jsonify({'error': 'invalid_threshold'}), 400
+        slow_log.threshold_ms = threshold
+    try:
+        limit = int(request.args.get('limit') or 100)
+    except Exception:
+        limit = 100
+    entries = slow_log.entries(limit=max(1, limit), route=request.args.get('route'))
+    return jsonify({
+        'threshold_ms': slow_log.threshold_ms,
+        'capacity': slow_log.capacity,
+        'recorded': slow_log.recorded,
+        'stage_totals_ms': slowlog.stage_totals(entries),
+        'entries': entries,
+    }), 200
+
+
+@app.route('/api/admin/funnel', methods=['GET'])
+def api_admin_funnel():
+    """Funnel conversion from the incrementally maintained stage bitsets.
+       Query params:
+         - flight: flight to report on (without it, returns the flights being tracked)
+         - has / lacks: comma-separated stages (booked, enrolled, verified, checked_in, boarded, emailed)
+         - list: 1 to include matching passports (limit caps the list, default 200)
+       e.g. ?flight=AB123&has=verified&lacks=checked_in&list=1 -> verified but not checked in
+    """
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    flight = request.args.get('flight')
+    if not flight:
+        return jsonify({'flights': funnel.flights(), 'stages': list(FUNNEL_STAGES)}), 200
+    has = [s for s in (request.args.get('has') or '').split(',') if s]
+    lacks = [s for s in (request.args.get('lacks') or '').split(',') if s]
+    unknown = [s for s in has + lacks if s not in FUNNEL_STAGES]
+    if unknown:
+        return jsonify({'error': 'invalid_stage', 'stages': unknown, 'allowed': list(FUNNEL_STAGES)}), 400
+    out = funnel.summary(flight)
+    if has or lacks:
+        out['filter'] = {'has': has, 'lacks': lacks, 'count': funnel.count(flight, has, lacks)}
+        if request.args.get('list') in ('1', 'true', 'yes'):
+            try:
+                limit = int(request.args.get('limit') or 200)
+            except Exception:
+                limit = 200
+            out['filter']['passengers'] = funnel.passengers(flight, has, lacks, limit=limit)
+    return jsonify(out), 200
+
+
 @app.route('/api/admin/events', methods=['GET'])
 def api_admin_events():
     """Admin-only events / audit log access.
@@ -521,13 +1139,76 @@ def api_admin_events():
     # no passport -> return last `limit` events
     return jsonify({'events': (events[-limit:] or [])[::-1]}), 200
 
+EXPORT_KINDS = ('passengers', 'bookings', 'events')
+
+
+def _export_records(kind, args):
+    """Generator over the records of an export; nothing is materialized beyond one record."""
+    if kind == 'events':
+        passport = (args.get('passport') or '').strip()
+        etype = (args.get('type') or '').strip()
+        # a corrupt or truncated log raises ValueError; the encoder marks the body as failed
+        for e in streaming.iter_file_array(EVENTS_FILE):
+            if passport and str(e.get('passport') or '') != passport:
+                continue
+            if etype and e.get('type') != etype:
+                continue
+            yield e
+        return
+    filters = pagination.parse_filters(args)
+    fields = pagination.parse_fields(args.get('fields'))
+    flights = {f.get('flight'): f for f in _load_flights()} if kind == 'bookings' else None
+    for p in list(passengers):
+        if filters and not pagination.matches(p, filters):
+            continue
+        if flights is not None:
+            f = flights.get(p.get('flight'))
+            if f:
+                p = dict(p, _flight_time=f.get('time'))
+        yield pagination.project(p, fields)
+
+
+@app.route('/api/admin/export/<kind>', methods=['GET'])
+def api_admin_export(kind):
+    """Stream passengers, bookings or events as a JSON array or NDJSON (admin only).
+       Query params:
+         - format: json (default) | ndjson
+         - passengers/bookings: flight, checked_in, baggage_paid, fields (as for the list endpoints)
+         - events: passport, type
+       The body is produced incrementally with chunked transfer, so memory stays flat.
+       A store that cannot be read gives 500. A failure after streaming has begun ends the
+       body with an {"_export_error": ...} record (and, for json, no closing bracket).
+    """
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    if kind not in EXPORT_KINDS:
+        return jsonify({'error': 'unknown_export', 'allowed': list(EXPORT_KINDS)}), 404
+    fmt = request.args.get('format') or streaming.JSON
+    if fmt not in streaming.FORMATS:
+        return jsonify({'error': 'invalid_format', 'allowed': list(streaming.FORMATS)}), 400
+    try:
+        pagination.parse_filters(request.args)
+    except ValueError as e:
+        return _invalid_page(e)
+    try:
+        records = streaming.prime(_export_records(kind, request.args))
+    except (ValueError, OSError) as e:
+        return jsonify({'error': 'export_failed', 'detail': str(e)}), 500
+    body = streaming.encode(records, fmt)
+    headers = {
+        'Content-Disposition': f'attachment; filename="{kind}.{fmt}"',
+        'X-Accel-Buffering': 'no',
+    }
+    return Response(stream_with_context(body), mimetype=streaming.MIMETYPES[fmt], headers=headers)
+
 @app.route("/api/register", methods=["POST"])
 def api_register():
-    data = request.get_json() or {}
-    name = sanitize_input(data.get("name") or '')
-    passport = sanitize_input(data.get("passport") or '')
-    email = sanitize_input(data.get("email") or '')
-    flight = sanitize_input(data.get("flight") or '')
+    data = sanitize_fields(request.get_json() or {}, PASSENGER_TEXT_FIELDS)
+    name = data.get("name") or ''
+    passport = data.get("passport") or ''
+    email = data.get("email") or ''
+    flight = data.get("flight") or ''
 
     if not (name and passport and flight):
         return jsonify({"error": "name, passport and flight are required"}), 400
@@ -557,7 +1238,7 @@ def api_register():
     if email:
         passenger['email'] = email
     passengers.append(passenger)
-    save_passengers()
+    save_passengers(passenger)
     # attempt to send boarding pass by email if configured
     email_sent = False
     try:
@@ -583,19 +1264,29 @@ def api_face_enroll():
     ok, reason = validate_passport(passport)
     if not ok:
         return jsonify({"error": "invalid_passport", "detail": reason}), 400
-    # Save file to face store
+    # Normalise once at ingest (orientation, grayscale, size) and store the canonical JPEG
     safe_name = passport.replace('/', '_')
-    dest = os.path.join(FACE_DIR, f"{safe_name}.jpg")
     try:
-        img.save(dest)
+        data = face_ingest.read_upload(img)
+        canonical, jpeg = face_ingest.ingest(data, originals_dir=FACE_ORIGINALS_DIR, name=safe_name)
+        previous = face_store.path_for(safe_name)
+        phash = dhash(canonical)
+        # store first: if the write fails the prefilter index is left untouched
+        _digest, deduplicated = face_store.put(safe_name, jpeg, phash=phash)
+        face_index.add(safe_name, phash)
+        if previous:
+            face_templates.invalidate(previous)
         # log enroll event
         log_event({
             'type': 'enroll',
             'passport': passport,
             'timestamp': __import__('datetime').datetime.utcnow().isoformat() + 'Z',
-            'status': 'ok'
+            'status': 'ok',
+            'deduplicated': deduplicated
         })
         return jsonify({"status": "enrolled", "passport": passport}), 201
+    except face_ingest.FaceImageError as e:
+        return jsonify({"error": "invalid_image", "detail": str(e)}), e.status
     except Exception as e:
         log_event({
             'type': 'enroll',
@@ -610,8 +1301,16 @@ def api_face_enroll():
 def _image_similarity(path_a, file_b):
     # Open stored image and uploaded image file-like, compute a simple similarity score (0-1)
     try:
-        a = Image.open(path_a).convert('L').resize((200,200))
-        b = Image.open(file_b).convert('L').resize((200,200))
+        a = face_templates.get(path_a)
+        b = file_b if isinstance(file_b, Image.Image) else make_template(file_b)
+        return _template_similarity(a, b)
+    except Exception:
+        return 0.0
+
+
+def _template_similarity(a, b):
+    # a and b are already grayscale 200x200 templates
+    try:
         diff = ImageChops.difference(a, b)
         stat = ImageStat.Stat(diff)
         # RMS roughly indicates per-pixel difference; normalize by 255
@@ -629,6 +1328,9 @@ def _image_similarity(path_a, file_b):
 @app.route("/api/face/verify", methods=["POST"])
 def api_face_verify():
     # Expects multipart/form-data with 'passport' and file field 'image'
+    limited = _throttle(face_verify_limiter)
+    if limited:
+        return limited
     passport = request.form.get('passport') or request.args.get('passport')
     img = request.files.get('image')
     if not (passport and img):
@@ -636,17 +1338,14 @@ def api_face_verify():
     ok, reason = validate_passport(passport)
     if not ok:
         return jsonify({"error": "invalid_passport", "detail": reason}), 400
-    safe_name = passport.replace('/', '_')
-    stored = os.path.join(FACE_DIR, f"{safe_name}.jpg")
-    if not os.path.exists(stored):
+    stored = face_store.path_for(passport.replace('/', '_'))
+    if not stored:
         return jsonify({"error": "no enrolled image for this passport"}), 404
-    # compute similarity
-    # PIL can accept file-like; rewind if needed
     try:
-        img.stream.seek(0)
-    except Exception:
-        pass
-    score = _image_similarity(stored, img)
+        data = face_ingest.read_upload(img)
+    except face_ingest.FaceImageError as e:
+        return jsonify({"error": "invalid_image", "detail": str(e)}), e.status
+    score = _image_similarity(stored, io.BytesIO(data))
     # Choose a conservative threshold for mock: score >= 0.5 means match
     match = score >= 0.5
     # Log verify event
@@ -660,6 +1359,127 @@ def api_face_verify():
     return jsonify({"passport": passport, "match": match, "score": round(score, 3)})
 
 
+_verify_pool = ThreadPoolExecutor(max_workers=int(os.getenv('FACE_VERIFY_WORKERS', '4')), thread_name_prefix='face-verify')
+
+
+def _verify_one(passport, data):
+    """Score one (passport, image bytes) pair for the batch endpoint. Runs on _verify_pool."""
+    ok, reason = validate_passport(passport)
+    if not ok:
+        return {'passport': passport, 'error': 'invalid_passport', 'detail': reason}
+    stored = face_store.path_for(passport.replace('/', '_'))
+    if not stored:
+        return {'passport': passport, 'error': 'not_enrolled'}
+    try:
+        probe = make_template(io.BytesIO(data))
+    except Exception:
+        return {'passport': passport, 'error': 'invalid_image'}
+    score = _image_similarity(stored, probe)
+    return {'passport': passport, 'match': score >= 0.5, 'score': round(score, 3)}
+
+
+@app.route("/api/face/verify/batch", methods=["POST"])
+def api_face_verify_batch():
+    """Verify many (passport, image) pairs in one request, for e-gate bursts.
+    Expects multipart/form-data with repeated 'passport' fields and repeated 'image'
+    files, paired by order. Probes are decoded in parallel and every verify event is
+    written to the audit log in a single append.
+    A batch is charged as one request against the per-IP face_verify budget (an e-gate
+    behind NAT would otherwise exhaust it in a few batches); FACE_VERIFY_MAX_BATCH bounds
+    the work one request can carry.
+    """
+    passports = request.form.getlist('passport')
+    images = request.files.getlist('image')
+    if not passports or len(passports) != len(images):
+        return jsonify({"error": "equal numbers of passport fields and image files are required"}), 400
+    try:
+        max_batch = int(os.getenv('FACE_VERIFY_MAX_BATCH', '64'))
+    except Exception:
+        max_batch = 64
+    if len(passports) > max_batch:
+        return jsonify({"error": "batch_too_large", "max": max_batch}), 400
+    limited = _throttle(face_verify_limiter)
+    if limited:
+        return limited
+    try:
+        payloads = [face_ingest.read_upload(img) for img in images]
+    except face_ingest.FaceImageError as e:
+        return jsonify({"error": "invalid_image", "detail": str(e)}), e.status
+    results = list(_verify_pool.map(_verify_one, passports, payloads))
+    timestamp = datetime.utcnow().isoformat() + 'Z'
+    log_events([
+        {'type': 'verify', 'passport': r['passport'], 'timestamp': timestamp, 'match': bool(r['match']), 'score': r['score'], 'batch': True}
+        for r in results if 'match' in r
+    ])
+    return jsonify({
+        'results': results,
+        'summary': {
+            'total': len(results),
+            'matched': sum(1 for r in results if r.get('match')),
+            'errors': sum(1 for r in results if 'error' in r)
+        }
+    })
+
+
+IDENTIFY_MAX_RADIUS = DEFAULT_FACE_RADIUS * 2
+IDENTIFY_MAX_LIMIT = 100
+
+
+@app.route("/api/face/identify", methods=["POST"])
+def api_face_identify():
+    """1:N search: find enrolled passengers that match an uploaded image (admin only).
+    Expects multipart/form-data with file field 'image'; optional 'radius' (Hamming bits,
+    0..2x the index default) and 'limit' (1..100).
+    Only the perceptual-hash shortlist is compared pixel by pixel.
+    """
+    limited = _throttle(face_verify_limiter)
+    if limited:
+        return limited
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    img = request.files.get('image')
+    if not img:
+        return jsonify({"error": "image is required"}), 400
+    try:
+        raw_radius = request.form.get('radius') or request.args.get('radius')
+        # radius=0 means exact hash match only; absent means the index default
+        radius = int(raw_radius) if raw_radius not in (None, '') else None
+        if radius is not None and not 0 <= radius <= IDENTIFY_MAX_RADIUS:
+            raise ValueError('radius out of range')
+        limit = int(request.form.get('limit') or request.args.get('limit') or 20)
+        if not 1 <= limit <= IDENTIFY_MAX_LIMIT:
+            raise ValueError('limit out of range')
+    except Exception:
+        return jsonify({"error": "invalid radius or limit",
+                        "max_radius": IDENTIFY_MAX_RADIUS, "max_limit": IDENTIFY_MAX_LIMIT}), 400
+    try:
+        data = face_ingest.read_upload(img)
+    except face_ingest.FaceImageError as e:
+        return jsonify({"error": "invalid_image", "detail": str(e)}), e.status
+    try:
+        shortlist = face_index.candidates(io.BytesIO(data), radius=radius, limit=limit)
+        # decode the probe once; every candidate is compared against the same template
+        probe = make_template(io.BytesIO(data))
+    except Exception:
+        return jsonify({"error": "invalid image"}), 400
+    matches = []
+    for distance, passport in shortlist:
+        stored = face_store.path_for(passport)
+        if not stored:
+            continue
+        score = _image_similarity(stored, probe)
+        matches.append({'passport': passport, 'score': round(score, 3), 'hash_distance': distance, 'match': score >= 0.5})
+    matches.sort(key=lambda m: m['score'], reverse=True)
+    log_event({
+        'type': 'identify',
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'candidates': len(shortlist),
+        'matched': matches[0]['passport'] if matches and matches[0]['match'] else None
+    })
+    return jsonify({"candidates": len(shortlist), "enrolled": len(face_index), "matches": matches})
+
+
 @app.route('/api/consent', methods=['POST'])
 def api_consent():
     """Persist user consent server-side and log an audit event.
@@ -683,7 +1503,7 @@ def api_consent():
             'timestamp': timestamp
         }
         try:
-            save_passengers()
+            save_passengers(p)
         except Exception:
             pass
 
@@ -803,6 +1623,7 @@ def api_lookup():
 
 
 @app.route('/api/openapi.json')
+@conditional(lambda: file_version(OPENAPI_FILE), CACHE_POLICIES['openapi'])
 def api_openapi():
     try:
         return send_from_directory(os.path.dirname(OPENAPI_FILE), os.path.basename(OPENAPI_FILE), mimetype='application/json')
@@ -830,15 +1651,24 @@ def api_bookings():
     if not session:
         return jsonify({'error': 'unauthorized'}), 401
     if session.get('role') == 'admin':
-        # enrich with flight times
+        # enrich with flight times (only the requested page when paginating)
+        next_cursor, fields = None, None
+        records = passengers
+        if _wants_page(request.args):
+            try:
+                records, next_cursor, fields = _passenger_page(request.args)
+            except ValueError as e:
+                return _invalid_page(e)
         flights = {f.get('flight'): f for f in _load_flights()}
         enriched = []
-        for p in passengers:
+        for p in records:
             pe = p.copy()
             f = flights.get(pe.get('flight'))
             if f:
                 pe['_flight_time'] = f.get('time')
-            enriched.append(pe)
+            enriched.append(pagination.project(pe, fields))
+        if _wants_page(request.args):
+            return jsonify({'bookings': enriched, 'next_cursor': next_cursor}), 200
         return jsonify({'bookings': enriched}), 200
     # passenger
     passport = session.get('passport')
@@ -852,6 +1682,7 @@ def api_bookings():
 
 
 @app.route('/api/flights', methods=['GET','POST'])
+@conditional(_catalog_version, CACHE_POLICIES['flights'])
 def api_flights():
     """GET: list flights (aggregated from passengers + flights.json if present)
        POST (admin only): add a flight { flight: str, meta?: dict }
@@ -940,37 +1771,16 @@ def api_request_code():
         body = f"Hello {p.get('name')},\n\nYour one-time access code is: {code}\nIt will expire at {expires} (UTC).\n\nIf you did not request this, contact support."
         msg.set_content(body)
 
-        smtp_host = os.getenv('SMTP_HOST')
-        smtp_port = int(os.getenv('SMTP_PORT') or 0)
-        use_ssl = os.getenv('SMTP_USE_SSL', 'false').lower() in ('1','true','yes')
-
-        if not (smtp_host and smtp_port):
+        pool = smtp_pool.get_pool()
+        if pool is None:
             # can't send, but code is still set; inform caller
             log_event({'type': 'access_code_created', 'passport': passport, 'to': email, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
             return jsonify({'status': 'created_but_not_sent', 'detail': 'SMTP not configured; code generated'}), 201
 
-        if use_ssl:
-            smtp = smtplib.SMTP_SSL(smtp_host, smtp_port, timeout=10)
-        else:
-            smtp = smtplib.SMTP(smtp_host, smtp_port, timeout=10)
-            smtp.ehlo()
-            if os.getenv('SMTP_STARTTLS', 'false').lower() in ('1','true','yes'):
-                smtp.starttls()
-                smtp.ehlo()
-
-        try:
-            smtp_user = os.getenv('SMTP_USER')
-            smtp_pass = os.getenv('SMTP_PASS')
-            if smtp_user and smtp_pass:
-                smtp.login(smtp_user, smtp_pass)
-            smtp.send_message(msg)
-            log_event({'type': 'access_code_sent', 'passport': passport, 'to': email, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
-            return jsonify({'status': 'sent'}), 201
-        finally:
-            try:
-                smtp.quit()
-            except Exception:
-                pass
+        with metrics.timed('smtp_send'):
+            pool.send(msg)
+        log_event({'type': 'access_code_sent', 'passport': passport, 'to': email, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+        return jsonify({'status': 'sent'}), 201
     except Exception as e:
         log_event({'type': 'access_code_error', 'passport': passport, 'error': str(e), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
         return jsonify({'error': 'failed_to_send', 'detail': str(e)}), 500
@@ -1112,7 +1922,7 @@ def api_checkin():
         p['checked_in'] = True
 
         try:
-            save_passengers()
+            save_passengers(p)
         except Exception:
             pass
 
@@ -1151,7 +1961,7 @@ def api_baggage_pay():
         return jsonify({'error': 'insufficient_amount', 'required': fee}), 400
     p['baggage_paid'] = True
     try:
-        save_passengers()
+        save_passengers(p)
     except Exception:
         pass
     log_event({'type': 'baggage_payment', 'passport': passport, 'amount': amount, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
@@ -1172,6 +1982,7 @@ def api_flight_modify(flight_id):
     if request.method == 'DELETE':
         removed = flights.pop(idx)
         _save_flights(flights)
+        disruption_broadcaster.forget(flight_id)
         log_event({'type': 'flight_deleted', 'flight': flight_id, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
         return jsonify({'status': 'deleted', 'flight': removed}), 200
 
@@ -1201,6 +2012,7 @@ def api_flight_modify(flight_id):
     # if flight number changed, ensure no collision
     if new_flight != flight_id and any(f.get('flight') == new_flight for f in flights):
         return jsonify({'error': 'flight_exists'}), 400
+    before = {k: flights[idx].get(k) for k in ('gate', 'time', 'arrival')}
     flights[idx]['flight'] = new_flight
     flights[idx]['time'] = time_iso
     flights[idx]['capacity'] = capacity
@@ -1210,6 +2022,8 @@ def api_flight_modify(flight_id):
     flights[idx]['checkin_enabled'] = bool(checkin_enabled)
     _save_flights(flights)
     log_event({'type': 'flight_updated', 'flight': new_flight, 'time': time_iso, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+    # passenger records still reference the flight number they booked under
+    _flight_disrupted(flight_id, {k: (before[k], flights[idx].get(k)) for k in before}, by=session.get('role'))
     return jsonify({'status': 'updated', 'flight': flights[idx]}), 200
 
 
@@ -1218,11 +2032,17 @@ def api_flight_passengers(flight_id):
     session = _require_session(request, require_role='admin')
     if not session:
         return jsonify({'error': 'unauthorized'}), 401
-    matches = [p for p in passengers if p.get('flight') == flight_id]
-    return jsonify({'passengers': matches}), 200
+    if not _wants_page(request.args):
+        return jsonify({'passengers': passengers_for_flight(flight_id)}), 200
+    try:
+        records, next_cursor, fields = _passenger_page(request.args, flight_id=flight_id)
+    except ValueError as e:
+        return _invalid_page(e)
+    return jsonify({'passengers': [pagination.project(p, fields) for p in records], 'next_cursor': next_cursor}), 200
 
 
 @app.route('/api/flights/<flight_id>/seats', methods=['GET'])
+@conditional(_seats_version, CACHE_POLICIES['seats'])
 def api_flight_seats(flight_id):
     """Return a simple seat map for a flight. Not highly detailed - returns seat entries with status.
     Response: { seats: [ { seat: '1', status: 'available'|'taken'|'blocked'|'unknown', passenger?: {...} } ], flight: {...} }
@@ -1286,32 +2106,33 @@ def api_flight_seats(flight_id):
                 seats.append(f"{r}{c}")
         return seats
 
-    seats = []
-    if capacity:
-        try:
-            cap = int(capacity)
-        except Exception:
-            cap = None
-        if cap:
-            labels = _generate_seat_labels(cap)
-            for s in labels:
-                # check holds first
-                hold_entry = next((hh for hh in holds if hh.get('seat') == s), None)
-                if s in taken:
-                    seats.append({'seat': s, 'status': 'taken', 'passenger': {'name': taken[s].get('name'), 'passport': taken[s].get('passport')}})
-                elif hold_entry:
-                    seats.append({'seat': s, 'status': 'held', 'held_by': hold_entry.get('passport'), 'held_expires': hold_entry.get('expires')})
-                elif s in blocked:
-                    seats.append({'seat': s, 'status': 'blocked'})
-                else:
-                    seats.append({'seat': s, 'status': 'available'})
-    else:
-        # no capacity defined -> return known taken seats and blocked seats
-        for s, p in taken.items():
-            seats.append({'seat': s, 'status': 'taken', 'passenger': {'name': p.get('name'), 'passport': p.get('passport')}})
-        for s in (flight.get('blocked_seats') or []):
-            if not any(x['seat'] == str(s) for x in seats):
-                seats.append({'seat': str(s), 'status': 'blocked'})
+    with metrics.timed('seat_map'):
+        seats = []
+        if capacity:
+            try:
+                cap = int(capacity)
+            except Exception:
+                cap = None
+            if cap:
+                labels = _generate_seat_labels(cap)
+                for s in labels:
+                    # check holds first
+                    hold_entry = next((hh for hh in holds if hh.get('seat') == s), None)
+                    if s in taken:
+                        seats.append({'seat': s, 'status': 'taken', 'passenger': {'name': taken[s].get('name'), 'passport': taken[s].get('passport')}})
+                    elif hold_entry:
+                        seats.append({'seat': s, 'status': 'held', 'held_by': hold_entry.get('passport'), 'held_expires': hold_entry.get('expires')})
+                    elif s in blocked:
+                        seats.append({'seat': s, 'status': 'blocked'})
+                    else:
+                        seats.append({'seat': s, 'status': 'available'})
+        else:
+            # no capacity defined -> return known taken seats and blocked seats
+            for s, p in taken.items():
+                seats.append({'seat': s, 'status': 'taken', 'passenger': {'name': p.get('name'), 'passport': p.get('passport')}})
+            for s in (flight.get('blocked_seats') or []):
+                if not any(x['seat'] == str(s) for x in seats):
+                    seats.append({'seat': str(s), 'status': 'blocked'})
 
     return jsonify({'flight': flight, 'seats': seats}), 200
 
@@ -1355,7 +2176,7 @@ def api_flight_seat_select(flight_id):
     # assign seat
     p['seat'] = seat
     try:
-        save_passengers()
+        save_passengers(p)
     except Exception:
         pass
 
@@ -1400,7 +2221,7 @@ def api_flight_seat_autoassign(flight_id):
             p = {'name': '', 'passport': passport, 'flight': flight_id}
             passengers.append(p)
         p['seat'] = assigned
-        try: save_passengers()
+        try: save_passengers(p)
         except Exception: pass
         log_event({'type': 'seat_autoassign', 'flight': flight_id, 'passport': passport, 'seat': assigned, 'preference': pref, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
         return jsonify({'status': 'ok', 'seat': assigned}), 200
@@ -1415,7 +2236,7 @@ def api_flight_seat_autoassign(flight_id):
         p = {'name': '', 'passport': passport, 'flight': flight_id}
         passengers.append(p)
     p['seat'] = assigned
-    try: save_passengers()
+    try: save_passengers(p)
     except Exception: pass
 
     log_event({'type': 'seat_autoassign', 'flight': flight_id, 'passport': passport, 'seat': assigned, 'preference': pref, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
@@ -1540,7 +2361,7 @@ def api_passenger_override(passport):
     # record override metadata
     p.setdefault('admin_overrides', []).append({'action': action, 'note': note, 'by': session.get('role'), 'when': datetime.utcnow().isoformat() + 'Z'})
     try:
-        save_passengers()
+        save_passengers(p)
     except Exception:
         pass
     log_event({'type': 'admin_override', 'passport': passport, 'action': action, 'note': note, 'admin': session.get('passport'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
@@ -1566,7 +2387,7 @@ def api_passenger_seat(passport):
             return jsonify({'error': 'seat_taken', 'by': conflict.get('passport')}), 400
     p['seat'] = seat
     try:
-        save_passengers()
+        save_passengers(p)
     except Exception:
         pass
     log_event({'type': 'seat_assigned', 'passport': passport, 'seat': seat, 'by': session.get('role'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
@@ -1625,7 +2446,10 @@ def api_flight_boarding(flight_id):
     else:
         return jsonify({'error': 'unknown_action'}), 400
     _save_boarding_state(state)
-    log_event({'type': 'boarding_action', 'flight': flight_id, 'action': action, 'by': session.get('role'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+    event = {'type': 'boarding_action', 'flight': flight_id, 'action': action, 'by': session.get('role'), 'timestamp': datetime.utcnow().isoformat() + 'Z'}
+    if action == 'mark_boarded':
+        event['passport'] = data.get('passport')
+    log_event(event)
     return jsonify({'status': 'ok', 'state': state.get(flight_id)}), 200
 
 
@@ -1635,28 +2459,30 @@ def api_admin_dashboard_stats():
     if not session:
         return jsonify({'error': 'unauthorized'}), 401
     
-    # Calculate statistics
-    total_passengers = len(passengers)
-    total_flights = len(_load_flights())
+    # Read the maintained counters instead of scanning passengers
+    agg = _aggregates()
+    totals = agg.totals()
+    status_counts, total_flights = agg.flight_status()
+    total_passengers = totals['bookings']
     
     # Check-in statistics
-    checked_in_count = sum(1 for p in passengers if p.get('checked_in', False))
+    checked_in_count = totals['checked_in']
     check_in_rate = (checked_in_count / total_passengers * 100) if total_passengers > 0 else 0
     
     # Flight statistics
-    flights = _load_flights()
-    active_flights = sum(1 for f in flights if f.get('status') == 'active')
-    cancelled_flights = sum(1 for f in flights if f.get('status') == 'cancelled')
+    active_flights = status_counts.get('active', 0)
+    cancelled_flights = status_counts.get('cancelled', 0)
     
     # Baggage statistics
-    total_baggage = sum(int(p.get('baggage_count', 0)) for p in passengers)
-    baggage_fees = sum(float(p.get('baggage_fee', 0)) for p in passengers)
+    total_baggage = totals['bags']
+    baggage_fees = totals['fees']
     
     return jsonify({
         'passengers': {
             'total': total_passengers,
             'checked_in': checked_in_count,
-            'check_in_rate': round(check_in_rate, 2)
+            'check_in_rate': round(check_in_rate, 2),
+            'boarded': totals['boarded']
         },
         'flights': {
             'total': total_flights,
@@ -1686,10 +2512,12 @@ def api_admin_flights_bulk():
     flights = _load_flights()
     results = []
     
+    changed = []
     if action == 'cancel':
         for flight_id in flight_ids:
             flight = next((f for f in flights if f['flight'] == flight_id), None)
             if flight:
+                changed.append((flight_id, flight.get('status')))
                 flight['status'] = 'cancelled'
                 results.append({'flight': flight_id, 'status': 'cancelled'})
     
@@ -1697,15 +2525,37 @@ def api_admin_flights_bulk():
         for flight_id in flight_ids:
             flight = next((f for f in flights if f['flight'] == flight_id), None)
             if flight:
+                changed.append((flight_id, flight.get('status')))
                 flight['status'] = 'active'
                 results.append({'flight': flight_id, 'status': 'active'})
     
     _save_flights(flights)
+    new_status = 'cancelled' if action == 'cancel' else 'active'
+    for flight_id, old_status in changed:
+        _flight_disrupted(flight_id, {'status': (old_status, new_status)}, by=session.get('role'))
     return jsonify({'status': 'success', 'results': results}), 200
 
+@app.route('/api/admin/flights/<flight_id>/disruptions', methods=['GET', 'POST'])
+def api_admin_flight_disruptions(flight_id):
+    """Disruption broadcasts for a flight with delivery stats.
+       GET: pending (coalescing) changes and past broadcasts, newest first
+       POST: { action: 'flush' } sends the pending broadcast without waiting for the window
+    """
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        if data.get('action') != 'flush':
+            return jsonify({'error': 'unknown_action'}), 400
+        disruption_broadcaster.flush(flight_id)
+    return jsonify(disruption_broadcaster.broadcasts(flight_id)), 200
+
+
 @app.route('/api/admin/flights', methods=['GET', 'POST', 'PUT', 'DELETE'])
+@conditional(_flights_version, CACHE_POLICIES['admin'], guard=_admin_guard)
 def api_admin_flights():
-    session = _require_session(request, require_role='admin')
+    session = _admin_session()
     if not session:
         return jsonify({'error': 'unauthorized'}), 401
 
@@ -1737,8 +2587,9 @@ def api_admin_flights():
         return jsonify({'status': 'success', 'flight': new_flight}), 201
 
 @app.route('/api/admin/flights/<flight_id>', methods=['GET', 'PUT', 'DELETE'])
+@conditional(_flights_version, CACHE_POLICIES['admin'], guard=_admin_guard)
 def api_admin_flight(flight_id):
-    session = _require_session(request, require_role='admin')
+    session = _admin_session()
     if not session:
         return jsonify({'error': 'unauthorized'}), 401
 
@@ -1771,6 +2622,7 @@ def api_admin_flight(flight_id):
     if request.method == 'DELETE':
         deleted_flight = flights.pop(flight_index)
         _save_flights(flights)
+        disruption_broadcaster.forget(flight_id)
         return jsonify({'status': 'success', 'deleted': deleted_flight}), 200
 
 
@@ -1833,48 +2685,200 @@ def api_admin_generate_report():
         return jsonify({'error': 'Report type required'}), 400
     
     report_type = data['type']
-    date_range = data.get('date_range', {})
+    date_range = data.get('date_range') or {}
     start_date = date_range.get('start')
     end_date = date_range.get('end')
+    group_by = data.get('group_by')
+    if group_by not in (None, 'flight', 'airline'):
+        return jsonify({'error': 'group_by must be flight or airline'}), 400
+    try:
+        start_ts = parse_bound(start_date)
+        end_ts = parse_bound(end_date, end=True)
+    except ValueError as e:
+        return jsonify({'error': 'invalid_date_range', 'detail': str(e)}), 400
+    # date_range selects by the departure time of the booked flight
+    filtered = start_ts is not None or end_ts is not None or bool(data.get('flights')) or data.get('airline') is not None
     
+    snap = mask = None
+    if report_type in ('passenger_activity', 'revenue') and (filtered or group_by):
+        snap = analytics_engine.snapshot()
+        mask = snap.mask(start_ts, end_ts, flights=data.get('flights'), airline=data.get('airline'))
+        totals = snap.totals(mask)
+    else:
+        totals = _aggregates().totals()
     if report_type == 'passenger_activity':
         report_data = {
-            'total_passengers': len(passengers),
-            'check_ins': sum(1 for p in passengers if p.get('checked_in', False)),
+            'total_passengers': totals['bookings'],
+            'check_ins': totals['checked_in'],
+            'boarded': totals['boarded'],
             'baggage_data': {
-                'total_items': sum(int(p.get('baggage_count', 0)) for p in passengers),
-                'total_fees': sum(float(p.get('baggage_fee', 0)) for p in passengers)
+                'total_items': totals['bags'],
+                'total_fees': totals['fees']
             }
         }
     
     elif report_type == 'flight_performance':
-        flights = _load_flights()
+        selected = None
+        if filtered or group_by:
+            # flights are few; filter the list directly
+            flights = _load_flights()
+            wanted = set(data.get('flights') or [])
+            selected = []
+            for f in flights:
+                try:
+                    dep = parse_bound(f.get('time'))
+                except ValueError:
+                    dep = None
+                if start_ts is not None and (dep is None or dep < start_ts):
+                    continue
+                if end_ts is not None and (dep is None or dep > end_ts):
+                    continue
+                if wanted and f.get('flight') not in wanted:
+                    continue
+                if data.get('airline') is not None and f.get('airline') != data.get('airline'):
+                    continue
+                selected.append(f)
+            status_counts = {}
+            for f in selected:
+                status_counts[f.get('status')] = status_counts.get(f.get('status'), 0) + 1
+            total_flights = len(selected)
+        else:
+            status_counts, total_flights = _aggregates().flight_status()
         report_data = {
-            'total_flights': len(flights),
+            'total_flights': total_flights,
             'status_breakdown': {
-                'active': sum(1 for f in flights if f.get('status') == 'active'),
-                'completed': sum(1 for f in flights if f.get('status') == 'completed'),
-                'cancelled': sum(1 for f in flights if f.get('status') == 'cancelled')
+                'active': status_counts.get('active', 0),
+                'completed': status_counts.get('completed', 0),
+                'cancelled': status_counts.get('cancelled', 0)
             }
         }
+        if group_by:
+            groups = {}
+            for f in selected:
+                key = f.get(group_by) or 'unassigned'
+                g_entry = groups.setdefault(key, {'flights': 0, 'status_breakdown': {'active': 0, 'completed': 0, 'cancelled': 0}})
+                g_entry['flights'] += 1
+                if f.get('status') in g_entry['status_breakdown']:
+                    g_entry['status_breakdown'][f.get('status')] += 1
+            report_data['by_' + group_by] = groups
     
     elif report_type == 'revenue':
         report_data = {
-            'baggage_fees': sum(float(p.get('baggage_fee', 0)) for p in passengers),
-            'paid_fees': sum(float(p.get('baggage_fee', 0)) for p in passengers if p.get('baggage_paid', False))
+            'baggage_fees': totals['fees'],
+            'paid_fees': totals['paid_fees']
         }
     
     else:
         return jsonify({'error': 'Invalid report type'}), 400
     
+    if snap is not None and group_by:
+        report_data['by_' + group_by] = snap.group_by(group_by, mask)
+    
     return jsonify({
         'report_type': report_type,
         'date_range': {'start': start_date, 'end': end_date},
         'data': report_data
     }), 200
 
+
+@app.route('/api/admin/reports/snapshot', methods=['GET'])
+def api_admin_report_snapshot():
+    """Download the columnar passenger snapshot as a compressed NumPy .npz archive
+    (one array per column plus label tables; load with PassengerSnapshot.from_bytes
+    or numpy.load(..., allow_pickle=False))."""
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    snap = analytics_engine.snapshot(force=request.args.get('refresh') == '1')
+    resp = Response(snap.to_bytes(), mimetype='application/octet-stream')
+    resp.headers['Content-Disposition'] = 'attachment; filename=passengers_snapshot.npz'
+    resp.headers['X-Snapshot-Rows'] = str(len(snap))
+    return resp
+
+def _notification_items(notification_type, recipients):
+    """Resolve passports to dispatcher items with one pass over passengers."""
+    by_passport = {}
+    for p in passengers:
+        by_passport.setdefault(p.get('passport'), p)
+    smtp_ready = notification_type != 'email' or smtp_pool.get_pool() is not None
+    items = []
+    for recipient in recipients:
+        passenger = by_passport.get(recipient)
+        item = {'recipient': recipient, 'passenger': passenger}
+        if not passenger:
+            item['skip'] = 'passenger_not_found'
+        elif notification_type == 'email':
+            email = passenger.get('email')
+            if not email:
+                item['skip'] = 'no_email'
+            elif not smtp_ready:
+                item['skip'] = 'smtp_not_configured'
+            else:
+                item['domain'] = email.rsplit('@', 1)[-1].lower()
+        elif notification_type == 'sms':
+            if not passenger.get('phone'):
+                item['skip'] = 'no_phone'
+            else:
+                item['domain'] = 'sms'
+        else:
+            item['skip'] = 'unsupported_type'
+        items.append(item)
+    return items
+
+
+def _send_passenger_message(channel, passenger, subject, message):
+    """Deliver one notification; returns the method used, raises on failure."""
+    if channel == 'email':
+        pool = smtp_pool.get_pool()
+        if pool is None:
+            raise RuntimeError('SMTP not configured')
+        msg = EmailMessage()
+        msg['Subject'] = subject
+        msg['From'] = os.getenv('SMTP_FROM') or os.getenv('SMTP_USER')
+        msg['To'] = passenger['email']
+        msg.set_content(message)
+        with metrics.timed('smtp_send'):
+            pool.send(msg)
+        return 'email'
+    # SMS notification logic would go here
+    # For now, we'll just log it
+    return 'sms'
+
+
+def _notification_sender(notification_type, subject, message):
+    return lambda item: _send_passenger_message(notification_type, item['passenger'], subject, message)
+
+
+def _send_disruption(item):
+    method = _send_passenger_message(item['channel'], item['passenger'], item['subject'], item['message'])
+    log_event({'type': 'disruption_notified', 'passport': item['recipient'], 'method': method, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+    return method
+
+
+# Gate/time/status changes fan out to every booked passenger, coalesced per flight
+disruption_broadcaster = DisruptionBroadcaster(
+    notification_dispatcher, passengers_for_flight, _send_disruption,
+    coalesce_seconds=float(os.getenv('DISRUPTION_COALESCE_SECONDS') or 30),
+    max_delay_seconds=float(os.getenv('DISRUPTION_MAX_DELAY_SECONDS') or 120)
+)
+
+
+def _flight_disrupted(flight_id, changes, by=None):
+    """Log a flight change and queue the passenger broadcast. changes: {field: (old, new)}."""
+    changes = {k: v for k, v in changes.items() if v[0] != v[1]}
+    if not changes:
+        return
+    log_event({'type': 'flight_disruption', 'flight': flight_id, 'changes': {k: {'from': o, 'to': n} for k, (o, n) in changes.items()}, 'by': by, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+    if os.getenv('DISRUPTION_NOTIFY', 'true').lower() in ('1', 'true', 'yes'):
+        disruption_broadcaster.flight_changed(flight_id, changes)
+
+
 @app.route('/api/admin/notifications/send', methods=['POST'])
 def api_admin_send_notification():
+    """Queue a notification to many passengers and return a job id immediately.
+    Body: { type: 'email'|'sms', recipients: [passport], message: str, subject?: str }
+    Poll GET /api/admin/notifications/<job_id> or stream /api/admin/notifications/<job_id>/stream.
+    """
     session = _require_session(request, require_role='admin')
     if not session:
         return jsonify({'error': 'unauthorized'}), 401
@@ -1885,62 +2889,59 @@ def api_admin_send_notification():
     
     notification_type = data['type']
     recipients = data['recipients']
+    if not isinstance(recipients, list):
+        return jsonify({'error': 'recipients must be a list'}), 400
+    subject = data.get('subject', 'Important Flight Information')
     message = data['message']
-    
-    success_count = 0
-    failed_count = 0
-    results = []
-    
-    for recipient in recipients:
-        passenger = next((p for p in passengers if p['passport'] == recipient), None)
-        if passenger:
-            try:
-                if notification_type == 'email' and passenger.get('email'):
-                    # Send email notification
-                    msg = EmailMessage()
-                    msg['Subject'] = data.get('subject', 'Important Flight Information')
-                    msg['From'] = os.getenv('SMTP_FROM') or os.getenv('SMTP_USER')
-                    msg['To'] = passenger['email']
-                    msg.set_content(message)
-                    
-                    smtp_host = os.getenv('SMTP_HOST')
-                    smtp_port = int(os.getenv('SMTP_PORT') or 0)
-                    if smtp_host and smtp_port:
-                        with smtplib.SMTP(smtp_host, smtp_port) as smtp:
-                            smtp.send_message(msg)
-                            success_count += 1
-                            results.append({
-                                'recipient': recipient,
-                                'status': 'sent',
-                                'method': 'email'
-                            })
-                    
-                elif notification_type == 'sms' and passenger.get('phone'):
-                    # SMS notification logic would go here
-                    # For now, we'll just log it
-                    success_count += 1
-                    results.append({
-                        'recipient': recipient,
-                        'status': 'sent',
-                        'method': 'sms'
-                    })
-            except Exception as e:
-                failed_count += 1
-                results.append({
-                    'recipient': recipient,
-                    'status': 'failed',
-                    'error': str(e)
-                })
-    
+
+    job = notification_dispatcher.submit(
+        notification_type,
+        _notification_items(notification_type, recipients),
+        _notification_sender(notification_type, subject, message)
+    )
+    log_event({'type': 'notification_queued', 'job_id': job.id, 'method': notification_type, 'recipients': len(recipients), 'by': session.get('role'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
     return jsonify({
-        'status': 'completed',
-        'summary': {
-            'total': len(recipients),
-            'success': success_count,
-            'failed': failed_count
-        },
-        'results': results
-    }), 200
+        'status': 'queued',
+        'job_id': job.id,
+        'progress_url': f"/api/admin/notifications/{job.id}",
+        'summary': job.to_dict(include_results=False)['summary']
+    }), 202
+
+
+@app.route('/api/admin/notifications/<job_id>', methods=['GET'])
+def api_admin_notification_job(job_id):
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    job = notification_dispatcher.get(job_id)
+    if not job:
+        return jsonify({'error': 'job_not_found'}), 404
+    include_results = (request.args.get('results') or '1').lower() not in ('0', 'false', 'no')
+    return jsonify(job.to_dict(include_results=include_results)), 200
+
+
+@app.route('/api/admin/notifications/<job_id>/stream')
+def api_admin_notification_stream(job_id):
+    # SSE stream of job progress until the job completes (admin only)
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    job = notification_dispatcher.get(job_id)
+    if not job:
+        return jsonify({'error': 'job_not_found'}), 404
+
+    def event_stream():
+        last = None
+        while True:
+            if job.version != last:
+                last = job.version
+                yield f"data: {json.dumps(job.to_dict(include_results=False))}\n\n"
+            if job.done.is_set() and job.version == last:
+                break
+            job.done.wait(1)
+
+    headers = { 'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no' }
+    return Response(stream_with_context(event_stream()), headers=headers)
 
 @app.route('/api/admin/passengers/<passport>', methods=['GET', 'PUT', 'DELETE'])
 def api_admin_passenger(passport):
@@ -1992,7 +2993,7 @@ def api_admin_passenger(passport):
                 passengers[idx][k] = v
                 changed[k] = v
         try:
-            save_passengers()
+            save_passengers(passengers[idx])
         except Exception:
             pass
         log_event({'type': 'admin_update_passenger', 'passport': passport, 'flight': passengers[idx].get('flight'), 'changed': changed, 'by': session.get('role'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
@@ -2042,21 +3043,45 @@ def api_boarding_stream(flight_id):
     return Response(stream_with_context(event_stream()), headers=headers)
 
 
+@app.route('/api/admin/jobs', methods=['GET', 'POST'])
+def api_admin_jobs():
+    """Local job queue status.
+       GET: counts per status plus the most recent dead-lettered jobs
+       POST: { action: 'requeue', job_id } to retry a dead-lettered job
+    """
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    if request.method == 'GET':
+        return jsonify({'backend': 'rq' if RQ_QUEUE is not None else 'sqlite', 'counts': job_queue.stats(), 'dead': job_queue.dead_letters(50)}), 200
+    data = request.get_json() or {}
+    if data.get('action') != 'requeue' or not data.get('job_id'):
+        return jsonify({'error': 'action requeue and job_id required'}), 400
+    if not job_queue.requeue(data['job_id']):
+        return jsonify({'error': 'job_not_found'}), 404
+    if job_workers is not None:
+        job_workers.notify()
+    return jsonify({'status': 'requeued', 'job_id': data['job_id']}), 200
+
+
 @app.route('/api/analytics', methods=['GET'])
 def api_analytics():
     session = _require_session(request, require_role='admin')
     if not session:
         return jsonify({'error': 'unauthorized'}), 401
-    total_bookings = len(passengers)
-    checked_in = sum(1 for p in passengers if p.get('checked_in'))
-    baggage_total = sum(int(p.get('baggage_count') or 0) for p in passengers)
+    agg = _aggregates()
+    totals = agg.totals()
+    total_bookings = totals['bookings']
+    checked_in = totals['checked_in']
+    baggage_total = totals['bags']
     flights = _load_flights()
     per_flight = {}
     for f in flights:
         fn = f.get('flight')
+        counts = agg.flight(fn)
         per_flight[fn] = {
-            'bookings': sum(1 for p in passengers if p.get('flight') == fn),
-            'checked_in': sum(1 for p in passengers if p.get('flight') == fn and p.get('checked_in'))
+            'bookings': counts['bookings'],
+            'checked_in': counts['checked_in']
         }
     return jsonify({'total_bookings': total_bookings, 'checked_in': checked_in, 'baggage_total': baggage_total, 'per_flight': per_flight}), 200
 
@@ -2080,46 +3105,58 @@ def api_flight_checkin_toggle(flight_id):
     return jsonify({'status': 'ok', 'flight': flights[idx]}), 200
 
 
+@app.route('/api/admin/auth/metrics', methods=['GET'])
+def api_admin_auth_metrics():
+    """Password hashing pool metrics (latency percentiles, queue depth, rejections)
+    and session cache hit rates."""
+    session = _require_session(request, require_role='admin')
+    if not session:
+        return jsonify({'error': 'unauthorized'}), 401
+    body = password_hasher.metrics()
+    body['session_cache'] = session_cache.stats()
+    return jsonify(body), 200
+
+
 @app.route('/api/admin/login', methods=['POST'])
 def api_admin_login():
     data = request.get_json()
     if not data or 'username' not in data or 'password' not in data:
         return jsonify({'error': 'Missing username or password'}), 400
     
-    users = _load_admin_users()
     username = data['username']
     password = data['password']
-    
-    if username in users:
-        stored_hash = users[username]['password_hash']
+    try:
+        ok = _check_admin_password(username, password)
+    except HasherBusy:
+        return _hasher_busy_response()
+    except Exception:
+        ok = False
+
+    if ok:
+        # admin sessions have a short TTL for the admin portal (seconds), configurable via ADMIN_SESSION_TTL_SECONDS
         try:
-                if bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
-                    # admin sessions have a short TTL for the admin portal (seconds), configurable via ADMIN_SESSION_TTL_SECONDS
-                    try:
-                        # Default admin session TTL to 1 hour unless overridden
-                        admin_ttl = float(os.getenv('ADMIN_SESSION_TTL_SECONDS', '3600'))
-                    except Exception:
-                        admin_ttl = 3600.0
-                    token, expires = _create_session('admin', None, ttl_seconds=admin_ttl)
-                log_event({
-                    'type': 'admin_login',
-                    'username': username,
-                    'timestamp': datetime.utcnow().isoformat() + 'Z'
-                })
-                resp = jsonify({
-                    'token': token,
-                    'role': 'admin',
-                    'expires': expires,
-                    'username': username
-                })
-                try:
-                    # set a cookie so browser navigation to admin pages includes session
-                    resp.set_cookie('session', token, max_age=int(admin_ttl), httponly=True, samesite='Lax')
-                except Exception:
-                    pass
-                return resp, 200
+            # Default admin session TTL to 1 hour unless overridden
+            admin_ttl = float(os.getenv('ADMIN_SESSION_TTL_SECONDS', '3600'))
+        except Exception:
+            admin_ttl = 3600.0
+        token, expires = _create_session('admin', None, ttl_seconds=admin_ttl)
+        log_event({
+            'type': 'admin_login',
+            'username': username,
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        })
+        resp = jsonify({
+            'token': token,
+            'role': 'admin',
+            'expires': expires,
+            'username': username
+        })
+        try:
+            # set a cookie so browser navigation to admin pages includes session
+            resp.set_cookie('session', token, max_age=int(admin_ttl), httponly=True, samesite='Lax')
         except Exception:
             pass
+        return resp, 200
     
     return jsonify({'error': 'Invalid credentials'}), 401
 
@@ -2140,7 +3177,9 @@ def api_admin_users():
             return jsonify({'error': 'username_and_password_required'}), 400
         users = _load_admin_users()
         try:
-            ph = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            ph = password_hasher.hash(password)
+        except HasherBusy:
+            return _hasher_busy_response()
         except Exception:
             ph = password
         users[username] = {'password_hash': ph}
@@ -2167,6 +3206,9 @@ def api_login():
     For admin: { role: 'admin', username: <str>, password: <str> }
     Returns { token, role, expires }
     """
+    limited = _throttle(login_limiter)
+    if limited:
+        return limited
     data = request.get_json() or {}
     role = (data.get('role') or '').lower()
 
@@ -2210,7 +3252,7 @@ def api_login():
             p['checked_in'] = False
             passengers.append(p)
             try:
-                save_passengers()
+                save_passengers(p)
             except Exception:
                 pass
             log_event({'type': 'passenger_created_via_login', 'passport': p.get('passport'), 'email': p.get('email'), 'phone': p.get('phone'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
@@ -2225,7 +3267,7 @@ def api_login():
                 p['phone'] = phone; updated = True
             if updated:
                 try:
-                    save_passengers()
+                    save_passengers(p)
                 except Exception:
                     pass
 
@@ -2235,6 +3277,10 @@ def api_login():
         return jsonify({'token': token, 'role': 'passenger', 'expires': expires}), 200
 
     if role == 'admin':
+        client_ip = request.remote_addr or 'unknown'
+        allowed, _msg = security_manager.check_rate_limit(client_ip)
+        if not allowed:
+            return jsonify({'error': 'too_many_failed_attempts'}), 429
         username = data.get('username')
         password = data.get('password')
         master_pw = os.getenv('MASTER_ACCESS')
@@ -2250,30 +3296,22 @@ def api_login():
             return jsonify({'token': token, 'role': 'admin', 'expires': expires}), 200
 
         # Check admin users file (hashed password)
-        users = _load_admin_users()
-        if username and password and username in users:
-            stored = users[username].get('password_hash')
+        try:
+            ok = _check_admin_password(username, password)
+        except HasherBusy:
+            return _hasher_busy_response()
+        except Exception:
+            ok = False
+        if ok:
             try:
-                # If bcrypt is available and stored value looks like a bcrypt hash, verify
-                if stored and stored.startswith('$2'):
-                    ok = False
-                    try:
-                        ok = bcrypt.checkpw(password.encode('utf-8'), stored.encode('utf-8'))
-                    except Exception:
-                        ok = False
-                else:
-                    ok = (password == stored)
+                admin_ttl = float(os.getenv('ADMIN_SESSION_TTL_SECONDS', '3600'))
             except Exception:
-                ok = False
-            if ok:
-                try:
-                    admin_ttl = float(os.getenv('ADMIN_SESSION_TTL_SECONDS', '3600'))
-                except Exception:
-                    admin_ttl = 3600.0
-                token, expires = _create_session('admin', None, ttl_seconds=admin_ttl)
-                log_event({'type': 'login', 'role': 'admin', 'username': username, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
-                return jsonify({'token': token, 'role': 'admin', 'expires': expires}), 200
+                admin_ttl = 3600.0
+            token, expires = _create_session('admin', None, ttl_seconds=admin_ttl)
+            log_event({'type': 'login', 'role': 'admin', 'username': username, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+            return jsonify({'token': token, 'role': 'admin', 'expires': expires}), 200
 
+        security_manager.log_failed_attempt(client_ip)
         return jsonify({'error': 'invalid_credentials'}), 403
 
     return jsonify({'error': 'unknown_role'}), 400
@@ -2287,16 +3325,29 @@ def api_logout():
     return jsonify({'status': 'ok'})
 
 
+@metrics.timed('session')
 def _require_session(request, require_role=None):
     token = request.headers.get('X-SESSION') or request.cookies.get('session')
     entry = _get_session(token)
     if not entry:
         return None
     if require_role and entry.get('role') != require_role:
+        if require_role == 'admin':
+            _log_admin_activity(entry, 'unauthorized_access_attempt', {'endpoint': request.endpoint})
         return None
+    if require_role == 'admin':
+        _log_admin_activity(entry, 'api_access', {'endpoint': request.endpoint, 'method': request.method})
     return entry
 
 
+def _log_admin_activity(entry, action, details):
+    # every admin route authenticates here, so this feeds the audit log behind /api/admin/activity
+    try:
+        security_manager.log_activity(entry.get('passport') or entry.get('role'), action, details)
+    except Exception:
+        pass
+
+
 # Serve admin static files only to authenticated admin sessions.
 @app.route('/admin')
 @app.route('/admin/')
@@ -2323,6 +3374,9 @@ def admin_files(filename):
         base = os.path.basename(lower)
         if base not in allowed_html:
             return redirect('/admin/dashboard.html')
+    resp = static_assets.response('admin/' + filename, request, cache_control='private, no-cache')
+    if resp is not None:
+        return resp
     return send_from_directory(admin_dir, filename)
 
 
@@ -2334,7 +3388,7 @@ def admin_login_page():
     if err:
         msg = '<p style="color:crimson">Invalid credentials, please try again.</p>'
     html = f'''<!doctype html>
-<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1"><title>Admin Login</title><link rel="stylesheet" href="/style.css"></head>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1"><title>Admin Login</title><link rel="stylesheet" href="{static_assets.url_for('style.css')}"></head>
 <body><main class="container" style="max-width:420px;margin:4rem auto;padding:2rem;background:#fff;border-radius:8px;box-shadow:0 6px 18px rgba(0,0,0,0.08)">
 <h2>Admin Login</h2>
 {msg}
@@ -2354,25 +3408,25 @@ def admin_login_server():
     password = request.form.get('password') or ''
     if not username or not password:
         return redirect('/admin-login.html?error=1')
-    users = _load_admin_users()
-    if username in users:
-        stored_hash = users[username].get('password_hash')
+    try:
+        ok = _check_admin_password(username, password)
+    except HasherBusy:
+        return 'Too many concurrent sign-ins, please retry shortly', 503, {'Retry-After': '1'}
+    except Exception:
+        ok = False
+    if ok:
         try:
-            if bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
-                try:
-                    admin_ttl = float(os.getenv('ADMIN_SESSION_TTL_SECONDS', '3600'))
-                except Exception:
-                    admin_ttl = 3600.0
-                token, expires = _create_session('admin', None, ttl_seconds=admin_ttl)
-                log_event({'type': 'admin_login', 'username': username, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
-                resp = redirect('/admin/dashboard.html')
-                try:
-                    resp.set_cookie('session', token, max_age=int(admin_ttl), httponly=True, samesite='Lax')
-                except Exception:
-                    pass
-                return resp
+            admin_ttl = float(os.getenv('ADMIN_SESSION_TTL_SECONDS', '3600'))
+        except Exception:
+            admin_ttl = 3600.0
+        token, expires = _create_session('admin', None, ttl_seconds=admin_ttl)
+        log_event({'type': 'admin_login', 'username': username, 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+        resp = redirect('/admin/dashboard.html')
+        try:
+            resp.set_cookie('session', token, max_age=int(admin_ttl), httponly=True, samesite='Lax')
         except Exception:
             pass
+        return resp
     return redirect('/admin-login.html?error=1')
 
 
@@ -2382,10 +3436,14 @@ def serve_root_admin_html():
     session = _require_session(request, require_role='admin')
     if not session:
         return redirect('/admin-login.html')
+    resp = static_assets.response('admin.html', request, cache_control='private, no-cache')
+    if resp is not None:
+        return resp
     frontend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend'))
     return send_from_directory(frontend_dir, 'admin.html')
 
 
+@metrics.timed('render_boarding_pass')
 def create_boarding_pass_image(p):
     width, height = 800, 400
     bg = Image.new('RGB', (width, height), color=(255,255,255))
@@ -2414,15 +3472,12 @@ def create_boarding_pass_image(p):
 
 
 def send_boarding_pass_email(passenger):
-    # SMTP configuration via env vars
+    # SMTP configuration via env vars; connections come from the shared pool
+    pool = smtp_pool.get_pool()
     smtp_host = os.getenv('SMTP_HOST')
-    smtp_port = int(os.getenv('SMTP_PORT') or 0)
-    smtp_user = os.getenv('SMTP_USER')
-    smtp_pass = os.getenv('SMTP_PASS')
-    smtp_from = os.getenv('SMTP_FROM') or smtp_user
-    use_ssl = os.getenv('SMTP_USE_SSL', 'false').lower() in ('1','true','yes')
+    smtp_from = os.getenv('SMTP_FROM') or os.getenv('SMTP_USER')
 
-    if not (smtp_host and smtp_port and smtp_from):
+    if not (pool and smtp_from):
         # SMTP not configured
         raise RuntimeError('SMTP not configured')
 
@@ -2454,23 +3509,14 @@ def send_boarding_pass_email(passenger):
     })
 
     # Send
-    if use_ssl:
-        smtp = smtplib.SMTP_SSL(smtp_host, smtp_port, timeout=10)
-    else:
-        smtp = smtplib.SMTP(smtp_host, smtp_port, timeout=10)
-        smtp.ehlo()
-        if os.getenv('SMTP_STARTTLS', 'false').lower() in ('1','true','yes'):
-            smtp.starttls()
-            smtp.ehlo()
-
     try:
-        if smtp_user and smtp_pass:
-            smtp.login(smtp_user, smtp_pass)
-        smtp.send_message(msg)
+        with metrics.timed('smtp_send'):
+            pool.send(msg)
         # success log
         log_event({
             'type': 'email_sent',
             'passport': passenger.get('passport'),
+            'flight': passenger.get('flight'),
             'to': passenger.get('email'),
             'timestamp': __import__('datetime').datetime.utcnow().isoformat() + 'Z',
             'status': 'ok'
@@ -2480,86 +3526,98 @@ def send_boarding_pass_email(passenger):
         log_event({
             'type': 'email_sent',
             'passport': passenger.get('passport'),
+            'flight': passenger.get('flight'),
             'to': passenger.get('email'),
             'timestamp': __import__('datetime').datetime.utcnow().isoformat() + 'Z',
             'status': 'error',
             'detail': str(e)
         })
         raise
-    finally:
-        try:
-            smtp.quit()
-        except Exception:
-            pass
 
 
-def _email_worker(passenger):
+def send_boarding_email_job(passenger):
+    """Queue task: send the boarding pass email. Re-raises so the queue can retry."""
     try:
         send_boarding_pass_email(passenger)
-        log_event({'type': 'email_sent_background', 'passport': passenger.get('passport'), 'to': passenger.get('email'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
     except Exception as e:
         log_event({'type': 'email_send_failed_background', 'passport': passenger.get('passport'), 'error': str(e), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+        raise
+    log_event({'type': 'email_sent_background', 'passport': passenger.get('passport'), 'to': passenger.get('email'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
 
 
 def enqueue_boarding_email(passenger):
     """Enqueue sending boarding pass email.
-    Prefer RQ/Redis if available; fall back to background thread otherwise.
+    Prefer RQ/Redis if available; fall back to the durable local job queue otherwise.
     """
     try:
         if RQ_QUEUE is not None:
             try:
-                # enqueue the function by import path (app.send_boarding_pass_email)
-                RQ_QUEUE.enqueue('app.send_boarding_pass_email', passenger)
+                # enqueue the function by import path (app.send_boarding_email_job)
+                RQ_QUEUE.enqueue('app.send_boarding_email_job', passenger)
                 log_event({'type': 'email_rq_enqueued', 'passport': passenger.get('passport'), 'to': passenger.get('email'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
                 return
             except Exception as e:
                 log_event({'type': 'email_rq_enqueue_failed', 'passport': passenger.get('passport'), 'error': str(e), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
 
-        # fallback to thread-based enqueue
-        t = threading.Thread(target=_email_worker, args=(passenger,), daemon=True)
-        t.start()
-        log_event({'type': 'email_thread_queued', 'passport': passenger.get('passport'), 'to': passenger.get('email'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+        job_id = job_queue.enqueue('app.send_boarding_email_job', dict(passenger), priority=10,
+                                   max_attempts=int(os.getenv('JOBS_EMAIL_MAX_ATTEMPTS') or 5))
+        if job_workers is not None:
+            job_workers.notify()
+        log_event({'type': 'email_job_queued', 'job_id': job_id, 'passport': passenger.get('passport'), 'to': passenger.get('email'), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
     except Exception as e:
         log_event({'type': 'email_queue_failed', 'passport': passenger.get('passport'), 'error': str(e), 'timestamp': datetime.utcnow().isoformat() + 'Z'})
 
+# Hashed + precompressed copies of frontend/, built once at startup (see static_assets.py)
+# (app.debug is also checked per request, since `python app.py` only turns it on in app.run)
+static_assets = StaticAssets(FRONTEND_DIR, reload=os.getenv('STATIC_RELOAD', '0').lower() in ('1', 'true', 'yes')).build()
+
+
+def _frontend_file(path, mimetype=None):
+    resp = static_assets.response(path, request)
+    if resp is not None:
+        return resp
+    # not in the manifest (e.g. added after startup)
+    return send_from_directory(FRONTEND_DIR, path, mimetype=mimetype)
+
+
 # Serve frontend files (single, canonical handlers)
 @app.route("/", defaults={'path': 'index.html'})
 @app.route("/<path:path>")
 def index(path):
     try:
-        return send_from_directory(FRONTEND_DIR, path)
+        return _frontend_file(path)
     except Exception:
-        return send_from_directory(FRONTEND_DIR, "index.html")
+        return _frontend_file("index.html")
 
 
 @app.route("/style.css")
 def style():
-    return send_from_directory(FRONTEND_DIR, "style.css")
+    return _frontend_file("style.css")
 
 
 @app.route("/checkin")
 def checkin():
-    return send_from_directory(FRONTEND_DIR, "checkin.html", mimetype="text/html")
+    return _frontend_file("checkin.html", mimetype="text/html")
 
 
 @app.route("/lookup")
 def lookup():
-    return send_from_directory(FRONTEND_DIR, "lookup.html", mimetype="text/html")
+    return _frontend_file("lookup.html", mimetype="text/html")
 
 
 @app.route("/login")
 def login():
-    return send_from_directory(FRONTEND_DIR, "login.html", mimetype="text/html")
+    return _frontend_file("login.html", mimetype="text/html")
 
 
 @app.route("/passenger")
 def passenger():
-    return send_from_directory(FRONTEND_DIR, "passenger.html", mimetype="text/html")
+    return _frontend_file("passenger.html", mimetype="text/html")
 
 
 @app.route('/assets/<path:path>')
 def serve_assets(path):
-    return send_from_directory(os.path.join(FRONTEND_DIR, 'assets'), path)
+    return _frontend_file('assets/' + path)
 
 # Simple CORS for local development
 @app.after_request
@@ -2569,6 +3627,11 @@ def add_cors(resp):
     resp.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS"
     return resp
 
+# gzip / brotli for larger JSON and text bodies (see compression.py for settings)
+@app.after_request
+def compress_response(resp):
+    return compression.compress_response(resp, request.headers.get('Accept-Encoding'))
+
 if __name__ == "__main__":
     app.run(debug=True, host="127.0.0.1", port=5000)
 # ...existing code...
\ No newline at end of file
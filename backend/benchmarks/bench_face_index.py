@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Recall vs speed of the perceptual-hash face prefilter on a synthetic corpus.
+
+Generates N random "faces" (smooth noise images), enrolls their dHash in a
+BK-tree, then probes with perturbed copies (noise + brightness shift) and
+reports, per Hamming radius, the recall of the true identity in the shortlist,
+the mean shortlist size and the query latency. A linear Hamming scan and the
+cost of a full pixel comparison are measured for reference.
+
+    python benchmarks/bench_face_index.py --n 100000 --probes 500
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from PIL import Image, ImageChops, ImageStat  # noqa: E402
+from face_index import BKTree, dhash, hamming  # noqa: E402
+
+
+def make_face(seed: int, size: int = 64) -> Image.Image:
+    rnd = random.Random(seed)
+    base = Image.frombytes('L', (12, 12), bytes(rnd.randrange(256) for _ in range(144)))
+    return base.resize((size, size), Image.BICUBIC)
+
+
+def perturb(img: Image.Image, seed: int) -> Image.Image:
+    rnd = random.Random(seed)
+    noise = Image.effect_noise(img.size, 12).point(lambda v: (v - 128) // 4 + 128)
+    shifted = img.point(lambda v: max(0, min(255, v + rnd.randint(-15, 15))))
+    return ImageChops.add(shifted, noise, scale=1.0, offset=-128)
+
+
+def pixel_similarity(a: Image.Image, b: Image.Image) -> float:
+    a = a.convert('L').resize((200, 200))
+    b = b.convert('L').resize((200, 200))
+    stat = ImageStat.Stat(ImageChops.difference(a, b))
+    rms = stat.rms[0] if stat.rms else 0.0
+    return max(0.0, 1.0 - rms / 100.0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--n', type=int, default=100000, help='corpus size')
+    ap.add_argument('--probes', type=int, default=500)
+    ap.add_argument('--radii', default='4,8,12,16,20')
+    args = ap.parse_args()
+
+    print(f"generating and hashing {args.n} images ...")
+    t0 = time.perf_counter()
+    hashes = [dhash(make_face(i)) for i in range(args.n)]
+    t_hash = time.perf_counter() - t0
+    tree = BKTree()
+    t0 = time.perf_counter()
+    for i, h in enumerate(hashes):
+        tree.add(h, i)
+    t_build = time.perf_counter() - t0
+    print(f"hash: {t_hash / args.n * 1e6:.1f} us/img, bk-tree build: {t_build:.2f}s")
+
+    rnd = random.Random(1234)
+    targets = [rnd.randrange(args.n) for _ in range(args.probes)]
+    probes = [dhash(perturb(make_face(t), t + 7)) for t in targets]
+
+    t0 = time.perf_counter()
+    for p in probes:
+        min(range(args.n), key=lambda i: hamming(p, hashes[i]))
+    t_linear = (time.perf_counter() - t0) / len(probes)
+
+    sample = [make_face(i) for i in range(min(200, args.n))]
+    probe_img = perturb(sample[0], 1)
+    t0 = time.perf_counter()
+    for s in sample:
+        pixel_similarity(s, probe_img)
+    t_pixel = (time.perf_counter() - t0) / len(sample)
+
+    print(f"linear hamming scan: {t_linear * 1e3:.2f} ms/query")
+    print(f"full pixel comparison: {t_pixel * 1e3:.3f} ms/image -> "
+          f"{t_pixel * args.n:.1f} s/query for a brute-force 1:N search")
+    print()
+    print(f"{'radius':>6} {'recall':>8} {'shortlist':>10} {'bk ms/q':>9} {'est total ms/q':>15}")
+    for r in (int(x) for x in args.radii.split(',')):
+        hits = 0
+        shortlist = 0
+        t0 = time.perf_counter()
+        for target, p in zip(targets, probes):
+            found = tree.search(p, r)
+            shortlist += len(found)
+            if any(k == target for _, k in found):
+                hits += 1
+        t_q = (time.perf_counter() - t0) / len(probes)
+        avg = shortlist / len(probes)
+        print(f"{r:>6} {hits / len(probes):>8.3f} {avg:>10.1f} {t_q * 1e3:>9.2f} {(t_q + avg * t_pixel) * 1e3:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Sanitizer throughput on realistic check-in payloads.
+
+Compares the original implementation (regexes compiled per call, three
+str.replace passes) with sanitizer.sanitize_input and the schema-driven
+sanitizer.sanitize_fields.
+
+    python benchmarks/bench_sanitizer.py --payloads 5000 --repeat 5
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sanitizer import sanitize_input, sanitize_fields, TEXT  # noqa: E402
+
+SCHEMA = {'name': TEXT, 'passport': TEXT, 'flight': TEXT, 'email': TEXT, 'notes': TEXT,
+          'bags': [{'description': TEXT}]}
+
+
+def legacy_sanitize(data):
+    if isinstance(data, str):
+        data = re.sub(r'<script[^>]*>.*?</script>', '', data, flags=re.DOTALL)
+        data = re.sub(r'<[^>]*>', '', data)
+        data = data.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        return data
+    elif isinstance(data, dict):
+        return {k: legacy_sanitize(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [legacy_sanitize(x) for x in data]
+    return data
+
+
+def make_payload(rng):
+    first = rng.choice(['Ana', 'Ben', 'Chloé', 'Dmitri', 'Efe', "O'Neil", 'Zoë'])
+    last = rng.choice(['Smith', 'Okafor', 'García', 'Nguyen', 'Müller', 'Ade-Bello'])
+    payload = {
+        'name': f'{first} {last}',
+        'passport': f'{rng.choice("ABCDEFGH")}{rng.randint(1000000, 9999999)}',
+        'flight': f'{rng.choice(["AB", "KQ", "ET"])}{rng.randint(100, 999)}',
+        'email': f'{first.lower()}.{last.lower()}@example.com',
+        'seat': f'{rng.randint(1, 40)}{rng.choice("ABCDEF")}',
+        'checked_in': False,
+        'baggage_count': rng.randint(0, 3),
+        'bags': [{'tag': f'BG{rng.randint(10000, 99999)}', 'weight': rng.randint(5, 32), 'description': 'Black suitcase'}
+                 for _ in range(rng.randint(0, 2))],
+        'notes': '',
+    }
+    roll = rng.random()
+    if roll < 0.05:
+        payload['notes'] = 'Wheelchair & assistance <b>required</b>'
+    elif roll < 0.06:
+        payload['name'] = f'{first}<script>alert(1)</script> {last}'
+    return payload
+
+
+def bench(label, fn, payloads, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for p in payloads:
+            fn(p)
+        best = min(best, time.perf_counter() - start)
+    print(f'{label:<28} {len(payloads) / best:>12,.0f} payloads/s   {best * 1e6 / len(payloads):7.2f} us/payload')
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--payloads', type=int, default=5000)
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--seed', type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    payloads = [make_payload(rng) for _ in range(args.payloads)]
+    for p in payloads:
+        assert sanitize_input(p) == legacy_sanitize(p)
+
+    base = bench('legacy sanitize_input', legacy_sanitize, payloads, args.repeat)
+    new = bench('sanitize_input', sanitize_input, payloads, args.repeat)
+    schema = bench('sanitize_fields (schema)', lambda p: sanitize_fields(p, SCHEMA), payloads, args.repeat)
+    print(f'\nspeedup: {base / new:.1f}x recursive, {base / schema:.1f}x schema-driven')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Encode time and bytes on the wire for the large kiosk payloads.
+
+Payloads: the passenger list (/api/passengers) and a seat map
+(/api/flights/<id>/seats). For each payload it reports:
+
+    encode    stdlib json as Flask's default provider ran it (sort_keys, compact)
+              vs serialization.dumps (orjson when installed)
+    store     json.dump(indent=4) as save_passengers used to write it
+              vs serialization.dumps(indent=4)
+    wire      raw, gzip and (if installed) brotli sizes at the response settings
+
+    python benchmarks/bench_serialization.py --passengers 5000 --repeat 5
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import compression  # noqa: E402
+import serialization  # noqa: E402
+
+
+def make_passengers(rng, n):
+    out = []
+    for i in range(n):
+        out.append({
+            'name': f'{rng.choice(["Ana", "Ben", "Chloé", "Dmitri", "Efe", "Zoë"])} {rng.choice(["Smith", "Okafor", "García", "Nguyen"])}',
+            'passport': f'{rng.choice("ABCDEFGH")}{rng.randint(1000000, 9999999)}',
+            'flight': f'AB{rng.randint(100, 140)}',
+            'seat': f'{rng.randint(1, 40)}{rng.choice("ABCDEF")}',
+            'email': f'p{i}@example.com',
+            'checked_in': rng.random() < 0.6,
+            'baggage_count': rng.randint(0, 3),
+            'baggage_fee': rng.choice([0, 0, 25.0, 50.0]),
+            'baggage_paid': rng.random() < 0.5,
+        })
+    return out
+
+
+def make_seat_map(rng, rows=40):
+    seats = []
+    for r in range(1, rows + 1):
+        for c in 'ABCDEF':
+            status = rng.choice(['available', 'available', 'taken', 'blocked', 'held'])
+            seat = {'seat': f'{r}{c}', 'status': status, 'row': r, 'column': c, 'class': 'economy' if r > 4 else 'business'}
+            if status == 'taken':
+                seat['passenger'] = {'name': 'Ana Smith', 'passport': f'A{rng.randint(1000000, 9999999)}'}
+            seats.append(seat)
+    return {'flight': {'flight': 'AB123', 'capacity': rows * 6, 'gate': 'A4', 'aircraft': 'A320'}, 'seats': seats}
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label, payload, repeat):
+    flask_default = best_of(lambda: json.dumps(payload, sort_keys=True, separators=(',', ':')), repeat)
+    fast = best_of(lambda: serialization.dumps(payload), repeat)
+    store_old = best_of(lambda: json.dumps(payload, indent=4), repeat)
+    store_new = best_of(lambda: serialization.dumps(payload, indent=4), repeat)
+    body = serialization.dumps(payload)
+    print(f'{label}')
+    print(f'  encode  stdlib {flask_default * 1e3:8.2f} ms   {serialization.BACKEND} {fast * 1e3:8.2f} ms   ({flask_default / fast:.1f}x)')
+    print(f'  store   stdlib {store_old * 1e3:8.2f} ms   {serialization.BACKEND} {store_new * 1e3:8.2f} ms   ({store_old / store_new:.1f}x)')
+    sizes = [f'raw {len(body) / 1024:8.1f} KiB']
+    for enc in ('gzip', 'br'):
+        if enc not in compression.AVAILABLE:
+            sizes.append(f'{enc} n/a (not installed)')
+            continue
+        t = best_of(lambda: compression.compress(body, enc), repeat)
+        size = len(compression.compress(body, enc))
+        sizes.append(f'{enc} {size / 1024:7.1f} KiB ({len(body) / size:.1f}x, {t * 1e3:.2f} ms)')
+    print('  wire    ' + '   '.join(sizes))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--passengers', type=int, default=5000)
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--seed', type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f'backend: {serialization.BACKEND}, compression: {", ".join(compression.AVAILABLE)}\n')
+    report(f'passenger list ({args.passengers:,})', make_passengers(rng, args.passengers), args.repeat)
+    report('seat map (240 seats)', make_seat_map(rng), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Messages per second with and without SMTP connection pooling.
+
+Starts a local aiosmtpd sink (pip install aiosmtpd) and sends the same
+message N times, first opening a fresh connection per message the way the
+app used to, then through smtp_pool.SMTPPool.
+
+    python benchmarks/bench_smtp_pool.py --messages 500 --threads 4
+"""
+import argparse
+import smtplib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from smtp_pool import SMTPPool  # noqa: E402
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.handlers import Sink
+except ImportError:  # pragma: no cover
+    Controller = None
+
+
+def make_message(i):
+    msg = EmailMessage()
+    msg['Subject'] = f'Boarding pass {i}'
+    msg['From'] = 'bench@example.com'
+    msg['To'] = f'passenger{i}@example.com'
+    msg.set_content('Attached is your boarding pass.\n' * 20)
+    return msg
+
+
+def send_fresh(host, port, msg):
+    smtp = smtplib.SMTP(host, port, timeout=10)
+    try:
+        smtp.ehlo()
+        smtp.send_message(msg)
+    finally:
+        smtp.quit()
+
+
+def run(label, fn, n, threads):
+    msgs = [make_message(i) for i in range(n)]
+    t0 = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as ex:
+            list(ex.map(fn, msgs))
+    else:
+        for m in msgs:
+            fn(m)
+    dt = time.perf_counter() - t0
+    print(f"{label:<28} {n / dt:>9.1f} msg/s  ({dt:.2f}s for {n})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--messages', type=int, default=500)
+    ap.add_argument('--threads', type=int, default=4)
+    args = ap.parse_args()
+    if Controller is None:
+        print('aiosmtpd is not installed: pip install aiosmtpd')
+        return 1
+
+    controller = Controller(Sink(), hostname='127.0.0.1', port=8025)
+    controller.start()
+    try:
+        host, port = controller.hostname, controller.port
+        for threads in sorted({1, args.threads}):
+            run(f'fresh connection, {threads} thr', lambda m: send_fresh(host, port, m), args.messages, threads)
+            pool = SMTPPool(host, port, max_size=threads)
+            run(f'pooled, {threads} thr', pool.send, args.messages, threads)
+            print(f"  pool stats: {pool.stats}")
+            pool.close()
+    finally:
+        controller.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
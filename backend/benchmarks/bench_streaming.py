@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Peak memory of exporting an events log: load + json.dumps vs streaming.
+
+Writes a synthetic events.json, then measures with tracemalloc:
+
+    full      json.load the file, json.dumps the list (what /api/admin/events does)
+    streamed  streaming.iter_file_array -> streaming.encode, draining the chunks
+
+    python benchmarks/bench_streaming.py --events 200000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import streaming  # noqa: E402
+
+
+def make_events(n):
+    for i in range(n):
+        yield {'type': 'checkin', 'passport': f'P{i:07d}', 'flight': f'AB{i % 300:03d}',
+               'seat': f'{i % 40 + 1}C', 'baggage_count': i % 3, 'timestamp': '2026-01-01T10:00:00Z'}
+
+
+def measure(label, fn):
+    # timed without tracemalloc (it slows allocation-heavy code), then traced for the peak
+    start = time.perf_counter()
+    out_bytes = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<10} peak {peak / 1e6:8.1f} MB   {elapsed:6.2f} s   {out_bytes / 1e6:8.1f} MB out')
+    return peak
+
+
+def full(path):
+    with open(path) as f:
+        events = json.load(f)
+    return len(json.dumps({'events': events}))
+
+
+def streamed(path, fmt):
+    return sum(len(chunk) for chunk in streaming.encode(streaming.iter_file_array(path), fmt, key='events' if fmt == 'json' else None))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--events', type=int, default=200000)
+    args = ap.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(list(make_events(args.events)), f, indent=2)
+        print(f'{args.events:,} events, {os.path.getsize(path) / 1e6:.1f} MB on disk\n')
+        base = measure('full', lambda: full(path))
+        new = measure('streamed', lambda: streamed(path, 'json'))
+        measure('ndjson', lambda: streamed(path, 'ndjson'))
+        print(f'\npeak memory: {base / new:.0f}x lower when streamed')
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
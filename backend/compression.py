@@ -0,0 +1,97 @@
+"""Response compression negotiated from Accept-Encoding.
+
+compress_response() is an after_request hook. It compresses buffered
+responses with a compressible mimetype once the body is at least
+COMPRESS_MIN_SIZE bytes (default 1024). It prefers brotli when the brotli
+package is installed and the client accepts it, then gzip. It skips:
+
+- streamed and file (direct passthrough) responses;
+- static assets that already picked a precompressed variant;
+- bodies that already have a Content-Encoding;
+- partial content;
+- responses marked Cache-Control: no-transform.
+
+Settings: COMPRESS_ENABLED (default 1), COMPRESS_MIN_SIZE,
+COMPRESS_GZIP_LEVEL (default 6) and COMPRESS_BROTLI_QUALITY (default 4,
+a good speed/ratio point for dynamic responses).
+
+Strong ETags on compressed bodies get a -gzip / -br suffix, as the bytes
+differ from the identity variant.
+"""
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE = ('application/json', 'application/x-ndjson', 'application/javascript', 'image/svg+xml')
+AVAILABLE = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+ENABLED = os.getenv('COMPRESS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE') or 1024)
+GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL') or 6)
+BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY') or 4)
+
+
+def negotiate(accept_encoding, available=AVAILABLE):
+    """Best encoding from available the client accepts (q > 0), or None. Ties keep server preference."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            accepted[token] = q
+    best, best_q = None, 0.0
+    for enc in available:
+        q = accepted.get(enc, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(encoding)
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE)
+
+
+def compress_response(resp, accept_encoding):
+    if not ENABLED or resp.direct_passthrough or resp.is_streamed or getattr(resp, 'precompressed', False):
+        return resp
+    if resp.status_code < 200 or resp.status_code in (204, 206, 304):
+        return resp
+    if 'Content-Encoding' in resp.headers or 'no-transform' in (resp.headers.get('Cache-Control') or ''):
+        return resp
+    if not is_compressible(resp.mimetype):
+        return resp
+    resp.vary.add('Accept-Encoding')
+    data = resp.get_data()
+    if len(data) < MIN_SIZE:
+        return resp
+    encoding = negotiate(accept_encoding)
+    if encoding is None:
+        return resp
+    resp.set_data(compress(data, encoding))
+    resp.headers['Content-Encoding'] = encoding
+    etag = resp.headers.get('ETag')
+    if etag and etag.startswith('"') and etag.endswith('"'):
+        # a strong tag names exact bytes: give the encoded variant its own
+        resp.headers['ETag'] = f'{etag[:-1]}-{encoding}"'
+    return resp
@@ -0,0 +1,94 @@
+"""Conditional GET for catalog endpoints.
+
+@conditional(version_fn, cache_control) wraps a GET handler. Before the
+handler runs, it builds a strong ETag from the request path and query and
+from version_fn(*view_args). version_fn returns the store versions the
+response depends on (version counters, file mtimes/sizes); the body is
+never hashed. If the client's If-None-Match already holds that tag, the
+wrapper answers 304 straight away and the handler does no work. Otherwise
+the handler runs and its 200 response gets the ETag and the route's
+Cache-Control.
+
+Tags include a per-process boot id, so in-memory counters from two workers
+or two runs never collide. The compression layer adds -gzip / -br to the
+tag of an encoded body, and matching ignores that suffix.
+"""
+import functools
+import hashlib
+import os
+import time
+
+from flask import current_app, make_response, request
+
+_BOOT = f'{os.getpid()}:{time.time_ns()}'
+ENCODING_SUFFIXES = ('-gzip', '-br')
+NO_CACHE = 'no-cache'
+
+
+def file_version(path):
+    """(mtime_ns, size) of a store file; changes whenever any process rewrites it."""
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+def make_etag(*parts):
+    digest = hashlib.blake2b(repr((_BOOT,) + parts).encode('utf-8'), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _strip(tag):
+    tag = tag.strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def etag_matches(if_none_match, etag):
+    """The tag from If-None-Match that matches etag (weak comparison, as RFC 9110 requires), or None."""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == '*':
+        return etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate and _strip(candidate) == etag:
+            return candidate
+    return None
+
+
+def conditional(version_fn, cache_control=NO_CACHE, guard=None):
+    """guard() may return a response (e.g. 401) that must be sent instead of a 304."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return fn(*args, **kwargs)
+            if guard is not None:
+                denied = guard()
+                if denied is not None:
+                    return denied
+            try:
+                version = version_fn(*args, **kwargs)
+            except Exception:
+                return fn(*args, **kwargs)
+            etag = make_etag(request.path, request.query_string, version)
+            matched = etag_matches(request.headers.get('If-None-Match'), etag)
+            if matched:
+                resp = current_app.response_class(status=304)
+                resp.headers['ETag'] = matched
+                resp.headers['Cache-Control'] = cache_control
+                resp.vary.add('Accept-Encoding')
+                return resp
+            resp = make_response(fn(*args, **kwargs))
+            if resp.status_code == 200:
+                resp.headers['ETag'] = etag
+                resp.headers['Cache-Control'] = cache_control
+            return resp
+        return wrapper
+    return decorator
@@ -0,0 +1,145 @@
+"""Flight-wide disruption broadcasts.
+
+When a flight's gate, time or status changes, every passenger booked on it
+should hear about it exactly once. flight_changed() records the change and
+starts a short coalescing window; further changes to the same flight inside
+the window are merged (keeping the original "from" value and the latest
+"to" value), so an admin fixing a typo in the gate sends one message, not two.
+Each change re-arms the window, but never past max_delay_seconds after the
+first pending change, so a flight whose data keeps changing is still
+announced.
+
+When the window closes the broadcast is fanned out through the app's
+flight -> passengers index and handed to the NotificationDispatcher. A
+passenger booked twice on the flight is messaged once per broadcast.
+forget() drops a flight's state once it is deleted.
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+FIELD_LABELS = {'gate': 'Gate', 'time': 'Departure time', 'arrival': 'Arrival time', 'status': 'Status'}
+
+
+def describe_changes(flight_id: str, changes: dict) -> str:
+    lines = []
+    for field, (old, new) in changes.items():
+        label = FIELD_LABELS.get(field, field)
+        if field == 'status' and new == 'cancelled':
+            lines.append(f"Flight {flight_id} has been cancelled.")
+        elif old:
+            lines.append(f"{label} changed from {old} to {new}.")
+        else:
+            lines.append(f"{label} is now {new}.")
+    return f"Update for flight {flight_id}:\n\n" + "\n".join(lines) + "\n\nWe apologise for any inconvenience."
+
+
+class DisruptionBroadcaster:
+    def __init__(self, dispatcher, recipients_fn, send_fn, coalesce_seconds: float = 30.0, history: int = 50,
+                 max_delay_seconds: float = None):
+        """recipients_fn(flight_id) -> passenger dicts; send_fn(item) delivers one message."""
+        self.dispatcher = dispatcher
+        self.recipients_fn = recipients_fn
+        self.send_fn = send_fn
+        self.coalesce_seconds = coalesce_seconds
+        self.max_delay_seconds = max_delay_seconds if max_delay_seconds is not None else coalesce_seconds * 4
+        self._lock = threading.Lock()
+        self._pending = {}     # flight -> {'changes': {field: (old, new)}, 'timer': Timer, 'since': monotonic}
+        self._versions = {}    # flight -> int
+        self._history = {}     # flight -> deque of broadcast records
+        self.history = history
+
+    def flight_changed(self, flight_id: str, changes: dict):
+        """Record {field: (old, new)} for a flight and (re)arm its coalescing timer."""
+        changes = {k: v for k, v in changes.items() if v[0] != v[1]}
+        if not changes:
+            return None
+        with self._lock:
+            version = self._versions.get(flight_id, 0) + 1
+            self._versions[flight_id] = version
+            pending = self._pending.get(flight_id)
+            if pending is None:
+                pending = {'changes': {}, 'timer': None, 'since': time.monotonic()}
+                self._pending[flight_id] = pending
+            for field, (old, new) in changes.items():
+                first_old = pending['changes'].get(field, (old, None))[0]
+                pending['changes'][field] = (first_old, new)
+            if pending['timer'] is not None:
+                pending['timer'].cancel()
+            if self.coalesce_seconds > 0:
+                deadline = pending['since'] + self.max_delay_seconds
+                delay = max(0.0, min(self.coalesce_seconds, deadline - time.monotonic()))
+                timer = threading.Timer(delay, self.flush, args=(flight_id,))
+                timer.daemon = True
+                pending['timer'] = timer
+                timer.start()
+            else:
+                pending['timer'] = None
+        if self.coalesce_seconds <= 0:
+            return self.flush(flight_id)
+        return version
+
+    def flush(self, flight_id: str):
+        """Send the pending broadcast for a flight now. Returns the broadcast record or None."""
+        with self._lock:
+            pending = self._pending.pop(flight_id, None)
+            if pending is None:
+                return None
+            if pending['timer'] is not None:
+                pending['timer'].cancel()
+            version = self._versions.get(flight_id, 0)
+            # changes that were reverted inside the window are not news
+            changes = {k: v for k, v in pending['changes'].items() if v[0] != v[1]}
+        record = {'flight': flight_id, 'version': version, 'changes': {k: {'from': o, 'to': n} for k, (o, n) in changes.items()},
+                  'created': datetime.utcnow().isoformat() + 'Z', 'job': None, 'deduplicated': 0}
+        if changes:
+            subject = f"Flight {flight_id} update"
+            message = describe_changes(flight_id, changes)
+            items = []
+            seen = set()
+            for p in self.recipients_fn(flight_id):
+                passport = p.get('passport')
+                if passport in seen:
+                    record['deduplicated'] += 1
+                    continue
+                seen.add(passport)
+                item = {'recipient': passport, 'passenger': p, 'subject': subject, 'message': message}
+                if p.get('email'):
+                    item['channel'] = 'email'
+                    item['domain'] = p['email'].rsplit('@', 1)[-1].lower()
+                elif p.get('phone'):
+                    item['channel'] = 'sms'
+                    item['domain'] = 'sms'
+                else:
+                    item['skip'] = 'no_contact'
+                items.append(item)
+            job = self.dispatcher.submit('disruption', items, self.send_fn, meta={'flight': flight_id, 'version': version})
+            record['job'] = job
+        with self._lock:
+            self._history.setdefault(flight_id, deque(maxlen=self.history)).append(record)
+        return record
+
+    def forget(self, flight_id: str):
+        """Drop everything held for a flight (pending changes, version, history), e.g. once it is deleted."""
+        with self._lock:
+            pending = self._pending.pop(flight_id, None)
+            self._versions.pop(flight_id, None)
+            self._history.pop(flight_id, None)
+        if pending and pending['timer'] is not None:
+            pending['timer'].cancel()
+
+    def broadcasts(self, flight_id: str):
+        """Broadcast records for a flight, newest first, with live delivery stats."""
+        with self._lock:
+            records = list(self._history.get(flight_id, ()))
+            pending = self._pending.get(flight_id)
+            pending_changes = dict(pending['changes']) if pending else None
+        out = []
+        for r in reversed(records):
+            entry = {k: v for k, v in r.items() if k != 'job'}
+            entry['delivery'] = r['job'].to_dict(include_results=False) if r['job'] else None
+            out.append(entry)
+        return {'flight': flight_id, 'version': self._versions.get(flight_id, 0),
+                'pending': {k: {'from': o, 'to': n} for k, (o, n) in pending_changes.items()} if pending_changes else None,
+                'broadcasts': out}
@@ -0,0 +1,218 @@
+"""Perceptual-hash prefilter for 1:N face matching.
+
+Every enrolled image gets a 64-bit difference hash (dHash) at enroll time.
+Hashes live in a BK-tree keyed by Hamming distance so a probe image can be
+narrowed down to a small shortlist before running the expensive pixel
+comparison in app._image_similarity. Decoded enrollment templates are kept
+in a TemplateCache so repeated verifies skip the stored-image decode.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from face_ingest import open_reduced
+
+HASH_BITS = 64
+DEFAULT_RADIUS = int(os.getenv('FACE_HASH_RADIUS', '8'))
+
+
+def dhash(image, hash_size: int = 8) -> int:
+    """Compute a 64-bit difference hash for a PIL image, path or file-like.
+
+    The image is reduced to (hash_size+1) x hash_size grayscale pixels and
+    each bit records whether a pixel is brighter than its right neighbour.
+    """
+    image = open_reduced(image, (hash_size + 1, hash_size))
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    px = small.tobytes()
+    width = hash_size + 1
+    value = 0
+    for row in range(hash_size):
+        base = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (1 if px[base + col] > px[base + col + 1] else 0)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """BK-tree over integer hashes using Hamming distance.
+
+    Each node is [hash, keys, children] where children maps distance -> node.
+    Several keys may share one hash (e.g. identical re-enrollments).
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, h: int, key):
+        if self.root is None:
+            self.root = [h, [key], {}]
+            self.size += 1
+            return
+        node = self.root
+        while True:
+            d = hamming(h, node[0])
+            if d == 0:
+                if key not in node[1]:
+                    node[1].append(key)
+                    self.size += 1
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [h, [key], {}]
+                self.size += 1
+                return
+            node = child
+
+    def remove(self, h: int, key):
+        """Drop key from the node holding h. Empty nodes stay as routing nodes."""
+        node = self.root
+        while node is not None:
+            d = hamming(h, node[0])
+            if d == 0:
+                if key in node[1]:
+                    node[1].remove(key)
+                    self.size -= 1
+                return
+            node = node[2].get(d)
+
+    def search(self, h: int, radius: int):
+        """Return [(distance, key)] for every key within radius of h, nearest first."""
+        out = []
+        if self.root is None:
+            return out
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            d = hamming(h, node[0])
+            if d <= radius:
+                for key in node[1]:
+                    out.append((d, key))
+            lo, hi = d - radius, d + radius
+            for cd, child in node[2].items():
+                if lo <= cd <= hi:
+                    stack.append(child)
+        out.sort(key=lambda x: x[0])
+        return out
+
+
+class FaceIndex:
+    """In-memory passport -> dHash mapping backed by a BK-tree.
+
+    Hashes are persisted alongside the blob references in the face store
+    index (see face_store.py); this class is rebuilt from them at startup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._tree = BKTree()
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __contains__(self, passport):
+        return passport in self._hashes
+
+    def get(self, passport):
+        return self._hashes.get(passport)
+
+    def load(self, hashes: dict):
+        """Seed from a passport -> int hash mapping."""
+        with self._lock:
+            for passport, h in hashes.items():
+                self._put(passport, h)
+
+    def _put(self, passport, h):
+        # caller holds the lock
+        old = self._hashes.get(passport)
+        if old is not None:
+            self._tree.remove(old, passport)
+        self._hashes[passport] = h
+        self._tree.add(h, passport)
+
+    def add(self, passport: str, image) -> int:
+        """Hash image (or take a precomputed int hash) and (re)register it for passport. Returns the hash."""
+        h = image if isinstance(image, int) else dhash(image)
+        with self._lock:
+            self._put(passport, h)
+        return h
+
+    def remove(self, passport: str):
+        with self._lock:
+            old = self._hashes.pop(passport, None)
+            if old is not None:
+                self._tree.remove(old, passport)
+
+    def candidates(self, image, radius: int = None, limit: int = None):
+        """Shortlist of (distance, passport) whose hash is within radius of the probe."""
+        h = image if isinstance(image, int) else dhash(image)
+        r = DEFAULT_RADIUS if radius is None else int(radius)
+        with self._lock:
+            found = self._tree.search(h, r)
+        return found[:limit] if limit else found
+
+    def rebuild(self, items):
+        """Hash (passport, path) pairs that are not indexed yet. Returns the count added."""
+        added = 0
+        for passport, path in items:
+            if passport in self._hashes or not path:
+                continue
+            try:
+                self.add(passport, path)
+                added += 1
+            except Exception:
+                continue
+        return added
+
+
+TEMPLATE_SIZE = (200, 200)
+
+
+def make_template(image):
+    """Canonical comparison template: grayscale, TEMPLATE_SIZE."""
+    image = open_reduced(image, TEMPLATE_SIZE)
+    return image.convert('L').resize(TEMPLATE_SIZE)
+
+
+class TemplateCache:
+    """Small LRU of decoded enrollment templates keyed by path.
+
+    Entries are invalidated when the file's mtime changes, so re-enrollment
+    is picked up without explicit eviction.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str):
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == mtime:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        tpl = make_template(path)
+        with self._lock:
+            self._entries[path] = (mtime, tpl)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return tpl
+
+    def invalidate(self, path: str):
+        with self._lock:
+            self._entries.pop(path, None)
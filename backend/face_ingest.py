@@ -0,0 +1,83 @@
+"""Ingest pipeline for face images.
+
+Uploads are normalised once at enroll time (EXIF orientation, grayscale,
+bounded size, JPEG) so the face store only holds compact canonical images
+and every later verify decodes a small file. JPEG inputs are decoded with
+Image.draft(), which lets libjpeg scale by 1/2, 1/4 or 1/8 during decode
+instead of producing a full-resolution bitmap first.
+"""
+import io
+import os
+
+from PIL import Image, ImageOps
+
+MAX_UPLOAD_BYTES = int(os.getenv('FACE_MAX_UPLOAD_BYTES', str(5 * 1024 * 1024)))
+CANONICAL_SIZE = int(os.getenv('FACE_CANONICAL_SIZE', '320'))
+CANONICAL_QUALITY = int(os.getenv('FACE_CANONICAL_QUALITY', '85'))
+
+
+class FaceImageError(ValueError):
+    """Raised when an upload cannot be ingested (too large or not an image)."""
+    status = 400
+
+
+class FaceImageTooLarge(FaceImageError):
+    status = 413
+
+
+def open_reduced(fp, size, mode='L'):
+    """Open an image, asking the JPEG decoder for a reduced-resolution draft.
+
+    size is the smallest (width, height) the caller needs; the draft never
+    goes below it. Non-JPEG formats ignore the hint and decode normally.
+    """
+    img = fp if isinstance(fp, Image.Image) else Image.open(fp)
+    if img.format == 'JPEG':
+        try:
+            img.draft(mode, size)
+        except Exception:
+            pass
+    return img
+
+
+def read_upload(file_storage, max_bytes: int = None):
+    """Read an uploaded file into memory, refusing anything over max_bytes."""
+    limit = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    data = file_storage.read(limit + 1)
+    if len(data) > limit:
+        raise FaceImageTooLarge(f'image exceeds {limit} bytes')
+    if not data:
+        raise FaceImageError('empty image')
+    return data
+
+
+def normalize(data: bytes, max_side: int = None):
+    """Decode upload bytes into the canonical grayscale image."""
+    side = CANONICAL_SIZE if max_side is None else max_side
+    try:
+        img = open_reduced(io.BytesIO(data), (side, side))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert('L')
+    except Exception as e:
+        raise FaceImageError(f'invalid image: {e}')
+    img.thumbnail((side, side))
+    return img
+
+
+def ingest(data: bytes, originals_dir: str = None, name: str = None):
+    """Normalise upload bytes into the canonical image.
+
+    Returns (image, jpeg_bytes). When originals_dir is given the untouched
+    upload is kept there as cold storage under name.
+    """
+    img = normalize(data)
+    buf = io.BytesIO()
+    img.save(buf, format='JPEG', quality=CANONICAL_QUALITY, optimize=True)
+    if originals_dir and name:
+        try:
+            os.makedirs(originals_dir, exist_ok=True)
+            with open(os.path.join(originals_dir, name + '.orig'), 'wb') as f:
+                f.write(data)
+        except Exception:
+            pass
+    return img, buf.getvalue()
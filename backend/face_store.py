@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Sharded, content-addressed storage for enrollment images.
+
+Layout under the face store root:
+
+    index.json                      passport -> {blob, phash, enrolled} (snapshot)
+    index.journal                   put/remove records appended since the snapshot
+    blobs/ab/cd/<sha256>.jpg        image bytes, named by their SHA-256
+
+An enroll appends one line to the journal instead of rewriting the index.
+The journal is folded into index.json every JOURNAL_COMPACT_EVERY records
+and replayed on load.
+
+Identical re-enrollments (or two passports enrolling the same bytes) share
+one blob. An in-memory digest -> refcount map, built on load, tracks how
+many passports point at each blob. A blob is removed when its count drops
+to zero.
+
+Stores created before this layout hold flat <passport>.jpg files; those are
+still readable through path_for() until `python face_store.py migrate` is run.
+
+    python face_store.py migrate [--root DIR] [--keep]
+    python face_store.py scrub   [--root DIR] [--workers N] [--fix]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BLOB_EXT = '.jpg'
+JOURNAL_COMPACT_EVERY = 500
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class FaceStore:
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.index_file = os.path.join(root, 'index.json')
+        self.journal_file = os.path.join(root, 'index.journal')
+        self._lock = threading.Lock()
+        self._index = {}
+        self._refs = Counter()
+        self._journal_len = 0
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._load()
+
+    # --- index ---------------------------------------------------------------
+    def _load(self):
+        index = {}
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r') as f:
+                    index = json.load(f) or {}
+        except Exception:
+            index = {}
+        replayed = 0
+        try:
+            with open(self.journal_file, 'r') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        break   # torn final write
+                    if rec.get('op') == 'put':
+                        index[rec['passport']] = rec['entry']
+                    elif rec.get('op') == 'remove':
+                        index.pop(rec['passport'], None)
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        self._index = index
+        self._journal_len = replayed
+        self._recount()
+
+    def _recount(self):
+        self._refs = Counter(e['blob'] for e in self._index.values() if e.get('blob'))
+
+    def _append(self, rec):
+        # caller holds the lock; replaying a record twice is harmless, so a
+        # crash between compaction and journal removal loses nothing
+        with open(self.journal_file, 'a') as f:
+            f.write(json.dumps(rec) + '\n')
+        self._journal_len += 1
+        if self._journal_len >= JOURNAL_COMPACT_EVERY:
+            self._save()
+
+    def _save(self):
+        # caller holds the lock: write a full snapshot and drop the journal
+        tmp = self.index_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp, self.index_file)
+        try:
+            os.remove(self.journal_file)
+        except FileNotFoundError:
+            pass
+        self._journal_len = 0
+
+    def compact(self):
+        """Fold the journal into index.json."""
+        with self._lock:
+            self._save()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, passport):
+        return passport in self._index
+
+    def entries(self):
+        with self._lock:
+            return dict(self._index)
+
+    def phashes(self):
+        """passport -> int perceptual hash, for seeding the prefilter index."""
+        out = {}
+        for passport, entry in self.entries().items():
+            try:
+                out[passport] = int(entry['phash'], 16)
+            except Exception:
+                continue
+        return out
+
+    # --- blobs ---------------------------------------------------------------
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest[2:4], digest + BLOB_EXT)
+
+    def _legacy_path(self, passport: str) -> str:
+        return os.path.join(self.root, f"{passport.replace('/', '_')}{BLOB_EXT}")
+
+    def _write_blob(self, data: bytes) -> str:
+        digest = _sha256(data)
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest
+
+    def _release_blob(self, digest: str):
+        # caller holds the lock
+        self._refs[digest] -= 1
+        if self._refs[digest] > 0:
+            return
+        del self._refs[digest]
+        try:
+            os.remove(self.blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def put(self, passport: str, data: bytes, phash: int = None):
+        """Store image bytes for passport. Returns (digest, deduplicated)."""
+        digest = _sha256(data)
+        with self._lock:
+            existed = os.path.exists(self.blob_path(digest))
+            self._write_blob(data)
+            old = self._index.get(passport)
+            entry = {
+                'blob': digest,
+                'phash': f"{phash:016x}" if phash is not None else None,
+                'enrolled': datetime.utcnow().isoformat() + 'Z'
+            }
+            self._append({'op': 'put', 'passport': passport, 'entry': entry})
+            self._index[passport] = entry
+            self._refs[digest] += 1
+            if old and old.get('blob'):
+                self._release_blob(old['blob'])
+        legacy = self._legacy_path(passport)
+        if os.path.exists(legacy):
+            try:
+                os.remove(legacy)
+            except Exception:
+                pass
+        return digest, existed
+
+    def path_for(self, passport: str):
+        """Filesystem path of the passport's image, or None if not enrolled."""
+        with self._lock:
+            entry = self._index.get(passport)
+        if entry:
+            path = self.blob_path(entry['blob'])
+            return path if os.path.exists(path) else None
+        legacy = self._legacy_path(passport)
+        return legacy if os.path.exists(legacy) else None
+
+    def remove(self, passport: str):
+        with self._lock:
+            entry = self._index.pop(passport, None)
+            if entry:
+                self._append({'op': 'remove', 'passport': passport})
+                self._release_blob(entry['blob'])
+        return entry is not None
+
+    def legacy_passports(self):
+        try:
+            names = os.listdir(self.root)
+        except Exception:
+            return []
+        return [n[:-len(BLOB_EXT)] for n in names if n.endswith(BLOB_EXT) and os.path.isfile(os.path.join(self.root, n))]
+
+    # --- maintenance ---------------------------------------------------------
+    def migrate(self, phash_fn=None, keep: bool = False):
+        """Move flat <passport>.jpg files into the blob store. Returns stats."""
+        stats = {'migrated': 0, 'deduplicated': 0, 'errors': 0}
+        for passport in self.legacy_passports():
+            src = self._legacy_path(passport)
+            if passport in self._index:
+                continue
+            try:
+                with open(src, 'rb') as f:
+                    data = f.read()
+                phash = phash_fn(src) if phash_fn else None
+                digest = _sha256(data)
+                with self._lock:
+                    if os.path.exists(self.blob_path(digest)):
+                        stats['deduplicated'] += 1
+                    self._write_blob(data)
+                    self._index[passport] = {'blob': digest, 'phash': f"{phash:016x}" if phash is not None else None, 'enrolled': None}
+                    self._refs[digest] += 1
+                stats['migrated'] += 1
+                if not keep:
+                    os.remove(src)
+            except Exception:
+                stats['errors'] += 1
+        with self._lock:
+            self._save()
+        return stats
+
+    def _check_blob(self, digest: str):
+        path = self.blob_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                actual = _sha256(f.read())
+        except FileNotFoundError:
+            return digest, 'missing'
+        return digest, 'ok' if actual == digest else 'corrupt'
+
+    def scrub(self, workers: int = 8, fix: bool = False):
+        """Verify every referenced blob's checksum in parallel and find orphans.
+
+        With fix=True, corrupt blobs are deleted, index entries pointing at
+        missing/corrupt blobs are dropped and orphaned blobs are removed.
+        """
+        entries = self.entries()
+        referenced = {e['blob'] for e in entries.values() if e.get('blob')}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            status = dict(pool.map(self._check_blob, sorted(referenced)))
+        on_disk = set()
+        for dirpath, _dirs, files in os.walk(self.blob_dir):
+            for name in files:
+                if name.endswith(BLOB_EXT):
+                    on_disk.add(name[:-len(BLOB_EXT)])
+        orphans = sorted(on_disk - referenced)
+        bad = {d for d, s in status.items() if s != 'ok'}
+        report = {
+            'entries': len(entries),
+            'blobs': len(referenced),
+            'missing': sorted(d for d, s in status.items() if s == 'missing'),
+            'corrupt': sorted(d for d, s in status.items() if s == 'corrupt'),
+            'orphans': orphans,
+            'affected_passports': sorted(p for p, e in entries.items() if e.get('blob') in bad),
+        }
+        if fix:
+            with self._lock:
+                for passport in report['affected_passports']:
+                    self._index.pop(passport, None)
+                self._save()
+                self._recount()
+            for digest in report['corrupt'] + orphans:
+                try:
+                    os.remove(self.blob_path(digest))
+                except Exception:
+                    pass
+        return report
+
+
+def main(argv=None):
+    here = os.path.dirname(os.path.abspath(__file__))
+    ap = argparse.ArgumentParser(description='Face store maintenance')
+    ap.add_argument('command', choices=['migrate', 'scrub'])
+    ap.add_argument('--root', default=os.path.join(here, 'face_store'))
+    ap.add_argument('--workers', type=int, default=8)
+    ap.add_argument('--fix', action='store_true', help='scrub: drop bad entries and orphaned blobs')
+    ap.add_argument('--keep', action='store_true', help='migrate: leave the flat files in place')
+    args = ap.parse_args(argv)
+
+    store = FaceStore(args.root)
+    if args.command == 'migrate':
+        from face_index import dhash
+        print(json.dumps(store.migrate(phash_fn=dhash, keep=args.keep), indent=2))
+        return 0
+    report = store.scrub(workers=args.workers, fix=args.fix)
+    print(json.dumps(report, indent=2))
+    return 1 if (report['missing'] or report['corrupt']) and not args.fix else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
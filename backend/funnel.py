@@ -0,0 +1,213 @@
+"""Incremental passenger funnel: booked -> enrolled -> verified -> checked in -> boarded.
+
+Each (flight, passport) booking carries a stage bitset. Events update it as
+they are logged, so conversion and drop-off never require replaying
+events.json:
+
+- enrolled / verified are identity-level: they apply to every flight the
+  passport is booked on (and to bookings made later);
+- checked_in / boarded / emailed are per flight.
+
+Per flight we keep a count per stage and an index of passports by exact
+bitset. With six stages there are at most 64 bitsets per flight, so
+"verified but not checked in on flight X" sums a bounded number of buckets
+(O(1) in the number of passengers), and listing those stragglers reads the
+matching buckets instead of scanning passengers.
+"""
+import threading
+
+STAGES = ('booked', 'enrolled', 'verified', 'checked_in', 'boarded', 'emailed')
+BIT = {name: 1 << i for i, name in enumerate(STAGES)}
+IDENTITY_STAGES = BIT['enrolled'] | BIT['verified']
+FUNNEL = ('booked', 'enrolled', 'verified', 'checked_in', 'boarded')
+
+
+def stage_for_event(event):
+    """Funnel stage an audit event represents, or None."""
+    kind = event.get('type')
+    if kind == 'enroll' and event.get('status') == 'ok':
+        return 'enrolled'
+    if kind == 'verify' and event.get('match'):
+        return 'verified'
+    if kind == 'checkin':
+        return 'checked_in'
+    if kind == 'boarding_action' and event.get('action') == 'mark_boarded':
+        return 'boarded'
+    if kind == 'email_sent' and event.get('status') == 'ok':
+        return 'emailed'
+    return None
+
+
+def _mask(stages):
+    m = 0
+    for s in stages or ():
+        m |= BIT[s]
+    return m
+
+
+class FunnelEngine:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._identity = {}     # passport -> identity-level bits
+        self._bits = {}         # (flight, passport) -> bits
+        self._flights_of = {}   # passport -> set(flight)
+        self._index = {}        # flight -> {bits: set(passport)}
+        self._counts = {}       # flight -> [count per stage]
+
+    # --- updates (caller holds the lock) ------------------------------------
+    def _set(self, flight, passport, new_bits):
+        key = (flight, passport)
+        old_bits = self._bits.get(key)
+        if old_bits == new_bits:
+            return
+        index = self._index.setdefault(flight, {})
+        counts = self._counts.setdefault(flight, [0] * len(STAGES))
+        if old_bits is not None:
+            bucket = index.get(old_bits)
+            if bucket is not None:
+                bucket.discard(passport)
+                if not bucket:
+                    del index[old_bits]
+        index.setdefault(new_bits, set()).add(passport)
+        old = old_bits or 0
+        for i in range(len(STAGES)):
+            b = 1 << i
+            if (new_bits & b) and not (old & b):
+                counts[i] += 1
+            elif (old & b) and not (new_bits & b):
+                counts[i] -= 1
+        self._bits[key] = new_bits
+        self._flights_of.setdefault(passport, set()).add(flight)
+
+    def _track(self, passport, flight):
+        key = (flight, passport)
+        if key not in self._bits:
+            self._set(flight, passport, BIT['booked'] | self._identity.get(passport, 0))
+
+    def track(self, passport, flight):
+        """Register a booking (idempotent)."""
+        if not (passport and flight):
+            return
+        with self._lock:
+            self._track(passport, flight)
+
+    def _untrack(self, passport, flight):
+        bits = self._bits.pop((flight, passport), None)
+        if bits is None:
+            return
+        bucket = self._index.get(flight, {}).get(bits)
+        if bucket is not None:
+            bucket.discard(passport)
+            if not bucket:
+                del self._index[flight][bits]
+        counts = self._counts[flight]
+        for i in range(len(STAGES)):
+            if bits & (1 << i):
+                counts[i] -= 1
+        self._flights_of.get(passport, set()).discard(flight)
+
+    def _apply_record(self, p):
+        passport, flight = p.get('passport'), p.get('flight')
+        if not (passport and flight):
+            return
+        self._track(passport, flight)
+        bits = self._bits[(flight, passport)]
+        if p.get('checked_in'):
+            self._set(flight, passport, bits | BIT['checked_in'])
+        else:
+            self._set(flight, passport, bits & ~BIT['checked_in'])
+
+    def update(self, *records):
+        """Track added or modified passenger records (booking and check-in flag)."""
+        with self._lock:
+            for p in records:
+                self._apply_record(p)
+
+    def sync(self, passengers):
+        """Align bookings with the store after bulk edits or deletions; stage bits are kept."""
+        with self._lock:
+            live = set()
+            for p in passengers:
+                self._apply_record(p)
+                live.add((p.get('flight'), p.get('passport')))
+            for flight, passport in [k for k in self._bits if k not in live]:
+                self._untrack(passport, flight)
+
+    def mark(self, passport, stage, flight=None):
+        if not passport:
+            return
+        bit = BIT[stage]
+        with self._lock:
+            if bit & IDENTITY_STAGES:
+                self._identity[passport] = self._identity.get(passport, 0) | bit
+                flights = set(self._flights_of.get(passport, ()))
+                if flight:
+                    flights.add(flight)
+            else:
+                flights = {flight} if flight else set(self._flights_of.get(passport, ()))
+            for f in flights:
+                self._track(passport, f)
+                self._set(f, passport, self._bits[(f, passport)] | bit)
+
+    def observe(self, event):
+        stage = stage_for_event(event)
+        if stage is not None:
+            self.mark(event.get('passport'), stage, event.get('flight'))
+
+    def rebuild(self, passengers, enrolled=(), boarding_state=None, events=()):
+        """Seed from current state: bookings, check-ins, enrolled faces and boarded
+        lists, plus any past events (for stages the stores do not record)."""
+        with self._lock:
+            self._identity, self._bits, self._flights_of, self._index, self._counts = {}, {}, {}, {}, {}
+            for passport in enrolled:
+                self._identity[passport] = self._identity.get(passport, 0) | BIT['enrolled']
+            for p in passengers:
+                self._apply_record(p)
+            for flight, entry in (boarding_state or {}).items():
+                if isinstance(entry, dict):
+                    for passport in entry.get('boarded') or []:
+                        self._track(passport, flight)
+                        self._set(flight, passport, self._bits[(flight, passport)] | BIT['boarded'])
+        for event in events:
+            self.observe(event)
+
+    # --- queries -------------------------------------------------------------
+    def count(self, flight, has=(), lacks=()):
+        """Bookings on flight that reached every stage in has and none in lacks."""
+        has_m, lacks_m = _mask(has), _mask(lacks)
+        with self._lock:
+            if not lacks_m and len(has) == 1:
+                return self._counts.get(flight, [0] * len(STAGES))[STAGES.index(has[0])]
+            return sum(len(ps) for bits, ps in self._index.get(flight, {}).items()
+                       if bits & has_m == has_m and not bits & lacks_m)
+
+    def passengers(self, flight, has=(), lacks=(), limit=None):
+        """Passports matching the stage filter, read from the bitset index."""
+        has_m, lacks_m = _mask(has), _mask(lacks)
+        out = []
+        with self._lock:
+            for bits, ps in self._index.get(flight, {}).items():
+                if bits & has_m == has_m and not bits & lacks_m:
+                    out.extend(ps)
+        out.sort()
+        return out[:limit] if limit else out
+
+    def stages(self, passport, flight):
+        with self._lock:
+            bits = self._bits.get((flight, passport), self._identity.get(passport, 0))
+        return [s for s in STAGES if bits & BIT[s]]
+
+    def summary(self, flight):
+        """Stage counts plus step-to-step conversion and drop-off along the funnel."""
+        with self._lock:
+            counts = list(self._counts.get(flight, [0] * len(STAGES)))
+        by_stage = {s: counts[i] for i, s in enumerate(STAGES)}
+        steps = []
+        for prev, cur in zip(FUNNEL, FUNNEL[1:]):
+            a, b = by_stage[prev], by_stage[cur]
+            steps.append({'from': prev, 'to': cur, 'conversion': round(b / a, 4) if a else None, 'drop_off': max(0, a - b)})
+        return {'flight': flight, 'counts': by_stage, 'steps': steps}
+
+    def flights(self):
+        with self._lock:
+            return sorted(f for f, c in self._counts.items() if c[0])
@@ -0,0 +1,245 @@
+"""Durable local job queue backed by SQLite.
+
+Used for background work (boarding-pass emails) when Redis/RQ is not
+available. Jobs survive restarts, and a fixed-size WorkerPool bounds how
+many run at once no matter how bursty enqueueing gets.
+
+- priority: higher runs first, then FIFO by run_at
+- retries: a failing job is re-queued with exponential backoff until
+  max_attempts, then moved to the 'dead' state (dead-letter) for inspection
+- visibility timeout: a claimed job carries a lease; if its worker dies
+  before completing, the job becomes claimable again once the lease expires.
+  A job whose lease expired on its last attempt is dead-lettered, so a job
+  that keeps killing its worker cannot loop forever. complete()/fail() only
+  apply while the caller still holds the lease.
+- completed jobs older than purge_after are deleted by the WorkerPool
+
+Tasks are referenced by import path ('module.function') and called with
+JSON-serialisable args/kwargs, the same convention RQ uses.
+"""
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    func TEXT NOT NULL,
+    args TEXT NOT NULL,
+    kwargs TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at REAL NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    last_error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, run_at);
+"""
+
+
+def resolve(func_path: str):
+    module, _, name = func_path.rpartition('.')
+    return getattr(importlib.import_module(module), name)
+
+
+class JobQueue:
+    def __init__(self, path: str, visibility_timeout: float = 300.0, backoff_base: float = 5.0):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.backoff_base = backoff_base
+        self._local = threading.local()
+        self._conn().conn.executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.DatabaseError:
+                pass
+            self._local.conn = conn
+        return _Tx(conn)
+
+    def enqueue(self, func: str, *args, priority: int = 0, max_attempts: int = 5, delay: float = 0, **kwargs) -> str:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._conn() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, func, args, kwargs, priority, max_attempts, run_at, created, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, func, json.dumps(list(args)), json.dumps(kwargs), int(priority), int(max_attempts), now + delay, now, now))
+        return job_id
+
+    def claim(self, worker: str):
+        """Lease the next ready job for worker, or return None."""
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', lease_until = NULL, updated = ?, "
+                "last_error = COALESCE(last_error || '; ', '') || 'lease expired on attempt ' || attempts "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts", (now, now))
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND run_at <= ?) "
+                "OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY priority DESC, run_at LIMIT 1", (now, now)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, worker = ?, updated = ? WHERE id = ?",
+                (now + self.visibility_timeout, worker, now, row['id']))
+        job = dict(row)
+        job['attempts'] += 1
+        job['worker'] = worker
+        job['args'] = json.loads(job['args'])
+        job['kwargs'] = json.loads(job['kwargs'])
+        return job
+
+    def complete(self, job: dict) -> bool:
+        """Mark a claimed job done. False if another worker has taken it over since."""
+        with self._conn() as conn:
+            cur = conn.execute("UPDATE jobs SET status = 'done', lease_until = NULL, updated = ? "
+                               "WHERE id = ? AND worker = ? AND status = 'running'", (time.time(), job['id'], job['worker']))
+            return cur.rowcount > 0
+
+    def fail(self, job: dict, error: str):
+        """Re-queue with backoff or dead-letter. Returns the new state, or None if the lease was lost."""
+        now = time.time()
+        with self._conn() as conn:
+            if job['attempts'] >= job['max_attempts']:
+                state, sql, params = 'dead', "status = 'dead', lease_until = NULL, last_error = ?, updated = ?", (error, now)
+            else:
+                delay = self.backoff_base * (2 ** (job['attempts'] - 1))
+                state, sql, params = 'queued', "status = 'queued', lease_until = NULL, run_at = ?, last_error = ?, updated = ?", (now + delay, error, now)
+            cur = conn.execute(f"UPDATE jobs SET {sql} WHERE id = ? AND worker = ? AND status = 'running'",
+                               params + (job['id'], job['worker']))
+            return state if cur.rowcount else None
+
+    def stats(self):
+        with self._conn() as conn:
+            rows = conn.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status').fetchall()
+        return {r['status']: r['n'] for r in rows}
+
+    def dead_letters(self, limit: int = 100):
+        with self._conn() as conn:
+            rows = conn.execute("SELECT id, func, args, attempts, last_error, updated FROM jobs WHERE status = 'dead' "
+                                "ORDER BY updated DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def requeue(self, job_id: str) -> bool:
+        now = time.time()
+        with self._conn() as conn:
+            cur = conn.execute("UPDATE jobs SET status = 'queued', attempts = 0, run_at = ?, updated = ? WHERE id = ? AND status = 'dead'",
+                               (now, now, job_id))
+            return cur.rowcount > 0
+
+    def purge(self, older_than_seconds: float = 86400) -> int:
+        """Delete completed jobs older than the given age. Returns the number deleted."""
+        with self._conn() as conn:
+            cur = conn.execute("DELETE FROM jobs WHERE status = 'done' AND updated < ?", (time.time() - older_than_seconds,))
+            return cur.rowcount
+
+
+class _Tx:
+    """BEGIN IMMEDIATE ... COMMIT around a block so claim() is atomic across processes."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+class WorkerPool:
+    """Fixed number of threads draining a JobQueue."""
+
+    def __init__(self, queue: JobQueue, workers: int = 2, poll_interval: float = 0.5, on_error=None,
+                 purge_after: float = 86400, purge_interval: float = 600):
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.on_error = on_error
+        self.purge_after = purge_after
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._purge_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads = []
+        self.name = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, args=(f"{self.name}-{i}",), daemon=True, name=f"jobs-{i}")
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def notify(self):
+        """Wake idle workers after an enqueue instead of waiting for the next poll."""
+        self._wake.set()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def run_once(self, worker: str = 'inline') -> bool:
+        job = self.queue.claim(worker)
+        if job is None:
+            return False
+        try:
+            resolve(job['func'])(*job['args'], **job['kwargs'])
+        except Exception as e:
+            state = self.queue.fail(job, f"{type(e).__name__}: {e}")
+            if self.on_error:
+                try:
+                    self.on_error(job, e, state)
+                except Exception:
+                    pass
+        else:
+            self.queue.complete(job)
+        return True
+
+    def maybe_purge(self):
+        """Drop old completed jobs at most once per purge_interval across the pool's threads."""
+        now = time.time()
+        if now < self._next_purge or not self._purge_lock.acquire(blocking=False):
+            return 0
+        try:
+            self._next_purge = now + self.purge_interval
+            return self.queue.purge(self.purge_after)
+        finally:
+            self._purge_lock.release()
+
+    def _run(self, worker):
+        while not self._stop.is_set():
+            try:
+                did_work = self.run_once(worker)
+            except Exception:
+                traceback.print_exc()
+                did_work = False
+            if not did_work:
+                try:
+                    self.maybe_purge()
+                except Exception:
+                    traceback.print_exc()
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
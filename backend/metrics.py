@@ -0,0 +1,217 @@
+"""In-process request metrics with Prometheus text exposition.
+
+Histograms use HDR-style log-linear buckets. Each power of two between
+min_value and max_value is split into SUB_BUCKETS equal steps, so the
+relative error of any quantile stays within 1/SUB_BUCKETS. Recording is a
+bisect and an increment.
+
+Series:
+
+    http_requests_total{method,route,status}            counter
+    http_request_duration_seconds{method,route}          histogram
+    http_request_size_bytes / http_response_size_bytes   histogram
+    http_requests_in_flight                              gauge
+    app_stage_duration_seconds{stage}                    histogram (storage, render, smtp, ...)
+
+Routes are labelled by their URL rule ('/api/flights/<flight_id>/seats'),
+never the raw path, so the number of series stays bounded.
+
+timed(stage) is a context manager and decorator for the internal stage
+timers. Each timed stage is also added to the current request's slow-log
+trace (see slowlog.py).
+"""
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+
+import slowlog
+
+SUB_BUCKETS = 4
+
+
+def log_linear_bounds(min_value, max_value, sub=SUB_BUCKETS):
+    bounds = []
+    k = math.floor(math.log2(min_value))
+    while True:
+        base = 2.0 ** k
+        for i in range(sub):
+            b = float(f'{base * (1 + i / sub):.4g}')
+            if b >= min_value and (not bounds or b > bounds[-1]):
+                bounds.append(b)
+            if b >= max_value:
+                return bounds
+        k += 1
+
+
+LATENCY_BOUNDS = log_linear_bounds(0.0001, 60.0)     # 100us .. 60s
+SIZE_BOUNDS = [float(4 ** k) for k in range(3, 14)]  # 64 B .. 64 MiB
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (None if empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.bounds[i] if i < len(self.bounds) else float('inf')
+        return float('inf')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    parts = []
+    for n, v in zip(names, values):
+        v = str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{n}="{v}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _fmt(v):
+    if v == float('inf'):
+        return '+Inf'
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}      # name -> (type, help, label names, bounds)
+        self._series = {}    # name -> {label values: Histogram | [value]}
+
+    def _declare(self, kind, name, help_text, labels=(), bounds=None):
+        self._meta[name] = (kind, help_text, tuple(labels), bounds)
+        self._series.setdefault(name, {})
+
+    def counter(self, name, help_text, labels=()):
+        self._declare('counter', name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        self._declare('gauge', name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), bounds=LATENCY_BOUNDS):
+        self._declare('histogram', name, help_text, labels, bounds)
+
+    def inc(self, name, labels=(), n=1):
+        with self._lock:
+            series = self._series[name]
+            cell = series.get(labels)
+            if cell is None:
+                cell = series[labels] = [0]
+            cell[0] += n
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            series = self._series[name]
+            h = series.get(labels)
+            if h is None:
+                h = series[labels] = Histogram(self._meta[name][3])
+            h.observe(value)
+
+    def get(self, name, labels=()):
+        with self._lock:
+            return self._series.get(name, {}).get(labels)
+
+    def render(self):
+        """Prometheus text exposition format 0.0.4."""
+        out = []
+        with self._lock:
+            for name, (kind, help_text, label_names, bounds) in self._meta.items():
+                out.append(f'# HELP {name} {help_text}')
+                out.append(f'# TYPE {name} {kind}')
+                for values, cell in sorted(self._series[name].items()):
+                    if kind != 'histogram':
+                        out.append(f'{name}{_labels(label_names, values)} {_fmt(cell[0])}')
+                        continue
+                    names = label_names + ('le',)
+                    cumulative = 0
+                    for i, c in enumerate(cell.counts):
+                        cumulative += c
+                        le = bounds[i] if i < len(bounds) else float('inf')
+                        out.append(f'{name}_bucket{_labels(names, values + (_fmt(le),))} {cumulative}')
+                    out.append(f'{name}_sum{_labels(label_names, values)} {_fmt(cell.sum)}')
+                    out.append(f'{name}_count{_labels(label_names, values)} {cell.count}')
+        return '\n'.join(out) + '\n'
+
+    def summary(self, name, quantiles=(0.5, 0.95, 0.99)):
+        """{label values: {count, mean, p50, ...}} for one histogram, for JSON views."""
+        with self._lock:
+            label_names = self._meta[name][2]
+            out = []
+            for values, h in sorted(self._series[name].items()):
+                row = dict(zip(label_names, values))
+                row['count'] = h.count
+                row['mean'] = round(h.sum / h.count, 6) if h.count else None
+                for q in quantiles:
+                    row[f'p{int(q * 100)}'] = h.quantile(q)
+                out.append(row)
+            return out
+
+
+registry = Registry()
+registry.counter('http_requests_total', 'HTTP requests by route and status.', ('method', 'route', 'status'))
+registry.histogram('http_request_duration_seconds', 'Request latency in seconds.', ('method', 'route'))
+registry.histogram('http_request_size_bytes', 'Request body size in bytes.', ('route',), SIZE_BOUNDS)
+registry.histogram('http_response_size_bytes', 'Response body size in bytes.', ('route',), SIZE_BOUNDS)
+registry.gauge('http_requests_in_flight', 'Requests currently being served.')
+registry.histogram('app_stage_duration_seconds', 'Time spent in internal stages (storage, render, smtp).', ('stage',))
+
+
+def request_finished(method, route, status, seconds, request_bytes=None, response_bytes=None):
+    registry.inc('http_requests_total', (method, route, str(status)))
+    registry.observe('http_request_duration_seconds', (method, route), seconds)
+    if request_bytes:
+        registry.observe('http_request_size_bytes', (route,), request_bytes)
+    if response_bytes is not None:
+        registry.observe('http_response_size_bytes', (route,), response_bytes)
+
+
+def in_flight(delta):
+    registry.inc('http_requests_in_flight', (), delta)
+
+
+class timed:
+    """with timed('storage_write'): ...  or  @timed('render')"""
+    __slots__ = ('stage', 'start', 'trace')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.trace = slowlog.enter()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        registry.observe('app_stage_duration_seconds', (self.stage,), elapsed)
+        slowlog.leave(self.trace, self.stage, elapsed)
+        return False
+
+    def __call__(self, fn):
+        stage = self.stage
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return fn(*args, **kwargs)
+        return wrapper
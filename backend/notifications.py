@@ -0,0 +1,182 @@
+"""Asynchronous, bounded notification dispatcher.
+
+Admin notifications used to be sent inline in the HTTP request, one SMTP
+connection per recipient. The dispatcher instead accepts a batch, returns a
+job immediately and delivers in the background:
+
+- a fixed worker pool caps how many sends run at once,
+- a token bucket per recipient domain keeps us under provider rate limits,
+- failed sends are retried with exponential backoff,
+- job progress can be polled (to_dict) or watched via the version counter.
+
+Waits for rate limits and backoff are scheduled with timers rather than
+sleeping, so they never hold a worker slot.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class NotificationJob:
+    def __init__(self, kind: str, total: int, meta: dict = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.total = total
+        self.meta = meta or {}
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.retries = 0
+        self.results = []
+        self.created = datetime.utcnow().isoformat() + 'Z'
+        self.finished = None
+        self.version = 0
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def status(self):
+        if self.done.is_set():
+            return 'completed'
+        return 'running' if (self.sent or self.failed or self.skipped) else 'queued'
+
+    def record(self, result: dict):
+        with self._lock:
+            self.results.append(result)
+            state = result.get('status')
+            if state == 'sent':
+                self.sent += 1
+            elif state == 'skipped':
+                self.skipped += 1
+            else:
+                self.failed += 1
+            self.version += 1
+            if self.sent + self.failed + self.skipped >= self.total and not self.done.is_set():
+                self.finished = datetime.utcnow().isoformat() + 'Z'
+                self.done.set()
+
+    def note_retry(self):
+        with self._lock:
+            self.retries += 1
+            self.version += 1
+
+    def to_dict(self, include_results: bool = True):
+        with self._lock:
+            out = {
+                'job_id': self.id,
+                'type': self.kind,
+                'status': self.status,
+                'created': self.created,
+                'finished': self.finished,
+                'summary': {'total': self.total, 'success': self.sent, 'failed': self.failed,
+                            'skipped': self.skipped, 'pending': self.total - self.sent - self.failed - self.skipped,
+                            'retries': self.retries},
+                'version': self.version,
+            }
+            out.update(self.meta)
+            if include_results:
+                out['results'] = list(self.results)
+            return out
+
+
+class DomainRateLimiter:
+    """Token bucket per domain. try_acquire returns 0 when a send may proceed,
+    otherwise the number of seconds until the next token."""
+
+    def __init__(self, rate_per_second: float, burst: int = None):
+        self.rate = float(rate_per_second)
+        self.burst = float(burst if burst is not None else max(1, int(rate_per_second)))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, domain: str) -> float:
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(domain, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[domain] = (tokens - 1, now)
+                return 0.0
+            self._buckets[domain] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+
+class NotificationDispatcher:
+    def __init__(self, max_workers: int = 4, per_domain_rate: float = 5.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, max_jobs: int = 200):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_jobs = max_jobs
+        self.limiter = DomainRateLimiter(per_domain_rate)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='notify')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_workers=int(os.getenv('NOTIFY_WORKERS') or 4),
+            per_domain_rate=float(os.getenv('NOTIFY_DOMAIN_RATE') or 5),
+            max_retries=int(os.getenv('NOTIFY_MAX_RETRIES') or 3),
+            backoff_base=float(os.getenv('NOTIFY_BACKOFF_SECONDS') or 0.5),
+        )
+
+    def submit(self, kind: str, items: list, send_fn, meta: dict = None) -> NotificationJob:
+        """Queue items for delivery and return the job immediately.
+
+        Each item is a dict with 'recipient' and 'domain'; an item carrying a
+        'skip' reason is recorded as skipped without calling send_fn.
+        send_fn(item) performs one delivery and raises on failure.
+        """
+        job = NotificationJob(kind, len(items), meta)
+        with self._lock:
+            self._jobs[job.id] = job
+            excess = len(self._jobs) - self.max_jobs
+            if excess > 0:
+                # evict the oldest finished jobs; running ones stay until they finish
+                finished = [jid for jid, j in self._jobs.items() if j.done.is_set()][:excess]
+                for jid in finished:
+                    self._jobs.pop(jid)
+        if not items:
+            job.finished = datetime.utcnow().isoformat() + 'Z'
+            job.done.set()
+        for item in items:
+            if item.get('skip'):
+                job.record({'recipient': item.get('recipient'), 'status': 'skipped', 'reason': item['skip']})
+            else:
+                self._schedule(job, item, send_fn, attempt=1, delay=0)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _schedule(self, job, item, send_fn, attempt, delay):
+        if delay > 0:
+            t = threading.Timer(delay, self._pool.submit, args=(self._deliver, job, item, send_fn, attempt))
+            t.daemon = True
+            t.start()
+        else:
+            self._pool.submit(self._deliver, job, item, send_fn, attempt)
+
+    def _deliver(self, job, item, send_fn, attempt):
+        wait = self.limiter.try_acquire(item.get('domain') or '')
+        if wait > 0:
+            self._schedule(job, item, send_fn, attempt, wait)
+            return
+        try:
+            method = send_fn(item)
+        except Exception as e:
+            if attempt <= self.max_retries:
+                job.note_retry()
+                self._schedule(job, item, send_fn, attempt + 1, self.backoff_base * (2 ** (attempt - 1)))
+                return
+            job.record({'recipient': item.get('recipient'), 'status': 'failed', 'error': str(e), 'attempts': attempt})
+            return
+        job.record({'recipient': item.get('recipient'), 'status': 'sent', 'method': method, 'attempts': attempt})
@@ -0,0 +1,98 @@
+"""Cursor pagination, filters and field projection for passenger lists.
+
+Records are ordered by (flight, passport), which is unique per booking and
+does not move when other records are added or removed. A cursor is the
+opaque, URL-safe encoding of the last key on the previous page; the next
+page starts strictly after it, so inserts and deletes never shift or repeat
+entries the way offsets do.
+
+SortedIndex keeps the records sorted by that key and is rebuilt only when
+the store changes, so a page is a bisect plus `limit` steps.
+"""
+import base64
+import json
+from bisect import bisect_right
+
+FILTER_FLAGS = ('checked_in', 'baggage_paid')
+_TRUE = ('1', 'true', 'yes')
+_FALSE = ('0', 'false', 'no')
+
+
+def sort_key(p):
+    return (str(p.get('flight') or ''), str(p.get('passport') or ''))
+
+
+def encode_cursor(key):
+    raw = json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Cursor string -> key tuple. Raises ValueError if it was not issued by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw.decode('utf-8'))
+    except Exception:
+        raise ValueError('invalid cursor')
+    if not (isinstance(key, list) and len(key) == 2 and all(isinstance(k, str) for k in key)):
+        raise ValueError('invalid cursor')
+    return tuple(key)
+
+
+def parse_fields(value):
+    """'name,seat' -> ['name', 'seat']; empty -> None (all fields)."""
+    fields = [f.strip() for f in (value or '').split(',') if f.strip()]
+    return fields or None
+
+
+def project(record, fields):
+    if not fields:
+        return record
+    return {f: record[f] for f in fields if f in record}
+
+
+def parse_filters(args):
+    """flight / checked_in / baggage_paid query args -> dict. Raises ValueError on bad booleans."""
+    filters = {}
+    if args.get('flight'):
+        filters['flight'] = args.get('flight')
+    for name in FILTER_FLAGS:
+        value = args.get(name)
+        if value is None or value == '':
+            continue
+        value = value.lower()
+        if value in _TRUE:
+            filters[name] = True
+        elif value in _FALSE:
+            filters[name] = False
+        else:
+            raise ValueError(f'{name} must be true or false')
+    return filters
+
+
+def matches(p, filters):
+    if 'flight' in filters and p.get('flight') != filters['flight']:
+        return False
+    for name in FILTER_FLAGS:
+        if name in filters and bool(p.get(name)) != filters[name]:
+            return False
+    return True
+
+
+class SortedIndex:
+    def __init__(self, records=()):
+        self.records = sorted(records, key=sort_key)
+        self.keys = [sort_key(p) for p in self.records]
+
+    def page(self, after=None, limit=None, filters=None):
+        """(records, next_cursor). next_cursor is None on the last page."""
+        start = bisect_right(self.keys, after) if after is not None else 0
+        out = []
+        for i in range(start, len(self.records)):
+            p = self.records[i]
+            if filters and not matches(p, filters):
+                continue
+            if limit is not None and len(out) == limit:
+                return out, encode_cursor(sort_key(out[-1]))
+            out.append(p)
+        return out, None
@@ -0,0 +1,161 @@
+"""Bounded bcrypt executor for admin password checks.
+
+bcrypt is deliberately slow (tens to hundreds of ms per check at the usual
+work factors). Running it inline on request threads lets a burst of admin
+logins, or a credential-stuffing attempt, starve kiosk traffic. Checks run
+instead on a small dedicated pool (bcrypt releases the GIL while hashing, so
+threads get real parallelism), and admission is capped: once max_pending
+checks are queued or running, new ones fail fast with HasherBusy, which the
+API turns into a 503. A check that does not finish within timeout seconds
+raises HasherBusy too, so a slow pool is never mistaken for a wrong password.
+
+Hashes are created with BCRYPT_ROUNDS; needs_rehash() flags stored hashes
+made with a different work factor (or stored in plain text) so they can be
+upgraded transparently after a successful login.
+"""
+import hmac
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    """Too many password operations already queued, or the pool is too slow to answer in time."""
+
+
+def _is_bcrypt(stored):
+    return isinstance(stored, str) and stored.startswith('$2')
+
+
+def _rounds_of(stored):
+    try:
+        return int(stored.split('$')[2])
+    except Exception:
+        return None
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = 2, max_pending: int = 8, rounds: int = 12, timeout: float = 10.0):
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='bcrypt')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._latencies = deque(maxlen=512)   # seconds spent hashing, most recent last
+        self._waits = deque(maxlen=512)       # seconds spent queued before a worker picked it up
+        self.stats = {'verified': 0, 'hashed': 0, 'rejected_busy': 0, 'timed_out': 0, 'rehashed': 0}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            workers=int(os.getenv('BCRYPT_WORKERS') or 2),
+            max_pending=int(os.getenv('BCRYPT_MAX_PENDING') or 8),
+            rounds=int(os.getenv('BCRYPT_ROUNDS') or 12),
+            timeout=float(os.getenv('BCRYPT_TIMEOUT_SECONDS') or 10),
+        )
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats['rejected_busy'] += 1
+                raise HasherBusy()
+            self._pending += 1
+        queued = time.perf_counter()
+
+        def run():
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                end = time.perf_counter()
+                with self._lock:
+                    self._waits.append(start - queued)
+                    self._latencies.append(end - start)
+
+        def release(_future):
+            # also fires for futures cancelled while still queued, where run() never starts
+            with self._lock:
+                self._pending -= 1
+        try:
+            future = self._pool.submit(run)
+        except Exception:
+            release(None)
+            raise
+        future.add_done_callback(release)
+        return future
+
+    @staticmethod
+    def _check(password, stored):
+        if _is_bcrypt(stored):
+            try:
+                return bcrypt.checkpw(password.encode('utf-8'), stored.encode('utf-8'))
+            except Exception:
+                return False
+        # legacy plain-text entries
+        return bool(stored) and hmac.compare_digest(str(password), str(stored))
+
+    def _hash(self, password):
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)).decode('utf-8')
+
+    def _wait(self, future):
+        try:
+            return future.result(self.timeout)
+        except FuturesTimeout:
+            future.cancel()
+            with self._lock:
+                self.stats['timed_out'] += 1
+            raise HasherBusy('password check timed out') from None
+
+    def verify(self, password: str, stored: str) -> bool:
+        """Check password against stored hash on the pool. Raises HasherBusy when saturated."""
+        if not (password and stored):
+            return False
+        result = self._wait(self._submit(self._check, password, stored))
+        with self._lock:
+            self.stats['verified'] += 1
+        return result
+
+    def hash(self, password: str) -> str:
+        """bcrypt hash at the configured work factor, computed on the pool."""
+        result = self._wait(self._submit(self._hash, password))
+        with self._lock:
+            self.stats['hashed'] += 1
+        return result
+
+    def needs_rehash(self, stored: str) -> bool:
+        return not _is_bcrypt(stored) or _rounds_of(stored) != self.rounds
+
+    def rehash_async(self, password: str, on_done):
+        """Compute a fresh hash in the background and pass it to on_done(hash).
+        Skipped silently when the pool is saturated; the next login will retry."""
+        try:
+            future = self._submit(self._hash, password)
+        except HasherBusy:
+            return None
+
+        def done(f):
+            try:
+                on_done(f.result())
+                with self._lock:
+                    self.stats['rehashed'] += 1
+            except Exception:
+                pass
+        future.add_done_callback(done)
+        return future
+
+    def metrics(self):
+        with self._lock:
+            lat = sorted(self._latencies)
+            waits = sorted(self._waits)
+            out = dict(self.stats, pending=self._pending, max_pending=self.max_pending, rounds=self.rounds)
+
+        def pct(values, p):
+            return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 2) if values else None
+        out['hash_ms'] = {'p50': pct(lat, 0.5), 'p95': pct(lat, 0.95), 'max': pct(lat, 1.0), 'samples': len(lat)}
+        out['queue_wait_ms'] = {'p50': pct(waits, 0.5), 'p95': pct(waits, 0.95), 'max': pct(waits, 1.0)}
+        return out
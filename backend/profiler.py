@@ -0,0 +1,203 @@
+"""On-demand request profiling, switched on from the admin API.
+
+While off, the per-request cost is one attribute check (Profiler.active).
+While on, a sample of requests (sample_rate, optionally one route only) is
+profiled in one of two modes:
+
+- cprofile: a cProfile.Profile is enabled around each sampled request and
+  merged into one pstats.Stats. The timings are exact, but the profiled
+  requests run noticeably slower.
+- sample: a background thread reads the stacks of the threads serving
+  sampled requests every interval seconds and counts the collapsed stacks.
+  The cost is bounded by the sampling rate, not by how much Python the
+  request runs.
+
+Results come out as pstats text, a marshalled pstats dump (load with
+pstats.Stats), or collapsed stacks ("a;b;c 42") for flamegraph tools. A
+session stops on its own after duration seconds or max_requests
+requests.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+MODES = ('cprofile', 'sample')
+
+
+def _frame_label(code):
+    return f'{code.co_filename.rsplit("/", 1)[-1]}:{code.co_name}'
+
+
+class Profiler:
+    def __init__(self):
+        self.active = False
+        self._lock = threading.Lock()
+        self._config = {}
+        self._stats = None
+        self._stacks = Counter()
+        self._threads = set()
+        self._sampler = None
+        self.profiled = 0
+        self.started_at = None
+        self.stopped_at = None
+        self._deadline = 0.0
+
+    # --- control -------------------------------------------------------------
+    def start(self, mode='sample', sample_rate=1.0, route=None, duration=60.0, max_requests=None, interval=0.005):
+        if mode not in MODES:
+            raise ValueError(f'mode must be one of {", ".join(MODES)}')
+        if not 0 < float(sample_rate) <= 1:
+            raise ValueError('sample_rate must be in (0, 1]')
+        self.stop()
+        with self._lock:
+            self._config = {
+                'mode': mode, 'sample_rate': float(sample_rate), 'route': route or None,
+                'duration': float(duration), 'max_requests': int(max_requests) if max_requests else None,
+                'interval': float(interval),
+            }
+            self._stats = None
+            self._stacks = Counter()
+            self._threads = set()
+            self.profiled = 0
+            self.started_at = time.time()
+            self.stopped_at = None
+            self._deadline = time.monotonic() + float(duration)
+            self.active = True
+            if mode == 'sample':
+                self._sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+                self._sampler.start()
+
+    def stop(self):
+        with self._lock:
+            if not self.active:
+                return
+            self.active = False
+            self.stopped_at = time.time()
+            sampler, self._sampler = self._sampler, None
+        if sampler is not None and sampler is not threading.current_thread():
+            sampler.join(timeout=1)
+
+    def reset(self):
+        self.stop()
+        with self._lock:
+            self._stats = None
+            self._stacks = Counter()
+            self.profiled = 0
+
+    def status(self):
+        with self._lock:
+            return {
+                'active': self.active, 'config': dict(self._config), 'profiled_requests': self.profiled,
+                'started_at': self.started_at, 'stopped_at': self.stopped_at,
+                'samples': sum(self._stacks.values()),
+            }
+
+    # --- request hooks -------------------------------------------------------
+    def begin(self, route):
+        """Called at request start while active; returns a token for end(), or None if not sampled."""
+        cfg = self._config
+        if time.monotonic() > self._deadline or (cfg['max_requests'] and self.profiled >= cfg['max_requests']):
+            self.stop()
+            return None
+        if cfg['route'] and cfg['route'] != route:
+            return None
+        if cfg['sample_rate'] < 1 and random.random() >= cfg['sample_rate']:
+            return None
+        with self._lock:
+            self.profiled += 1
+        if cfg['mode'] == 'cprofile':
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:
+                # another profiler is already active on this thread
+                return None
+            return prof
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads.add(ident)
+        return ident
+
+    def end(self, token):
+        if token is None:
+            return
+        if isinstance(token, cProfile.Profile):
+            token.disable()
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(token)
+                else:
+                    self._stats.add(token)
+            return
+        with self._lock:
+            self._threads.discard(token)
+
+    def _sample_loop(self):
+        me = threading.get_ident()
+        interval = self._config['interval']
+        while self.active:
+            time.sleep(interval)
+            with self._lock:
+                threads = set(self._threads)
+            if not threads:
+                if time.monotonic() > self._deadline:
+                    self.stop()
+                continue
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is None or ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                key = ';'.join(reversed(stack))
+                with self._lock:
+                    self._stacks[key] += 1
+
+    # --- reports -------------------------------------------------------------
+    def collapsed(self):
+        """Collapsed stacks, one 'frame;frame;frame count' line per stack."""
+        with self._lock:
+            if self._stacks:
+                return ''.join(f'{stack} {n}\n' for stack, n in self._stacks.most_common())
+            stats = self._stats
+        if stats is None:
+            return ''
+        # cprofile mode: caller -> callee edges give one level of stack per line
+        lines = []
+        for (filename, _line, func), (_cc, _nc, tt, _ct, callers) in stats.stats.items():
+            callee = f'{filename.rsplit("/", 1)[-1]}:{func}'
+            for (cfile, _cline, cfunc), entry in callers.items():
+                own = entry[2] if isinstance(entry, tuple) else tt
+                lines.append((f'{cfile.rsplit("/", 1)[-1]}:{cfunc};{callee}', int(own * 1e6)))
+            if not callers:
+                lines.append((callee, int(tt * 1e6)))
+        return ''.join(f'{stack} {n}\n' for stack, n in sorted(lines, key=lambda x: -x[1]) if n)
+
+    def text(self, sort='cumulative', limit=50):
+        buf = io.StringIO()
+        with self._lock:
+            if self._stats is None:
+                stats = None
+            else:
+                stats = pstats.Stats(stream=buf).add(self._stats)
+        if stats is None:
+            return self.collapsed()
+        stats.sort_stats(sort).print_stats(limit)
+        return buf.getvalue()
+
+    def dump(self):
+        """Marshalled pstats data (what Stats.dump_stats writes), or None."""
+        with self._lock:
+            stats = self._stats
+            if stats is None:
+                return None
+            return marshal.dumps(stats.stats)
@@ -0,0 +1,246 @@
+"""Rate limiting with constant memory per key.
+
+Two algorithms, each keeping a fixed-size state tuple per key:
+
+- TokenBucket(capacity, period): bursts up to capacity, refilling
+  capacity tokens every period seconds. State: (tokens, last_refill).
+- SlidingWindow(limit, window): at most ~limit events per rolling window,
+  estimated from the current and previous fixed windows. State:
+  (window_start, previous_count, current_count).
+
+Two backends hold the state:
+
+- MemoryBackend: per-process LRU capped at max_keys. Keys are kept in
+  last-touched order, so idle keys are dropped from the front in O(expired).
+- SQLiteBackend: one row per key in a shared database file, so limits hold
+  across gunicorn workers. Point RATE_LIMIT_DB at /dev/shm to keep it in
+  shared memory.
+
+Limits are configured as "<count>/<seconds>" strings, e.g. RATE_LIMIT_LOGIN=30/60.
+
+Backends are grouped into pools. Request throttles share the 'default'
+pool. Failed-login lockout state lives in its own 'lockout' pool
+(RATE_LIMIT_LOCKOUT_MAX_KEYS, default 100000; its own SQLite file), so a
+flood of kiosk traffic cannot evict it from the LRU and lift a lockout
+early.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, period: float):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / float(period)
+        # after this long untouched a bucket is full again, i.e. indistinguishable from a new key
+        self.horizon = float(period)
+
+    def apply(self, state, now, cost, consume):
+        """Return (new_state, allowed, retry_after)."""
+        tokens, last = state if state else (self.capacity, now)
+        tokens = min(self.capacity, tokens + max(0.0, now - last) * self.rate)
+        if tokens >= cost:
+            return ((tokens - cost) if consume else tokens, now), True, 0.0
+        return (tokens, now), False, (cost - tokens) / self.rate
+
+
+class SlidingWindow:
+    def __init__(self, limit: float, window: float):
+        self.limit = float(limit)
+        self.window = float(window)
+        self.horizon = 2 * self.window
+
+    def apply(self, state, now, cost, consume):
+        start = math.floor(now / self.window) * self.window
+        if state:
+            old_start, prev, cur = state
+            if old_start != start:
+                prev = cur if old_start == start - self.window else 0.0
+                cur = 0.0
+        else:
+            prev, cur = 0.0, 0.0
+        elapsed = now - start
+        estimate = prev * (1 - elapsed / self.window) + cur
+        if estimate + cost <= self.limit:
+            return (start, prev, cur + cost if consume else cur), True, 0.0
+        return (start, prev, cur), False, self._retry_after(prev, cur, cost, elapsed)
+
+    def _retry_after(self, prev, cur, cost, elapsed):
+        room = self.limit - cur - cost
+        if room >= 0 and prev > 0:
+            # previous window's weight decays enough later in this window
+            return max(0.0, self.window * (1 - room / prev) - elapsed)
+        # wait for the next window, where the current count becomes the decaying one
+        until_next = self.window - elapsed
+        if cur <= 0 or self.limit - cost < 0:
+            return until_next
+        return until_next + max(0.0, self.window * (1 - (self.limit - cost) / cur))
+
+
+class MemoryBackend:
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._states = OrderedDict()  # (scope, key) -> (state, touched)
+        self._lock = threading.Lock()
+
+    def update(self, scope, key, fn, now, horizon):
+        with self._lock:
+            self._expire(now)
+            k = (scope, key)
+            entry = self._states.pop(k, None)
+            state = entry[0] if entry and now - entry[1] < horizon else None
+            new_state, result = fn(state)
+            self._states[k] = (new_state, now, horizon)
+            while len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+            return result
+
+    def _expire(self, now):
+        # oldest-touched first; stop at the first key still inside its horizon
+        while self._states:
+            k, (state, touched, horizon) = next(iter(self._states.items()))
+            if now - touched < horizon:
+                break
+            del self._states[k]
+
+    def __len__(self):
+        return len(self._states)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    a REAL, b REAL, c REAL,
+    touched REAL NOT NULL,
+    horizon REAL NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+CREATE INDEX IF NOT EXISTS rate_limits_touched ON rate_limits (touched);
+"""
+
+
+class SQLiteBackend:
+    """Limiter state shared by every process that opens the same file."""
+
+    def __init__(self, path: str, max_keys: int = 100000, cleanup_interval: float = 60.0):
+        self.path = path
+        self.max_keys = max_keys
+        self.cleanup_interval = cleanup_interval
+        self._local = threading.local()
+        self._next_cleanup = 0.0
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=OFF')
+            except sqlite3.DatabaseError:
+                pass
+            self._local.conn = conn
+        return conn
+
+    def update(self, scope, key, fn, now, horizon):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT a, b, c, touched FROM rate_limits WHERE scope = ? AND key = ?', (scope, key)).fetchone()
+            state = None
+            if row and now - row[3] < horizon:
+                state = tuple(v for v in row[:3] if v is not None)
+            new_state, result = fn(state)
+            padded = tuple(new_state) + (None,) * (3 - len(new_state))
+            conn.execute('INSERT OR REPLACE INTO rate_limits (scope, key, a, b, c, touched, horizon) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                         (scope, key) + padded + (now, horizon))
+            if now >= self._next_cleanup:
+                self._next_cleanup = now + self.cleanup_interval
+                self._cleanup(conn, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return result
+
+    def _cleanup(self, conn, now):
+        conn.execute('DELETE FROM rate_limits WHERE touched + horizon < ?', (now,))
+        excess = conn.execute('SELECT COUNT(*) FROM rate_limits').fetchone()[0] - self.max_keys
+        if excess > 0:
+            conn.execute('DELETE FROM rate_limits WHERE rowid IN (SELECT rowid FROM rate_limits ORDER BY touched LIMIT ?)', (excess,))
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM rate_limits').fetchone()[0]
+
+    def clear(self):
+        self._conn().execute('DELETE FROM rate_limits')
+
+
+class RateLimiter:
+    def __init__(self, scope: str, algorithm, backend):
+        self.scope = scope
+        self.algorithm = algorithm
+        self.backend = backend
+
+    def _run(self, key, cost, consume):
+        now = time.time()
+
+        def step(state):
+            new_state, allowed, retry_after = self.algorithm.apply(state, now, cost, consume)
+            return new_state, (allowed, retry_after)
+        return self.backend.update(self.scope, str(key), step, now, self.algorithm.horizon)
+
+    def hit(self, key, cost: float = 1):
+        """Count an event for key. Returns (allowed, retry_after_seconds)."""
+        return self._run(key, cost, True)
+
+    def check(self, key, cost: float = 1):
+        """Like hit() but without consuming anything."""
+        return self._run(key, cost, False)
+
+
+def parse_limit(spec: str):
+    """'30/60' -> (30.0, 60.0)."""
+    count, _, seconds = str(spec).partition('/')
+    return float(count), float(seconds or 1)
+
+
+_backends = {}
+_backend_lock = threading.Lock()
+
+
+def get_backend(pool: str = 'default'):
+    """Process-wide backend for pool, of the kind chosen by RATE_LIMIT_BACKEND (memory | sqlite)."""
+    with _backend_lock:
+        backend = _backends.get(pool)
+        if backend is None:
+            if pool == 'default':
+                max_keys = int(os.getenv('RATE_LIMIT_MAX_KEYS') or 10000)
+            else:
+                max_keys = int(os.getenv(f'RATE_LIMIT_{pool.upper()}_MAX_KEYS') or 100000)
+            if (os.getenv('RATE_LIMIT_BACKEND') or 'memory').lower() == 'sqlite':
+                path = os.getenv('RATE_LIMIT_DB') or os.path.join(os.path.dirname(__file__), 'ratelimit.db')
+                if pool != 'default':
+                    base, ext = os.path.splitext(path)
+                    path = f'{base}-{pool}{ext}'
+                backend = SQLiteBackend(path, max_keys=max_keys)
+            else:
+                backend = MemoryBackend(max_keys=max_keys)
+            _backends[pool] = backend
+        return backend
+
+
+def from_env(scope: str, default: str, algorithm: str = 'bucket'):
+    """Limiter for scope configured by RATE_LIMIT_<SCOPE>, e.g. RATE_LIMIT_LOGIN=30/60."""
+    count, seconds = parse_limit(os.getenv(f'RATE_LIMIT_{scope.upper()}') or default)
+    algo = TokenBucket(count, seconds) if algorithm == 'bucket' else SlidingWindow(count, seconds)
+    return RateLimiter(scope, algo, get_backend())
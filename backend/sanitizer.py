@@ -0,0 +1,68 @@
+"""Input sanitisation for free-text request fields.
+
+sanitize_input() strips <script> blocks and other tags, then HTML-escapes
+any remaining &, < and >. Patterns are compiled once, strings without any
+of those characters are returned untouched (most names, passports and flight
+numbers), and escaping is a single str.translate pass.
+
+sanitize_fields() is the schema-driven variant: only fields declared as
+text are touched, so IDs, numbers and nested blobs are not walked at all.
+"""
+import re
+
+_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]*>')
+_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+_SPECIAL = frozenset('<>&')
+
+TEXT = 'text'
+
+
+def sanitize_text(value: str) -> str:
+    if _SPECIAL.isdisjoint(value):
+        return value
+    if '<' in value:
+        if '<script' in value:
+            value = _SCRIPT_RE.sub('', value)
+        value = _TAG_RE.sub('', value)
+    return value.translate(_ESCAPES)
+
+
+def sanitize_input(data):
+    """Sanitize input data to prevent injection attacks."""
+    if isinstance(data, str):
+        return sanitize_text(data)
+    if isinstance(data, dict):
+        return {k: sanitize_input(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [sanitize_input(x) for x in data]
+    return data
+
+
+def sanitize_fields(data, schema):
+    """Sanitize only the fields declared in schema; everything else passes through.
+
+    schema maps field name -> TEXT, a nested schema dict (for dict values), or
+    a one-element list holding the schema of each list item, e.g.
+
+        {'name': TEXT, 'email': TEXT, 'bags': [{'description': TEXT}]}
+    """
+    if not isinstance(data, dict):
+        return data
+    out = dict(data)
+    for field, rule in schema.items():
+        value = out.get(field)
+        if value is None:
+            continue
+        if rule == TEXT:
+            if isinstance(value, str):
+                out[field] = sanitize_text(value)
+        elif isinstance(rule, dict):
+            out[field] = sanitize_fields(value, rule)
+        elif isinstance(rule, list) and isinstance(value, list):
+            item_rule = rule[0] if rule else TEXT
+            if item_rule == TEXT:
+                out[field] = [sanitize_text(v) if isinstance(v, str) else v for v in value]
+            else:
+                out[field] = [sanitize_fields(v, item_rule) for v in value]
+    return out
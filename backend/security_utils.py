@@ -4,17 +4,117 @@ from datetime import datetime, timedelta
 import re
 import json
 import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from flask import jsonify, request
+import rate_limit
+from activity_log import ActivityLog
+from sanitizer import sanitize_input  # noqa: F401  (re-exported for existing imports)
 
 SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key-here')
 
+
+class TokenCache:
+    """LRU of verified token claims keyed by the token's SHA-256.
+
+    An entry never outlives the token's own exp claim (tokens without exp are
+    kept for at most max_ttl seconds), so a cache hit can only return claims
+    that a full verification would still accept.
+
+    verify_token() uses one for JWTs; app._require_session uses another for
+    the opaque session tokens in sessions.json. For a file-backed store, pass
+    its version (e.g. mtime) to sync() before each lookup so edits made by
+    other processes drop the cached entries.
+    """
+
+    def __init__(self, max_entries=1024, max_ttl=300):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # digest -> (claims, expires_at)
+        self._lock = threading.Lock()
+        self._version = None
+
+    @staticmethod
+    def _key(token):
+        if isinstance(token, str):
+            token = token.encode('utf-8')
+        return hashlib.sha256(token).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[0])
+
+    def put(self, token, claims, exp=None):
+        """Cache claims until min(now + max_ttl, exp); exp defaults to claims['exp']."""
+        if self.max_entries <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.max_ttl
+        if exp is None:
+            exp = claims.get('exp')
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (dict(claims), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, token):
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def sync(self, version, keep=False):
+        """Note the backing store's current version; a change drops every entry
+        unless keep is set (the caller wrote that version itself)."""
+        with self._lock:
+            if version != self._version:
+                if not keep:
+                    self._entries.clear()
+                self._version = version
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
 class SecurityManager:
     def __init__(self):
-        self.failed_attempts = {}
-        self.blocked_ips = {}
-        self.activity_log = []
+        self.activity_log = ActivityLog.from_env(os.path.join(os.path.dirname(__file__), "admin_activity"))
+        self.token_cache = TokenCache(
+            max_entries=int(os.getenv('JWT_CACHE_SIZE') or 1024),
+            max_ttl=float(os.getenv('JWT_CACHE_TTL') or 300)
+        )
         self.load_security_config()
+        # failed logins per IP over a rolling 15 minutes, O(1) state per IP; kept apart from
+        # the request throttles so their LRU cannot evict a lockout
+        self.login_failures = rate_limit.RateLimiter(
+            'login_failures',
+            rate_limit.SlidingWindow(self.security_config.get('max_login_attempts', 5), 900),
+            rate_limit.get_backend('lockout')
+        )
 
     def load_security_config(self):
         config_file = os.path.join(os.path.dirname(__file__), "system_config.json")
@@ -42,30 +142,14 @@ class SecurityManager:
 
     def check_rate_limit(self, ip_address):
         """Check if IP is within rate limits."""
-        if ip_address in self.blocked_ips:
-            if datetime.now() < self.blocked_ips[ip_address]:
-                return False, "IP temporarily blocked"
-            else:
-                del self.blocked_ips[ip_address]
-                
-        attempts = self.failed_attempts.get(ip_address, [])
-        current_time = datetime.now()
-        
-        # Remove attempts older than 15 minutes
-        attempts = [time for time in attempts if (current_time - time).seconds < 900]
-        self.failed_attempts[ip_address] = attempts
-        
-        if len(attempts) >= self.security_config.get('max_login_attempts', 5):
-            self.blocked_ips[ip_address] = current_time + timedelta(minutes=15)
+        allowed, _retry_after = self.login_failures.check(ip_address)
+        if not allowed:
             return False, "Too many failed attempts"
-            
         return True, "Within rate limit"
 
     def log_failed_attempt(self, ip_address):
         """Log failed login attempt."""
-        if ip_address not in self.failed_attempts:
-            self.failed_attempts[ip_address] = []
-        self.failed_attempts[ip_address].append(datetime.now())
+        self.login_failures.hit(ip_address)
 
     def generate_token(self, user_data):
         """Generate JWT token with refresh capability."""
@@ -88,15 +172,25 @@ class SecurityManager:
         return token, refresh_token
 
     def verify_token(self, token):
-        """Verify JWT token."""
+        """Verify JWT token, reusing claims of a recently verified identical token."""
+        data = self.token_cache.get(token)
+        if data is not None:
+            return True, data
         try:
             data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+            self.token_cache.put(token, data)
             return True, data
         except jwt.ExpiredSignatureError:
             return False, "Token expired"
         except jwt.InvalidTokenError:
             return False, "Invalid token"
 
+    def rotate_secret(self, new_secret):
+        """Switch the JWT signing key; tokens verified under the old key must be re-checked."""
+        global SECRET_KEY
+        SECRET_KEY = new_secret
+        self.token_cache.clear()
+
     def log_activity(self, user_id, action, details=None):
         """Log admin activity for audit."""
         activity = {
@@ -106,14 +200,7 @@ class SecurityManager:
             'ip_address': request.remote_addr,
             'details': details
         }
-        self.activity_log.append(activity)
-        self._save_activity_log()
-
-    def _save_activity_log(self):
-        """Save activity log to file."""
-        log_file = os.path.join(os.path.dirname(__file__), "admin_activity.json")
-        with open(log_file, 'w') as f:
-            json.dump(self.activity_log, f, indent=2)
+        self.activity_log.log(activity)
 
 # Initialize security manager
 security_manager = SecurityManager()
@@ -149,22 +236,6 @@ def require_admin(f):
         return f(*args, **kwargs)
     return decorated
 
-def sanitize_input(data):
-    """Sanitize input data to prevent injection attacks."""
-    if isinstance(data, str):
-        # Remove potential script tags
-        data = re.sub(r'<script[^>]*>.*?</script>', '', data, flags=re.DOTALL)
-        # Remove other potentially dangerous HTML tags
-        data = re.sub(r'<[^>]*>', '', data)
-        # Escape special characters
-        data = data.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        return data
-    elif isinstance(data, dict):
-        return {k: sanitize_input(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [sanitize_input(x) for x in data]
-    return data
-
 def validate_ip_address(ip):
     """Validate IP address format."""
     pattern = r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
@@ -0,0 +1,107 @@
+"""JSON encoding for HTTP responses and the on-disk stores.
+
+Uses orjson when it is installed (several times faster, produces bytes
+directly) and the stdlib json module otherwise. Output is ordinary JSON
+either way. Anything orjson cannot encode (integers wider than 64 bits,
+types only the stdlib default hook knows) falls back to the stdlib for
+that call.
+
+orjson only supports two-space indentation, so with orjson any indent
+writes two spaces. The stores stay human-readable; only the whitespace
+differs.
+"""
+import json
+import os
+import stat
+import tempfile
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+
+def dumps(obj, indent=None, default=None) -> bytes:
+    """obj -> UTF-8 JSON bytes."""
+    if orjson is not None:
+        option = _OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            pass
+    separators = None if indent else (',', ':')
+    return json.dumps(obj, indent=indent, separators=separators, default=default, ensure_ascii=False).encode('utf-8')
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path, default=None, strict=False):
+    """Parse a JSON file; missing, empty or unreadable files give default.
+
+    With strict=True a file that exists but cannot be read or parsed raises
+    (OSError / ValueError) instead, for stores whose next save would
+    otherwise overwrite data that is only temporarily unreadable.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        return loads(data) if data.strip() else default
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError):
+        if strict:
+            raise
+        return default
+
+
+def dump_file(obj, path, indent=2):
+    """Write obj as JSON atomically: a temp file in the same directory is
+    fsynced and renamed over path, so neither readers nor a crash mid-write
+    can leave a truncated store behind."""
+    data = dumps(obj, indent=indent)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                               dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600; keep the permissions the store already had
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider: jsonify() and request parsing go through dumps()/loads()."""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, default=self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, default=self.default) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,131 @@
+"""Slow-request log with a per-stage breakdown of where the time went.
+
+Every request gets a small trace (begin() in before_request). metrics.timed
+adds each stage it measures to the current trace: session lookup, store
+loads and saves, seat map computation, rendering, SMTP and event logging.
+When the request finishes, finish() returns the trace. If the request took
+longer than the threshold, SlowLog.record() keeps it in a bounded ring
+buffer.
+
+Nested stages count toward their own totals. Only the outermost stages
+count toward covered time, so unattributed_ms (total minus covered) is the
+time spent in handler code outside every timed stage.
+
+Settings: SLOW_REQUEST_MS (threshold, default 500) and SLOW_LOG_SIZE
+(buffer size, default 200).
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+
+_trace = contextvars.ContextVar('slowlog_trace', default=None)
+
+
+class Trace:
+    __slots__ = ('stages', 'depth', 'covered')
+
+    def __init__(self):
+        self.stages = {}      # stage -> [count, seconds]
+        self.depth = 0
+        self.covered = 0.0
+
+
+def begin():
+    """Start a trace for the current request; returns a token for finish()."""
+    return _trace.set(Trace())
+
+
+def finish(token):
+    trace = _trace.get()
+    try:
+        _trace.reset(token)
+    except ValueError:
+        # token from another context (should not happen); just drop the trace
+        _trace.set(None)
+    return trace
+
+
+def enter():
+    trace = _trace.get()
+    if trace is not None:
+        trace.depth += 1
+    return trace
+
+
+def leave(trace, stage, seconds):
+    """Close a stage opened with enter() on the trace it returned."""
+    if trace is None:
+        return
+    trace.depth -= 1
+    cell = trace.stages.get(stage)
+    if cell is None:
+        trace.stages[stage] = [1, seconds]
+    else:
+        cell[0] += 1
+        cell[1] += seconds
+    if trace.depth == 0:
+        trace.covered += seconds
+
+
+class SlowLog:
+    def __init__(self, threshold_ms=500.0, capacity=200):
+        self.threshold_ms = float(threshold_ms)
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=int(capacity))
+        self.recorded = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(float(os.getenv('SLOW_REQUEST_MS') or 500), int(os.getenv('SLOW_LOG_SIZE') or 200))
+
+    @property
+    def capacity(self):
+        return self._entries.maxlen
+
+    def record(self, trace, seconds, method, route, status):
+        """Keep the request if it was over the threshold. Returns the entry or None."""
+        ms = seconds * 1000.0
+        if trace is None or ms < self.threshold_ms:
+            return None
+        stages = {
+            stage: {'count': n, 'ms': round(s * 1000.0, 3)}
+            for stage, (n, s) in sorted(trace.stages.items(), key=lambda kv: -kv[1][1])
+        }
+        entry = {
+            'ts': time.time(),
+            'method': method,
+            'route': route,
+            'status': status,
+            'duration_ms': round(ms, 3),
+            'stages': stages,
+            'unattributed_ms': round(max(0.0, seconds - trace.covered) * 1000.0, 3),
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        return entry
+
+    def entries(self, limit=None, route=None):
+        """Newest first, optionally for one route."""
+        with self._lock:
+            out = list(self._entries)
+        out.reverse()
+        if route:
+            out = [e for e in out if e['route'] == route]
+        return out[:limit] if limit else out
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def stage_totals(entries):
+    """Sum of ms per stage across entries, largest first, to see which stage dominates."""
+    totals = {}
+    for e in entries:
+        for stage, s in e['stages'].items():
+            totals[stage] = totals.get(stage, 0.0) + s['ms']
+        totals['unattributed'] = totals.get('unattributed', 0.0) + e['unattributed_ms']
+    return {k: round(v, 3) for k, v in sorted(totals.items(), key=lambda kv: -kv[1])}
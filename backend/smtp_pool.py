@@ -0,0 +1,181 @@
+"""Pooled, persistent SMTP connections.
+
+Opening an SMTP session costs a TCP connect, EHLO, optional STARTTLS and a
+LOGIN round trip. The pool keeps authenticated connections around and hands
+them out per message:
+
+- idle connections are health-checked with NOOP before reuse,
+- a connection is recycled after max_messages sends (servers often cap this),
+- a send that fails on a dead connection is retried once on a fresh one.
+
+Configuration comes from the same SMTP_* environment variables the app has
+always used; get_pool() rebuilds the pool if they change.
+"""
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+
+
+def _is_connection_error(exc):
+    # SMTPException subclasses OSError, so protocol rejections must be told apart from socket failures
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+def _flag(name, default='false'):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+class SMTPPool:
+    def __init__(self, host, port, user=None, password=None, use_ssl=False, starttls=False,
+                 timeout=10, max_size=4, max_messages=100, idle_check_seconds=30, max_idle_seconds=300):
+        self.host = host
+        self.port = int(port)
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.idle_check_seconds = idle_check_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self._idle = deque()  # (smtp, sent, last_used)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.stats = {'connections_opened': 0, 'connections_recycled': 0, 'messages_sent': 0, 'reconnects': 0, 'failures': 0}
+
+    @classmethod
+    def from_env(cls):
+        host = os.getenv('SMTP_HOST')
+        port = int(os.getenv('SMTP_PORT') or 0)
+        if not (host and port):
+            return None
+        return cls(
+            host, port,
+            user=os.getenv('SMTP_USER'),
+            password=os.getenv('SMTP_PASS'),
+            use_ssl=_flag('SMTP_USE_SSL'),
+            starttls=_flag('SMTP_STARTTLS'),
+            max_size=int(os.getenv('SMTP_POOL_SIZE') or 4),
+            max_messages=int(os.getenv('SMTP_POOL_MAX_MESSAGES') or 100),
+        )
+
+    def _connect(self):
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls()
+                smtp.ehlo()
+        if self.user and self.password:
+            smtp.login(self.user, self.password)
+        with self._lock:
+            self.stats['connections_opened'] += 1
+        return smtp
+
+    @staticmethod
+    def _close(smtp):
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    def _alive(self, smtp):
+        try:
+            return smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self):
+        """Return (smtp, sent) from the idle list, or a new connection."""
+        while True:
+            with self._lock:
+                item = self._idle.pop() if self._idle else None
+            if item is None:
+                return self._connect(), 0
+            smtp, sent, last_used = item
+            idle = time.monotonic() - last_used
+            if idle > self.max_idle_seconds or (idle > self.idle_check_seconds and not self._alive(smtp)):
+                self._close(smtp)
+                continue
+            return smtp, sent
+
+    def _checkin(self, smtp, sent):
+        if sent >= self.max_messages:
+            self._close(smtp)
+            with self._lock:
+                self.stats['connections_recycled'] += 1
+            return
+        with self._lock:
+            self._idle.append((smtp, sent, time.monotonic()))
+
+    def send(self, msg):
+        """Send an EmailMessage, reusing a pooled connection when possible."""
+        self._slots.acquire()
+        try:
+            smtp, sent = self._checkout()
+            try:
+                smtp.send_message(msg)
+            except Exception as e:
+                if not _is_connection_error(e):
+                    # protocol-level rejection (e.g. bad recipient): connection is still usable
+                    self._checkin(smtp, sent + 1)
+                    with self._lock:
+                        self.stats['failures'] += 1
+                    raise
+                self._close(smtp)
+                with self._lock:
+                    self.stats['reconnects'] += 1
+                smtp, sent = self._connect(), 0
+                try:
+                    smtp.send_message(msg)
+                except Exception:
+                    self._close(smtp)
+                    with self._lock:
+                        self.stats['failures'] += 1
+                    raise
+            self._checkin(smtp, sent + 1)
+            with self._lock:
+                self.stats['messages_sent'] += 1
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for smtp, _sent, _last in idle:
+            self._close(smtp)
+
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+
+def _env_key():
+    return tuple(os.getenv(k) for k in ('SMTP_HOST', 'SMTP_PORT', 'SMTP_USER', 'SMTP_PASS', 'SMTP_USE_SSL',
+                                        'SMTP_STARTTLS', 'SMTP_POOL_SIZE', 'SMTP_POOL_MAX_MESSAGES'))
+
+
+def get_pool():
+    """Shared pool for the current SMTP_* settings, or None when SMTP is not configured."""
+    global _pool, _pool_key
+    key = _env_key()
+    with _pool_lock:
+        if _pool is not None and key == _pool_key:
+            return _pool
+        old = _pool
+        _pool = SMTPPool.from_env()
+        _pool_key = key
+    if old is not None:
+        old.close()
+    return _pool
@@ -0,0 +1,214 @@
+"""Fingerprinted, precompressed static assets for the kiosk frontend.
+
+At startup StaticAssets walks frontend/ once and builds a manifest with an
+entry per file:
+
+- a content hash;
+- a fingerprinted name (style.css -> style.3f2a1b9c4d5e.css);
+- the body, plus gzip and (if brotli is installed) br variants. These are
+  compressed at maximum level, once, for text types, and kept only when
+  smaller.
+
+HTML pages are rewritten before hashing, so src/href references to other
+assets in the manifest point at the fingerprinted URLs.
+
+Serving:
+
+- fingerprinted URLs are immutable and cached for a year, and stay
+  private when the caller asked for private caching (auth-gated admin
+  files);
+- plain URLs (HTML pages, direct links) are sent with an ETag of the
+  content hash and Cache-Control: no-cache, so repeat visits revalidate
+  with a bodyless 304;
+- the variant is picked from Accept-Encoding;
+- files added after startup are not in the manifest, and callers fall back
+  to send_from_directory.
+
+With reload on (STATIC_RELOAD=1, or the serving app in debug mode, checked
+per request so `app.run(debug=True)` counts), an entry whose file changed on
+disk is rebuilt on its next request, and fingerprinted URLs are revalidated
+instead of cached as immutable.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response, current_app, has_app_context
+
+import compression
+from conditional import etag_matches
+
+try:
+    import brotli
+except ImportError:  # optional: gzip variants only
+    brotli = None
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+IMMUTABLE_PRIVATE = 'private, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+TEXT_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+_REF_RE = re.compile(r'''(\b(?:src|href)=["'])([^"'#?${}]+)(["'])''')
+
+
+class Asset:
+    __slots__ = ('path', 'body', 'digest', 'mimetype', 'variants', 'mtime_ns', 'fingerprinted')
+
+    def __init__(self, path, body, mimetype, mtime_ns):
+        self.path = path
+        self.body = body
+        self.mimetype = mimetype
+        self.mtime_ns = mtime_ns
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        stem, ext = os.path.splitext(path)
+        self.fingerprinted = f'{stem}.{self.digest}{ext}'
+        self.variants = {}
+        if mimetype.startswith(TEXT_TYPES) and len(body) >= 256:
+            candidates = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                candidates['br'] = brotli.compress(body, quality=11)
+            self.variants = {enc: data for enc, data in candidates.items() if len(data) < len(body)}
+
+
+class StaticAssets:
+    def __init__(self, root, reload=False):
+        self.root = os.path.abspath(root)
+        self.reload = reload
+        self.assets = {}        # relative path -> Asset
+        self.fingerprints = {}  # fingerprinted relative path -> Asset
+
+    # --- manifest ------------------------------------------------------------
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for name in filenames:
+                if not name.startswith('.'):
+                    full = os.path.join(dirpath, name)
+                    yield os.path.relpath(full, self.root).replace(os.sep, '/'), full
+
+    @staticmethod
+    def _mimetype(path):
+        if path.endswith('.js'):
+            return 'application/javascript'
+        return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    def _load(self, rel, full):
+        with open(full, 'rb') as f:
+            body = f.read()
+        return body, self._mimetype(rel), os.stat(full).st_mtime_ns
+
+    def build(self):
+        """Hash and compress every file; HTML last so its references can be rewritten."""
+        assets, pages = {}, []
+        for rel, full in self._walk():
+            try:
+                body, mimetype, mtime = self._load(rel, full)
+            except OSError:
+                continue
+            if mimetype == 'text/html':
+                pages.append((rel, body, mimetype, mtime))
+            else:
+                assets[rel] = Asset(rel, body, mimetype, mtime)
+        self.assets = assets
+        for rel, body, mimetype, mtime in pages:
+            assets[rel] = Asset(rel, self.rewrite(rel, body), mimetype, mtime)
+        # pages are only served under their own name (some are behind an auth check)
+        self.fingerprints = {a.fingerprinted: a for a in assets.values() if a.mimetype != 'text/html'}
+        return self
+
+    def rewrite(self, rel, body):
+        """Point src/href references to known non-HTML assets at their fingerprinted URLs."""
+        try:
+            text = body.decode('utf-8')
+        except UnicodeDecodeError:
+            return body
+        base = os.path.dirname(rel)
+
+        def sub(m):
+            ref = m.group(2)
+            if '://' in ref or ref.startswith('//'):
+                return m.group(0)
+            target = ref.lstrip('/') if ref.startswith('/') else os.path.normpath(os.path.join(base, ref)).replace(os.sep, '/')
+            asset = self.assets.get(target)
+            if asset is None or asset.mimetype == 'text/html':
+                return m.group(0)
+            if ref.startswith('/'):
+                url = '/' + asset.fingerprinted
+            else:
+                url = os.path.relpath(asset.fingerprinted, base or '.').replace(os.sep, '/')
+            return m.group(1) + url + m.group(3)
+
+        return _REF_RE.sub(sub, text).encode('utf-8')
+
+    def url_for(self, path):
+        asset = self.assets.get(path.lstrip('/'))
+        return '/' + asset.fingerprinted if asset else '/' + path.lstrip('/')
+
+    def manifest(self):
+        return {rel: {'url': '/' + a.fingerprinted, 'digest': a.digest, 'size': len(a.body),
+                      'encodings': {enc: len(data) for enc, data in a.variants.items()}}
+                for rel, a in sorted(self.assets.items())}
+
+    def _refresh(self, asset):
+        full = os.path.join(self.root, asset.path)
+        try:
+            if os.stat(full).st_mtime_ns == asset.mtime_ns:
+                return asset
+            body, mimetype, mtime = self._load(asset.path, full)
+        except OSError:
+            return asset
+        if mimetype == 'text/html':
+            body = self.rewrite(asset.path, body)
+        fresh = Asset(asset.path, body, mimetype, mtime)
+        self.assets[asset.path] = fresh
+        if mimetype != 'text/html':
+            # pages rendered before the change still link the old fingerprint
+            self.fingerprints[asset.fingerprinted] = fresh
+            self.fingerprints[fresh.fingerprinted] = fresh
+        return fresh
+
+    # --- serving -------------------------------------------------------------
+    def reloading(self):
+        return self.reload or (has_app_context() and current_app.debug)
+
+    def lookup(self, path):
+        """(asset, immutable) for a request path, or (None, False)."""
+        path = path.lstrip('/')
+        reload = self.reloading()
+        asset = self.fingerprints.get(path)
+        if asset is not None:
+            if reload:
+                return self._refresh(asset), False
+            return asset, True
+        asset = self.assets.get(path)
+        if asset is not None and reload:
+            asset = self._refresh(asset)
+        return asset, False
+
+    def response(self, path, request, cache_control=REVALIDATE):
+        """Response for path, or None if it is not in the manifest."""
+        asset, immutable = self.lookup(path)
+        if asset is None:
+            return None
+        etag = f'"{asset.digest}"'
+        if immutable:
+            cache = IMMUTABLE_PRIVATE if cache_control.startswith('private') else IMMUTABLE
+        else:
+            cache = cache_control
+        matched = etag_matches(request.headers.get('If-None-Match'), etag)
+        if matched:
+            resp = Response(status=304)
+            resp.headers['ETag'] = matched
+        else:
+            encoding = compression.negotiate(request.headers.get('Accept-Encoding'), tuple(asset.variants))
+            resp = Response(asset.variants[encoding] if encoding else asset.body, mimetype=asset.mimetype)
+            if encoding:
+                resp.headers['Content-Encoding'] = encoding
+                etag = f'{etag[:-1]}-{encoding}"'
+            resp.headers['ETag'] = etag
+        resp.headers['Cache-Control'] = cache
+        if asset.variants:
+            resp.vary.add('Accept-Encoding')
+        resp.precompressed = True  # tells compression.compress_response to leave it alone
+        return resp
@@ -0,0 +1,158 @@
+"""Streaming JSON / NDJSON encoding for large exports.
+
+Instead of building a list and serializing it in one go, the encoders below
+take any iterable of records and yield the output in chunks of roughly
+chunk_size bytes. Handed to a Flask Response, this is sent with chunked
+transfer encoding. Memory then holds one chunk plus whatever the iterable
+itself keeps.
+
+iter_file_array() is the matching reader for the on-disk JSON stores. It
+decodes the top-level array of a file one element at a time from a bounded
+read buffer, so events.json can be exported without loading it whole.
+
+The status line has already gone out by the time a mid-stream failure can
+happen. If the record source raises after that, the encoders end the body
+with an {"_export_error": ...} record. For JSON they also leave the array
+unclosed, so a truncated export never looks like a complete document.
+prime() pulls the first record up front, so a source that fails at once
+can still be answered with a proper error status.
+"""
+import itertools
+import json
+
+import serialization
+
+JSON = 'json'
+NDJSON = 'ndjson'
+FORMATS = (JSON, NDJSON)
+MIMETYPES = {JSON: 'application/json', NDJSON: 'application/x-ndjson'}
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WS = ' \t\n\r'
+
+
+def _dumps(record):
+    return serialization.dumps(record, default=str).decode('utf-8')
+
+
+ERROR_KEY = '_export_error'
+
+
+def _error_record(exc):
+    return _dumps({ERROR_KEY: f'{type(exc).__name__}: {exc}'})
+
+
+def prime(records):
+    """Pull the first record now so a source that fails immediately raises here, not mid-response."""
+    it = iter(records)
+    try:
+        first = next(it)
+    except StopIteration:
+        return iter(())
+    return itertools.chain((first,), it)
+
+
+def iter_ndjson(records, chunk_size=CHUNK_SIZE):
+    buf, size = [], 0
+    try:
+        for r in records:
+            line = _dumps(r)
+            buf.append(line)
+            size += len(line) + 1
+            if size >= chunk_size:
+                yield '\n'.join(buf) + '\n'
+                buf, size = [], 0
+    except Exception as e:
+        buf.append(_error_record(e))
+    if buf:
+        yield '\n'.join(buf) + '\n'
+
+
+def iter_json_array(records, key=None, chunk_size=CHUNK_SIZE):
+    """Yield '[r1,r2,...]', or '{"key":[...]}' when key is given, in chunks."""
+    head = '[' if key is None else '{' + json.dumps(key) + ':['
+    tail = ']' if key is None else ']}'
+    buf, size, first = [head], len(head), True
+    try:
+        for r in records:
+            text = _dumps(r)
+            buf.append(text if first else ',' + text)
+            first = False
+            size += len(text) + 1
+            if size >= chunk_size:
+                yield ''.join(buf)
+                buf, size = [], 0
+    except Exception as e:
+        # no closing bracket: the body must not parse as a complete array
+        buf.append(('' if first else ',') + _error_record(e))
+        yield ''.join(buf)
+        return
+    buf.append(tail)
+    yield ''.join(buf)
+
+
+def encode(records, fmt=JSON, key=None, chunk_size=CHUNK_SIZE):
+    if fmt == NDJSON:
+        return iter_ndjson(records, chunk_size)
+    if fmt == JSON:
+        return iter_json_array(records, key, chunk_size)
+    raise ValueError(f'unknown format: {fmt}')
+
+
+def iter_file_array(path, read_size=CHUNK_SIZE):
+    """Yield the elements of a file holding one top-level JSON array, incrementally.
+
+    Missing or empty files yield nothing; a file that is not an array raises ValueError.
+    """
+    try:
+        f = open(path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+    with f:
+        buf, pos, started, eof = '', 0, False, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            data = f.read(read_size)
+            if not data:
+                eof = True
+            buf = buf[pos:] + data
+            pos = 0
+
+        while True:
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos >= len(buf):
+                if eof:
+                    if started:
+                        raise ValueError('unterminated JSON array')
+                    return
+                fill()
+                continue
+            ch = buf[pos]
+            if not started:
+                if ch != '[':
+                    raise ValueError('expected a JSON array')
+                started = True
+                pos += 1
+                continue
+            if ch == ']':
+                return
+            if ch == ',':
+                pos += 1
+                continue
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # element straddles the buffer boundary: read more and retry
+                if eof:
+                    raise ValueError('truncated JSON array')
+                fill()
+                continue
+            # a number at the very end of the buffer may continue in the next read
+            if end == len(buf) and not eof and not isinstance(item, (dict, list, str)):
+                fill()
+                continue
+            pos = end
+            yield item
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+from activity_log import ActivityLog
+from app import app
+
+
+def _read(directory):
+    out = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name)) as f:
+            out.extend(json.loads(line) for line in f)
+    return out
+
+
+class TestActivityLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, 'activity')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_api_access_is_aggregated_and_sampled(self):
+        log = ActivityLog(self.dir, sample_every=10, aggregate_seconds=60)
+        for _ in range(25):
+            log.log({'user_id': 'u1', 'action': 'api_access', 'details': {'endpoint': 'stats', 'method': 'GET'}})
+        log.log({'user_id': 'u1', 'action': 'unauthorized_access_attempt', 'details': {'endpoint': 'x'}})
+        log.flush()
+        entries = _read(self.dir)
+        sampled = [e for e in entries if e.get('sampled')]
+        summaries = [e for e in entries if e['action'] == 'api_access_summary']
+        self.assertEqual(len(sampled), 3)
+        self.assertEqual(summaries[0]['details']['count'], 25)
+        self.assertTrue(any(e['action'] == 'unauthorized_access_attempt' for e in entries))
+        self.assertEqual(len(log.recent(5)), 5)
+        self.assertEqual(log.recent(1)[0]['action'], 'unauthorized_access_attempt')
+
+    def test_segments_rotate_and_are_capped(self):
+        log = ActivityLog(self.dir, segment_bytes=200, max_segments=3, tail_size=10)
+        for i in range(40):
+            log.log({'user_id': 'u1', 'action': 'delete_flight', 'details': {'n': i}})
+            log.flush()
+        self.assertLessEqual(len(os.listdir(self.dir)), 3)
+        self.assertEqual(_read(self.dir)[-1]['details']['n'], 39)
+        self.assertEqual(len(log.tail), 10)
+
+
+class AdminActivityApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+
+    def test_admin_requests_are_recorded(self):
+        self.client.get('/api/admin/flights', headers=self.headers)
+        body = self.client.get('/api/admin/activity?limit=5', headers=self.headers).get_json()
+        self.assertTrue(any(a['action'] == 'api_access' and a['details']['endpoint'] == 'api_admin_flights'
+                            for a in body['activity']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import unittest
+from app import app, passengers, save_passengers, FLIGHTS_FILE
+from aggregates import PassengerAggregates
+
+
+class TestPassengerAggregates(unittest.TestCase):
+    def test_incremental_updates_match_rebuild(self):
+        store = [{'passport': 'A1', 'flight': 'F1'}, {'passport': 'A2', 'flight': 'F1', 'checked_in': True, 'baggage_count': 2, 'baggage_fee': 30}]
+        agg = PassengerAggregates()
+        agg.reconcile(store)
+        p = store[0]
+        p.update(checked_in=True, baggage_count=1, baggage_fee=15.5, baggage_paid=True, flight='F2')
+        agg.update(p)
+        new = {'passport': 'A3', 'flight': 'F2'}
+        store.append(new)
+        agg.update(new)
+        self.assertEqual(agg.totals(), {'bookings': 3, 'checked_in': 2, 'bags': 3, 'fees': 45.5, 'paid_fees': 15.5, 'boarded': 0})
+        self.assertEqual(agg.flight('F1')['bookings'], 1)
+        self.assertEqual(agg.flight('F2')['checked_in'], 1)
+        self.assertEqual(agg.reconcile(store), {})
+
+    def test_invalidate_and_drift(self):
+        store = [{'passport': 'A1', 'flight': 'F1'}]
+        agg = PassengerAggregates()
+        agg.ensure(store)
+        store[0]['checked_in'] = True  # mutation nobody reported
+        self.assertEqual(agg.reconcile(store), {'checked_in': 1})
+        store.clear()
+        agg.invalidate()
+        agg.ensure(store)
+        self.assertEqual(agg.totals()['bookings'], 0)
+
+    def test_boarding_and_flight_status(self):
+        agg = PassengerAggregates()
+        agg.set_boarding({'F1': {'boarded': ['A1', 'A2']}, 'F2': {'boarding_started': True}})
+        agg.set_flights([{'flight': 'F1', 'status': 'active'}, {'flight': 'F2', 'status': 'cancelled'}, {'flight': 'F3'}])
+        self.assertEqual(agg.totals()['boarded'], 2)
+        self.assertEqual(agg.flight_status(), ({'active': 1, 'cancelled': 1, None: 1}, 3))
+
+
+class DashboardCounterTests(unittest.TestCase):
+    def setUp(self):
+        self._orig = list(passengers)
+        passengers.clear()
+        save_passengers()
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+
+    def tearDown(self):
+        passengers.clear()
+        passengers.extend(self._orig)
+        save_passengers()
+
+    def test_dashboard_tracks_checkin_and_payment(self):
+        self.client.post('/api/register', json={'name': 'Agg One', 'passport': 'AGG001', 'flight': 'FL-AGG'})
+        self.client.post('/api/register', json={'name': 'Agg Two', 'passport': 'AGG002', 'flight': 'FL-AGG'})
+        res = self.client.post('/api/login', json={'role': 'passenger', 'passport': 'AGG001', 'name': 'Agg One'})
+        pax = {'X-SESSION': res.get_json()['token']}
+        self.client.post('/api/checkin', headers=pax, json={'flight': 'FL-AGG', 'passengers': [{'name': 'Agg One', 'passport': 'AGG001', 'baggage_count': 3}]})
+        fee = next(p for p in passengers if p['passport'] == 'AGG001')['baggage_fee']
+        self.client.post('/api/baggage/pay', json={'passport': 'AGG001', 'amount': fee})
+
+        stats = self.client.get('/api/admin/dashboard/stats', headers=self.headers).get_json()
+        self.assertEqual(stats['passengers']['total'], 2)
+        self.assertEqual(stats['passengers']['checked_in'], 1)
+        self.assertEqual(stats['baggage']['total_count'], 3)
+        revenue = self.client.post('/api/admin/reports/generate', headers=self.headers, json={'type': 'revenue'}).get_json()
+        self.assertEqual(revenue['data']['paid_fees'], round(float(fee), 2))
+        self.assertEqual(revenue['data']['baggage_fees'], round(float(fee), 2))
+
+    def test_flight_status_follows_external_edits(self):
+        with open(FLIGHTS_FILE, 'rb') as f:
+            original = f.read()
+
+        def restore():
+            with open(FLIGHTS_FILE, 'wb') as f:
+                f.write(original)
+        self.addCleanup(restore)
+        before = self.client.get('/api/admin/dashboard/stats', headers=self.headers).get_json()
+        # another process cancels a flight behind this one's back
+        flights = json.loads(original)
+        flights[0]['status'] = 'cancelled'
+        with open(FLIGHTS_FILE, 'w') as f:
+            json.dump(flights, f, indent=2)
+        after = self.client.get('/api/admin/dashboard/stats', headers=self.headers).get_json()
+        self.assertEqual(after['flights']['cancelled'], before['flights']['cancelled'] + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
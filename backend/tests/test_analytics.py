@@ -0,0 +1,89 @@
+import os
+import unittest
+from app import app
+from analytics import PassengerSnapshot, AnalyticsEngine, parse_bound
+
+FLIGHTS = [
+    {'flight': 'F1', 'airline': 'Delta', 'time': '2025-11-03T14:30:00Z'},
+    {'flight': 'F2', 'airline': 'Delta', 'time': '2025-11-05T09:00:00Z'},
+    {'flight': 'F3', 'airline': 'Kenya Airways', 'time': '2025-12-01T06:00:00Z'},
+]
+PAX = [
+    {'passport': 'P1', 'flight': 'F1', 'checked_in': True, 'baggage_count': 2, 'baggage_fee': 40, 'baggage_paid': True},
+    {'passport': 'P2', 'flight': 'F1', 'checked_in': False},
+    {'passport': 'P3', 'flight': 'F2', 'checked_in': True, 'baggage_count': 1, 'baggage_fee': 20},
+    {'passport': 'P4', 'flight': 'F3', 'checked_in': True, 'baggage_count': '3', 'baggage_fee': '60.5', 'baggage_paid': True},
+    {'passport': 'P5'},
+]
+
+
+class TestPassengerSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.snap = PassengerSnapshot.build(PAX, FLIGHTS, {'F1': {'boarded': ['P1']}})
+
+    def test_totals_and_filters(self):
+        self.assertEqual(self.snap.totals(), {'bookings': 5, 'checked_in': 3, 'boarded': 1, 'bags': 6, 'fees': 120.5, 'paid_fees': 100.5})
+        november = self.snap.mask(parse_bound('2025-11-01'), parse_bound('2025-11-05', end=True))
+        self.assertEqual(self.snap.totals(november)['bookings'], 3)
+        self.assertEqual(self.snap.totals(self.snap.mask(airline='Kenya Airways'))['fees'], 60.5)
+        self.assertEqual(self.snap.totals(self.snap.mask(flights=['F2', 'NOPE']))['bookings'], 1)
+
+    def test_group_by(self):
+        by_airline = self.snap.group_by('airline')
+        self.assertEqual(by_airline['Delta']['bookings'], 3)
+        self.assertEqual(by_airline['Delta']['paid_fees'], 40.0)
+        self.assertEqual(by_airline['unassigned']['bookings'], 1)
+        by_flight = self.snap.group_by('flight', self.snap.mask(start=parse_bound('2025-11-04')))
+        self.assertEqual(set(by_flight), {'F2', 'F3'})
+
+    def test_binary_round_trip(self):
+        loaded = PassengerSnapshot.from_bytes(self.snap.to_bytes())
+        self.assertEqual(loaded.totals(), self.snap.totals())
+        self.assertEqual(loaded.labels, self.snap.labels)
+
+    def test_engine_rebuilds_on_version_change(self):
+        version = [1]
+        engine = AnalyticsEngine(lambda: (PAX, FLIGHTS, {}), lambda: version[0], min_age=0)
+        engine.snapshot()
+        engine.snapshot()
+        self.assertEqual(engine.builds, 1)
+        version[0] = 2
+        engine.snapshot()
+        self.assertEqual(engine.builds, 2)
+
+
+class ReportApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+
+    def test_date_range_and_group_by(self):
+        res = self.client.post('/api/admin/reports/generate', headers=self.headers,
+                               json={'type': 'passenger_activity', 'date_range': {'start': '1990-01-01', 'end': '1990-01-02'}})
+        self.assertEqual(res.get_json()['data']['total_passengers'], 0)
+        res = self.client.post('/api/admin/reports/generate', headers=self.headers, json={'type': 'revenue', 'group_by': 'flight'})
+        self.assertIn('by_flight', res.get_json()['data'])
+        res = self.client.post('/api/admin/reports/generate', headers=self.headers,
+                               json={'type': 'revenue', 'date_range': {'start': 'yesterday'}})
+        self.assertEqual(res.status_code, 400)
+
+    def test_flight_performance_group_by(self):
+        res = self.client.post('/api/admin/reports/generate', headers=self.headers,
+                               json={'type': 'flight_performance', 'group_by': 'airline'})
+        data = res.get_json()['data']
+        self.assertEqual(sum(g['flights'] for g in data['by_airline'].values()), data['total_flights'])
+        res = self.client.post('/api/admin/reports/generate', headers=self.headers,
+                               json={'type': 'flight_performance', 'group_by': 'flight'})
+        self.assertTrue(all(g['flights'] == 1 for g in res.get_json()['data']['by_flight'].values()))
+
+    def test_snapshot_export(self):
+        res = self.client.get('/api/admin/reports/snapshot', headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        snap = PassengerSnapshot.from_bytes(res.data)
+        self.assertEqual(len(snap), int(res.headers['X-Snapshot-Rows']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import unittest
+from unittest import mock
+import app as app_module
+from app import app, passengers, save_passengers
+import conditional
+
+
+class TestEtagMatching(unittest.TestCase):
+    def test_matches_ignore_weak_prefix_and_encoding_suffix(self):
+        tag = conditional.make_etag('/x', b'', 1)
+        self.assertEqual(conditional.etag_matches(tag, tag), tag)
+        self.assertEqual(conditional.etag_matches('"nope", W/' + tag, tag), 'W/' + tag)
+        gz = tag[:-1] + '-gzip"'
+        self.assertEqual(conditional.etag_matches(gz, tag), gz)
+        self.assertIsNone(conditional.etag_matches('"other"', tag))
+        self.assertIsNone(conditional.etag_matches(None, tag))
+        self.assertNotEqual(conditional.make_etag('/x', b'', 2), tag)
+
+
+class ConditionalApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+
+    def test_flights_304_until_store_changes(self):
+        first = self.client.get('/api/flights')
+        etag = first.headers['ETag']
+        self.assertEqual(first.headers['Cache-Control'], 'public, max-age=5')
+        again = self.client.get('/api/flights', headers={'If-None-Match': etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.get_data(), b'')
+        p = {'passport': 'CG0001', 'flight': 'CG-1', 'name': 'C'}
+        passengers.append(p)
+        try:
+            save_passengers(p)
+            changed = self.client.get('/api/flights', headers={'If-None-Match': etag})
+            self.assertEqual(changed.status_code, 200)
+            self.assertNotEqual(changed.headers['ETag'], etag)
+        finally:
+            passengers.remove(p)
+            save_passengers()
+
+    def test_seats_and_admin_lists(self):
+        flights = self.client.get('/api/flights').get_json()['flights']
+        if flights:
+            url = f"/api/flights/{flights[0]['flight']}/seats"
+            etag = self.client.get(url).headers['ETag']
+            res = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(res.status_code, 304)
+            self.assertEqual(res.headers['Cache-Control'], 'no-cache')
+        # the auth check still runs before a 304
+        etag = self.client.get('/api/admin/flights', headers=self.headers).headers['ETag']
+        self.assertEqual(self.client.get('/api/admin/flights', headers={'If-None-Match': etag}).status_code, 401)
+        res = self.client.get('/api/admin/flights', headers=dict(self.headers, **{'If-None-Match': etag}))
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.headers['Cache-Control'], 'private, no-cache')
+
+    def test_guarded_admin_route_authenticates_once(self):
+        with mock.patch.object(app_module, '_log_admin_activity') as audit:
+            self.assertEqual(self.client.get('/api/admin/flights', headers=self.headers).status_code, 200)
+            self.assertEqual(self.client.get('/api/admin/flights/NO-SUCH', headers=self.headers).status_code, 404)
+        self.assertEqual(audit.call_count, 2)
+
+    def test_openapi_etag(self):
+        res = self.client.get('/api/openapi.json')
+        self.assertEqual(res.status_code, 200)
+        res.close()
+        self.assertEqual(self.client.get('/api/openapi.json', headers={'If-None-Match': res.headers['ETag']}).status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import time
+import unittest
+import app as app_module
+from app import app, disruption_broadcaster
+from disruptions import DisruptionBroadcaster, describe_changes
+from notifications import NotificationDispatcher
+
+
+PAX = [
+    {'passport': 'D1', 'flight': 'AB100', 'email': 'd1@example.com'},
+    {'passport': 'D2', 'flight': 'AB100', 'phone': '+100'},
+    {'passport': 'D3', 'flight': 'AB100'},
+    {'passport': 'D1', 'flight': 'AB100', 'email': 'd1@example.com'},
+]
+
+
+class TestDisruptionBroadcaster(unittest.TestCase):
+    def setUp(self):
+        self.sent = []
+        self.dispatcher = NotificationDispatcher(max_workers=2, per_domain_rate=0, max_retries=0)
+        self.b = DisruptionBroadcaster(self.dispatcher, lambda f: list(PAX) if f == 'AB100' else [],
+                                       lambda item: self.sent.append((item['recipient'], item['channel'])) or item['channel'],
+                                       coalesce_seconds=60)
+
+    def test_changes_coalesce_into_one_broadcast(self):
+        self.b.flight_changed('AB100', {'gate': ('A1', 'A2')})
+        self.b.flight_changed('AB100', {'gate': ('A2', 'B7'), 'time': ('10:00', '10:30')})
+        pending = self.b.broadcasts('AB100')['pending']
+        self.assertEqual(pending['gate'], {'from': 'A1', 'to': 'B7'})
+        record = self.b.flush('AB100')
+        self.assertTrue(record['job'].done.wait(5))
+        summary = record['job'].to_dict()['summary']
+        # duplicate booking for D1 collapses; D3 has no contact details
+        self.assertEqual(record['deduplicated'], 1)
+        self.assertEqual(summary['success'], 2)
+        self.assertEqual(summary['skipped'], 1)
+        self.assertEqual(sorted(self.sent), [('D1', 'email'), ('D2', 'sms')])
+        self.assertIn('Gate changed from A1 to B7', describe_changes('AB100', {'gate': ('A1', 'B7')}))
+
+    def test_reverted_change_sends_nothing(self):
+        self.b.flight_changed('AB100', {'gate': ('A1', 'A2')})
+        self.b.flight_changed('AB100', {'gate': ('A2', 'A1')})
+        record = self.b.flush('AB100')
+        self.assertIsNone(record['job'])
+        self.assertEqual(self.sent, [])
+
+    def test_constant_changes_still_broadcast_within_max_delay(self):
+        b = DisruptionBroadcaster(self.dispatcher, lambda f: [], lambda item: None,
+                                  coalesce_seconds=0.1, max_delay_seconds=0.25)
+        start = time.monotonic()
+        for i in range(8):
+            b.flight_changed('AB100', {'gate': (f'A{i}', f'A{i + 1}')})
+            time.sleep(0.05)
+            if b.broadcasts('AB100')['broadcasts']:
+                break
+        self.assertTrue(b.broadcasts('AB100')['broadcasts'])
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_forget_drops_flight_state(self):
+        self.b.flight_changed('AB100', {'gate': ('A1', 'A2')})
+        self.b.flush('AB100')
+        self.b.flight_changed('AB100', {'gate': ('A2', 'A3')})
+        self.b.forget('AB100')
+        body = self.b.broadcasts('AB100')
+        self.assertEqual((body['version'], body['pending'], body['broadcasts']), (0, None, []))
+        self.assertIsNone(self.b.flush('AB100'))
+
+    def test_no_pending_flush_is_noop(self):
+        self.assertIsNone(self.b.flush('ZZ999'))
+        self.assertIsNone(self.b.flight_changed('AB100', {'gate': ('A1', 'A1')}))
+
+
+class DisruptionApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+        # the gate change below goes through the real flights store; put it back afterwards
+        self._flights = app_module._load_flights()
+        with open(app_module.FLIGHTS_FILE, 'rb') as f:
+            self._flights_bytes = f.read()
+        self.addCleanup(self._restore_flights)
+
+    def _restore_flights(self):
+        app_module._save_flights(self._flights)
+        with open(app_module.FLIGHTS_FILE, 'wb') as f:
+            f.write(self._flights_bytes)
+
+    def test_gate_change_is_queued_and_flushable(self):
+        fid = self._flights[0]['flight']
+        self.addCleanup(disruption_broadcaster.forget, fid)
+        res = self.client.put(f'/api/flights/{fid}', headers=self.headers, json={'gate': 'Z99'})
+        self.assertEqual(res.status_code, 200)
+        body = self.client.get(f'/api/admin/flights/{fid}/disruptions', headers=self.headers).get_json()
+        self.assertEqual(body['pending']['gate']['to'], 'Z99')
+        body = self.client.post(f'/api/admin/flights/{fid}/disruptions', headers=self.headers, json={'action': 'flush'}).get_json()
+        self.assertIsNone(body['pending'])
+        self.assertEqual(body['broadcasts'][0]['changes']['gate']['to'], 'Z99')
+
+    def test_requires_admin(self):
+        res = self.client.get('/api/admin/flights/AB100/disruptions')
+        self.assertEqual(res.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from PIL import Image
+import app as app_module
+from app import app, FACE_DIR, face_index
+from face_index import FaceIndex, DEFAULT_RADIUS
+from face_store import FaceStore
+from rate_limit import RateLimiter, TokenBucket, MemoryBackend
+
+
+class FaceApiTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.passport = 'T34525'
+        with open(os.path.join(FACE_DIR, f"{self.passport}.jpg"), 'rb') as f:
+            self.image = f.read()
+        # enrollments go to a throwaway store, not the tracked backend/face_store
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = FaceStore(tmp.name)
+        self.store.put(self.passport, self.image)
+        patcher = mock.patch.object(app_module, 'face_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_verify_batch_scores_each_pair(self):
+        data = {
+            'passport': [self.passport, 'NOFACE999'],
+            'image': [(io.BytesIO(self.image), 'a.jpg'), (io.BytesIO(self.image), 'b.jpg')],
+        }
+        res = self.client.post('/api/face/verify/batch', data=data, content_type='multipart/form-data')
+        self.assertEqual(res.status_code, 200)
+        body = res.get_json()
+        self.assertEqual(body['summary']['total'], 2)
+        self.assertTrue(body['results'][0]['match'])
+        self.assertEqual(body['results'][1]['error'], 'not_enrolled')
+
+    def test_verify_batch_requires_pairs(self):
+        data = {'passport': [self.passport, 'X12345'], 'image': [(io.BytesIO(self.image), 'a.jpg')]}
+        res = self.client.post('/api/face/verify/batch', data=data, content_type='multipart/form-data')
+        self.assertEqual(res.status_code, 400)
+
+    def test_enroll_stores_normalized_canonical_image(self):
+        passport = 'ENRTEST01'
+        buf = io.BytesIO()
+        Image.new('RGB', (1600, 1200), color=(200, 120, 40)).save(buf, format='JPEG')
+        buf.seek(0)
+        try:
+            res = self.client.post('/api/face/enroll', data={'passport': passport, 'image': (buf, 'big.jpg')}, content_type='multipart/form-data')
+            self.assertEqual(res.status_code, 201)
+            with Image.open(self.store.path_for(passport)) as stored:
+                self.assertEqual(stored.mode, 'L')
+                self.assertLessEqual(max(stored.size), 320)
+            self.assertIn(passport, face_index)
+        finally:
+            face_index.remove(passport)
+            self.store.remove(passport)
+
+    def test_enroll_rejects_non_image(self):
+        res = self.client.post('/api/face/enroll', data={'passport': 'ENRTEST02', 'image': (io.BytesIO(b'not an image'), 'x.jpg')}, content_type='multipart/form-data')
+        self.assertEqual(res.status_code, 400)
+
+
+class FaceIdentifyApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+        with open(os.path.join(FACE_DIR, 'T34525.jpg'), 'rb') as f:
+            self.image = f.read()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = FaceStore(tmp.name)
+        store.put('IDENT01', self.image)
+        index = FaceIndex()
+        index.add('IDENT01', io.BytesIO(self.image))
+        for name, value in (('face_store', store), ('face_index', index)):
+            patcher = mock.patch.object(app_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def identify(self, headers=None, **fields):
+        data = dict(fields, image=(io.BytesIO(self.image), 'probe.jpg'))
+        return self.client.post('/api/face/identify', data=data, content_type='multipart/form-data',
+                                headers=self.headers if headers is None else headers)
+
+    def test_identify_finds_enrolled_passenger(self):
+        res = self.identify()
+        self.assertEqual(res.status_code, 200)
+        body = res.get_json()
+        self.assertEqual(body['candidates'], 1)
+        self.assertEqual(body['matches'][0]['passport'], 'IDENT01')
+        self.assertTrue(body['matches'][0]['match'])
+
+    def test_radius_zero_is_exact_hash_match(self):
+        body = self.identify(radius='0').get_json()
+        self.assertEqual(body['matches'][0]['hash_distance'], 0)
+
+    def test_rejects_out_of_range_radius_and_limit(self):
+        for fields in ({'radius': '-1'}, {'radius': str(DEFAULT_RADIUS * 2 + 1)}, {'radius': 'x'},
+                       {'limit': '0'}, {'limit': '-1'}, {'limit': '101'}):
+            self.assertEqual(self.identify(**fields).status_code, 400, fields)
+
+    def test_requires_admin_session(self):
+        self.assertEqual(self.identify(headers={}).status_code, 401)
+
+    def test_throttled(self):
+        limiter = RateLimiter('face_verify', TokenBucket(1, 60), MemoryBackend())
+        with mock.patch.object(app_module, 'face_verify_limiter', limiter):
+            self.assertEqual(self.identify().status_code, 200)
+            res = self.identify()
+        self.assertEqual(res.status_code, 429)
+        self.assertIn('Retry-After', res.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
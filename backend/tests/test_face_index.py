@@ -0,0 +1,41 @@
+import io
+import random
+import unittest
+from PIL import Image
+from face_index import BKTree, FaceIndex, dhash, hamming
+
+
+def _noise_image(seed, size=64):
+    rnd = random.Random(seed)
+    base = Image.frombytes('L', (12, 12), bytes(rnd.randrange(256) for _ in range(144)))
+    return base.resize((size, size), Image.BICUBIC)
+
+
+class TestFaceIndex(unittest.TestCase):
+    def test_dhash_stable_under_resize(self):
+        img = _noise_image(1)
+        self.assertLessEqual(hamming(dhash(img), dhash(img.resize((200, 200)))), 4)
+
+    def test_bktree_radius_search(self):
+        tree = BKTree()
+        for i, h in enumerate([0b0, 0b1, 0b11, 0b1111, 0xFFFF]):
+            tree.add(h, i)
+        found = [k for _, k in tree.search(0, 2)]
+        self.assertEqual(found, [0, 1, 2])
+        tree.remove(0b1, 1)
+        self.assertEqual([k for _, k in tree.search(0, 2)], [0, 2])
+
+    def test_candidates_find_enrolled_image(self):
+        idx = FaceIndex()
+        for i in range(50):
+            idx.add(f"P{i:03d}", _noise_image(i))
+        buf = io.BytesIO()
+        _noise_image(7).save(buf, format='JPEG')
+        buf.seek(0)
+        shortlist = idx.candidates(buf)
+        self.assertTrue(shortlist)
+        self.assertEqual(shortlist[0][1], 'P007')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from face_store import FaceStore
+
+
+class TestFaceStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.store = FaceStore(self.root)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_identical_images_share_one_blob(self):
+        d1, dedup1 = self.store.put('AAA111', b'same-bytes', phash=1)
+        d2, dedup2 = self.store.put('BBB222', b'same-bytes', phash=1)
+        self.assertEqual(d1, d2)
+        self.assertFalse(dedup1)
+        self.assertTrue(dedup2)
+        self.assertEqual(self.store.path_for('AAA111'), self.store.path_for('BBB222'))
+        self.assertIn(os.path.join('blobs', d1[:2], d1[2:4]), self.store.path_for('AAA111'))
+
+    def test_blob_released_when_last_reference_goes(self):
+        digest, _ = self.store.put('AAA111', b'one')
+        self.store.put('BBB222', b'one')
+        self.store.remove('AAA111')
+        self.assertTrue(os.path.exists(self.store.blob_path(digest)))
+        self.store.put('BBB222', b'two')
+        self.assertFalse(os.path.exists(self.store.blob_path(digest)))
+
+    def test_enrolls_append_to_journal_and_replay_on_load(self):
+        digest, _ = self.store.put('AAA111', b'one', phash=5)
+        self.store.put('BBB222', b'one')
+        self.store.remove('BBB222')
+        self.assertFalse(os.path.exists(self.store.index_file))
+        reopened = FaceStore(self.root)
+        self.assertEqual(set(reopened.entries()), {'AAA111'})
+        self.assertEqual(reopened._refs[digest], 1)
+        reopened.compact()
+        self.assertTrue(os.path.exists(reopened.index_file))
+        self.assertFalse(os.path.exists(reopened.journal_file))
+        self.assertEqual(FaceStore(self.root).phashes(), {'AAA111': 5})
+
+    def test_migrate_legacy_flat_files(self):
+        with open(os.path.join(self.root, 'CCC333.jpg'), 'wb') as f:
+            f.write(b'legacy')
+        self.assertIsNotNone(self.store.path_for('CCC333'))
+        stats = self.store.migrate()
+        self.assertEqual(stats['migrated'], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'CCC333.jpg')))
+        with open(self.store.path_for('CCC333'), 'rb') as f:
+            self.assertEqual(f.read(), b'legacy')
+
+    def test_scrub_reports_and_fixes_corruption(self):
+        digest, _ = self.store.put('AAA111', b'good')
+        orphan, _ = self.store.put('BBB222', b'orphan')
+        self.store._index.pop('BBB222')
+        with open(self.store.blob_path(digest), 'wb') as f:
+            f.write(b'bitrot')
+        report = self.store.scrub(workers=2)
+        self.assertEqual(report['corrupt'], [digest])
+        self.assertEqual(report['orphans'], [orphan])
+        self.assertEqual(report['affected_passports'], ['AAA111'])
+        self.store.scrub(fix=True)
+        self.assertNotIn('AAA111', self.store)
+        self.assertFalse(os.path.exists(self.store.blob_path(orphan)))
+
+
+if __name__ == '__main__':
+    unittest.main()
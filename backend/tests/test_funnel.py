@@ -0,0 +1,86 @@
+import os
+import unittest
+from app import app, log_event, passengers, save_passengers
+from funnel import FunnelEngine
+
+
+class TestFunnelEngine(unittest.TestCase):
+    def setUp(self):
+        self.f = FunnelEngine()
+        for passport in ('P1', 'P2', 'P3'):
+            self.f.track(passport, 'F1')
+        self.f.track('P1', 'F2')
+
+    def test_identity_stages_apply_to_every_booking(self):
+        self.f.observe({'type': 'verify', 'passport': 'P1', 'match': True})
+        self.f.observe({'type': 'verify', 'passport': 'P2', 'match': False})
+        self.assertEqual(self.f.count('F1', ['verified']), 1)
+        self.assertEqual(self.f.count('F2', ['verified']), 1)
+        # a later booking inherits identity stages
+        self.f.observe({'type': 'enroll', 'passport': 'P3', 'status': 'ok'})
+        self.f.track('P3', 'F2')
+        self.assertEqual(self.f.stages('P3', 'F2'), ['booked', 'enrolled'])
+
+    def test_verified_not_checked_in(self):
+        for p in ('P1', 'P2'):
+            self.f.observe({'type': 'verify', 'passport': p, 'match': True})
+        self.f.observe({'type': 'checkin', 'passport': 'P1', 'flight': 'F1'})
+        self.assertEqual(self.f.count('F1', ['verified'], ['checked_in']), 1)
+        self.assertEqual(self.f.passengers('F1', ['verified'], ['checked_in']), ['P2'])
+        # check-in is per flight
+        self.assertEqual(self.f.count('F2', ['verified'], ['checked_in']), 1)
+        self.f.observe({'type': 'boarding_action', 'flight': 'F1', 'action': 'mark_boarded', 'passport': 'P1'})
+        summary = self.f.summary('F1')
+        self.assertEqual(summary['counts']['boarded'], 1)
+        self.assertEqual(summary['steps'][0], {'from': 'booked', 'to': 'enrolled', 'conversion': 0.0, 'drop_off': 3})
+
+    def test_sync_drops_deleted_bookings(self):
+        self.f.observe({'type': 'checkin', 'passport': 'P2', 'flight': 'F1'})
+        self.f.sync([{'passport': 'P1', 'flight': 'F1'}, {'passport': 'P2', 'flight': 'F1', 'checked_in': True}])
+        self.assertEqual(self.f.count('F1', ['booked']), 2)
+        self.assertEqual(self.f.count('F2', ['booked']), 0)
+        self.assertEqual(self.f.passengers('F1', ['checked_in']), ['P2'])
+
+    def test_rebuild_from_state(self):
+        self.f.rebuild(
+            [{'passport': 'A', 'flight': 'F9', 'checked_in': True}, {'passport': 'B', 'flight': 'F9'}],
+            enrolled={'A'},
+            boarding_state={'F9': {'boarded': ['A']}},
+            events=[{'type': 'verify', 'passport': 'B', 'match': True}],
+        )
+        self.assertEqual(self.f.summary('F9')['counts'],
+                         {'booked': 2, 'enrolled': 1, 'verified': 1, 'checked_in': 1, 'boarded': 1, 'emailed': 0})
+        self.assertEqual(self.f.flights(), ['F9'])
+
+
+class FunnelApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+
+    def tearDown(self):
+        passengers[:] = [p for p in passengers if p.get('flight') != 'FN-1']
+        save_passengers()
+
+    def test_stragglers_listed(self):
+        a = {'passport': 'FNA1', 'flight': 'FN-1', 'name': 'A'}
+        b = {'passport': 'FNB2', 'flight': 'FN-1', 'name': 'B'}
+        passengers.extend([a, b])
+        save_passengers(a, b)
+        log_event({'type': 'verify', 'passport': 'FNA1', 'match': True})
+        log_event({'type': 'verify', 'passport': 'FNB2', 'match': True})
+        log_event({'type': 'checkin', 'passport': 'FNA1', 'flight': 'FN-1'})
+        res = self.client.get('/api/admin/funnel?flight=FN-1&has=verified&lacks=checked_in&list=1', headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        body = res.get_json()
+        self.assertEqual(body['filter']['count'], 1)
+        self.assertEqual(body['filter']['passengers'], ['FNB2'])
+        self.assertEqual(body['counts']['booked'], 2)
+        res = self.client.get('/api/admin/funnel?flight=FN-1&has=landed', headers=self.headers)
+        self.assertEqual(res.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
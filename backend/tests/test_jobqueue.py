@@ -0,0 +1,94 @@
+import os
+import tempfile
+import time
+import unittest
+from jobqueue import JobQueue, WorkerPool
+
+CALLS = []
+
+
+def record_task(value):
+    CALLS.append(value)
+
+
+def failing_task():
+    raise RuntimeError('boom')
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self._tmp.name, 'jobs.db'), visibility_timeout=0.2, backoff_base=0)
+        CALLS.clear()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_priority_order(self):
+        self.queue.enqueue('test_jobqueue.record_task', 'low', priority=0)
+        self.queue.enqueue('test_jobqueue.record_task', 'high', priority=10)
+        pool = WorkerPool(self.queue)
+        while pool.run_once():
+            pass
+        self.assertEqual(CALLS, ['high', 'low'])
+        self.assertEqual(self.queue.stats(), {'done': 2})
+
+    def test_dead_letter_after_max_attempts(self):
+        job_id = self.queue.enqueue('test_jobqueue.failing_task', max_attempts=2)
+        pool = WorkerPool(self.queue)
+        while pool.run_once():
+            pass
+        self.assertEqual(self.queue.stats(), {'dead': 1})
+        dead = self.queue.dead_letters()
+        self.assertEqual(dead[0]['attempts'], 2)
+        self.assertIn('boom', dead[0]['last_error'])
+        self.assertTrue(self.queue.requeue(job_id))
+        self.assertEqual(self.queue.stats(), {'queued': 1})
+
+    def test_expired_lease_is_redelivered(self):
+        self.queue.enqueue('test_jobqueue.record_task', 'x')
+        first = self.queue.claim('crashed-worker')
+        self.assertIsNotNone(first)
+        self.assertIsNone(self.queue.claim('other'))
+        time.sleep(0.25)
+        again = self.queue.claim('other')
+        self.assertEqual(again['id'], first['id'])
+        self.assertEqual(again['attempts'], 2)
+
+    def test_job_that_kills_its_worker_is_dead_lettered(self):
+        self.queue.enqueue('test_jobqueue.record_task', 'x', max_attempts=2)
+        self.assertIsNotNone(self.queue.claim('w1'))
+        time.sleep(0.25)
+        self.assertIsNotNone(self.queue.claim('w2'))
+        time.sleep(0.25)
+        self.assertIsNone(self.queue.claim('w3'))
+        self.assertEqual(self.queue.stats(), {'dead': 1})
+        self.assertIn('lease expired', self.queue.dead_letters()[0]['last_error'])
+
+    def test_stale_worker_cannot_overwrite_result(self):
+        self.queue.enqueue('test_jobqueue.record_task', 'x')
+        stale = self.queue.claim('w1')
+        time.sleep(0.25)
+        fresh = self.queue.claim('w2')
+        self.assertIsNone(self.queue.fail(stale, 'late'))
+        self.assertFalse(self.queue.complete(stale))
+        self.assertTrue(self.queue.complete(fresh))
+        self.assertEqual(self.queue.stats(), {'done': 1})
+
+    def test_pool_purges_old_completed_jobs(self):
+        self.queue.enqueue('test_jobqueue.record_task', 'x')
+        pool = WorkerPool(self.queue, purge_after=0)
+        pool.run_once()
+        self.assertEqual(pool.maybe_purge(), 1)
+        self.assertEqual(self.queue.stats(), {})
+        self.assertEqual(pool.maybe_purge(), 0)
+
+    def test_jobs_survive_reopen(self):
+        self.queue.enqueue('test_jobqueue.record_task', 'persisted')
+        reopened = JobQueue(self.queue.path)
+        WorkerPool(reopened).run_once()
+        self.assertEqual(CALLS, ['persisted'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import unittest
+from app import app
+import metrics
+
+
+class TestHistogram(unittest.TestCase):
+    def test_log_linear_bounds_and_quantiles(self):
+        bounds = metrics.log_linear_bounds(0.001, 1.0)
+        self.assertEqual(bounds, sorted(set(bounds)))
+        self.assertGreaterEqual(bounds[-1], 1.0)
+        # relative step between neighbours never exceeds 1/SUB_BUCKETS
+        self.assertTrue(all(b / a - 1 <= 1 / metrics.SUB_BUCKETS + 1e-3 for a, b in zip(bounds, bounds[1:])))
+        h = metrics.Histogram(bounds)
+        for ms in range(1, 101):
+            h.observe(ms / 1000)
+        self.assertEqual(h.count, 100)
+        self.assertTrue(0.05 <= h.quantile(0.5) <= 0.05 * 1.25)
+        self.assertTrue(0.099 <= h.quantile(0.99) <= 0.099 * 1.25)
+        h.observe(10)
+        self.assertEqual(h.quantile(1.0), float('inf'))
+
+    def test_render_prometheus_text(self):
+        reg = metrics.Registry()
+        reg.counter('hits_total', 'Hits.', ('route',))
+        reg.histogram('lat_seconds', 'Latency.', ('route',), bounds=[0.1, 1.0])
+        reg.inc('hits_total', ('/a"b',))
+        reg.observe('lat_seconds', ('/a',), 0.5)
+        text = reg.render()
+        self.assertIn('# TYPE hits_total counter', text)
+        self.assertIn('hits_total{route="/a\\"b"} 1', text)
+        self.assertIn('lat_seconds_bucket{route="/a",le="0.1"} 0', text)
+        self.assertIn('lat_seconds_bucket{route="/a",le="1.0"} 1', text)
+        self.assertIn('lat_seconds_bucket{route="/a",le="+Inf"} 1', text)
+        self.assertIn('lat_seconds_count{route="/a"} 1', text)
+
+    def test_timed_decorator(self):
+        @metrics.timed('unit_test_stage')
+        def work():
+            return 42
+        self.assertEqual(work(), 42)
+        self.assertEqual(metrics.registry.get('app_stage_duration_seconds', ('unit_test_stage',)).count, 1)
+
+
+class MetricsApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+
+    def test_requests_are_recorded_by_route(self):
+        before = metrics.registry.get('http_requests_total', ('GET', '/api/flights/<flight_id>/seats', '404'))
+        before = before[0] if before else 0
+        self.client.get('/api/flights/NO-SUCH/seats')
+        res = self.client.get('/api/admin/metrics', headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.content_type.startswith('text/plain'))
+        text = res.get_data(as_text=True)
+        self.assertIn(f'http_requests_total{{method="GET",route="/api/flights/<flight_id>/seats",status="404"}} {before + 1}', text)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",route="/api/flights/<flight_id>/seats",le="+Inf"}', text)
+        self.assertIn('app_stage_duration_seconds_count{stage="load_flights"}', text)
+        body = self.client.get('/api/admin/metrics?format=json', headers=self.headers).get_json()
+        self.assertTrue(any(r['route'] == '/api/login' for r in body['routes']))
+
+    def test_auth(self):
+        self.assertEqual(self.client.get('/api/admin/metrics').status_code, 401)
+        os.environ['METRICS_TOKEN'] = 'scrape-secret'
+        try:
+            res = self.client.get('/api/admin/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+            self.assertEqual(res.status_code, 200)
+            res = self.client.get('/api/admin/metrics', headers={'Authorization': 'Bearer wrong'})
+            self.assertEqual(res.status_code, 401)
+        finally:
+            del os.environ['METRICS_TOKEN']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+import unittest
+from app import app
+from notifications import NotificationDispatcher, DomainRateLimiter
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+    def test_retries_then_succeeds(self):
+        calls = []
+
+        def flaky(item):
+            calls.append(item['recipient'])
+            if len(calls) < 3:
+                raise RuntimeError('temporary')
+            return 'email'
+
+        d = NotificationDispatcher(max_workers=2, per_domain_rate=0, max_retries=3, backoff_base=0.01)
+        job = d.submit('email', [{'recipient': 'A1', 'domain': 'x.com'}], flaky)
+        self.assertTrue(job.done.wait(5))
+        summary = job.to_dict()['summary']
+        self.assertEqual(summary['success'], 1)
+        self.assertEqual(summary['retries'], 2)
+
+    def test_gives_up_after_max_retries(self):
+        def broken(item):
+            raise RuntimeError('down')
+
+        d = NotificationDispatcher(max_workers=2, per_domain_rate=0, max_retries=1, backoff_base=0.01)
+        job = d.submit('email', [{'recipient': 'A1', 'domain': 'x.com'}, {'recipient': 'A2', 'skip': 'no_email'}], broken)
+        self.assertTrue(job.done.wait(5))
+        body = job.to_dict()
+        self.assertEqual(body['summary']['failed'], 1)
+        self.assertEqual(body['summary']['skipped'], 1)
+
+    def test_finished_jobs_evicted_past_a_running_one(self):
+        release = threading.Event()
+        d = NotificationDispatcher(max_workers=2, per_domain_rate=0, max_jobs=2)
+        slow = d.submit('email', [{'recipient': 'A1', 'domain': 'x.com'}], lambda item: release.wait(5))
+        done = [d.submit('email', [], None) for _ in range(3)]
+        self.assertIsNotNone(d.get(slow.id))
+        self.assertIsNone(d.get(done[0].id))
+        self.assertIsNone(d.get(done[1].id))
+        self.assertIsNotNone(d.get(done[2].id))
+        release.set()
+        self.assertTrue(slow.done.wait(5))
+
+    def test_domain_rate_limiter(self):
+        limiter = DomainRateLimiter(10, burst=2)
+        self.assertEqual(limiter.try_acquire('a.com'), 0)
+        self.assertEqual(limiter.try_acquire('a.com'), 0)
+        self.assertGreater(limiter.try_acquire('a.com'), 0)
+        self.assertEqual(limiter.try_acquire('b.com'), 0)
+
+
+class NotificationApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+
+    def test_send_returns_job_and_progress(self):
+        res = self.client.post('/api/admin/notifications/send', headers=self.headers,
+                               json={'type': 'sms', 'recipients': ['NOSUCHPAX1'], 'message': 'Gate change'})
+        self.assertEqual(res.status_code, 202)
+        job_id = res.get_json()['job_id']
+        deadline = time.time() + 5
+        while True:
+            body = self.client.get(f'/api/admin/notifications/{job_id}', headers=self.headers).get_json()
+            if body['status'] == 'completed' or time.time() > deadline:
+                break
+            time.sleep(0.05)
+        self.assertEqual(body['status'], 'completed')
+        self.assertEqual(body['results'][0]['reason'], 'passenger_not_found')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import unittest
+from app import app, passengers, save_passengers
+import pagination
+
+
+class TestSortedIndex(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {'passport': 'B2', 'flight': 'F1', 'checked_in': True},
+            {'passport': 'A1', 'flight': 'F2'},
+            {'passport': 'A1', 'flight': 'F1', 'baggage_paid': True},
+            {'passport': 'C3', 'flight': 'F1'},
+        ]
+        self.index = pagination.SortedIndex(self.records)
+
+    def test_pages_follow_key_order(self):
+        page, cursor = self.index.page(limit=2)
+        self.assertEqual([(p['flight'], p['passport']) for p in page], [('F1', 'A1'), ('F1', 'B2')])
+        page, cursor = self.index.page(pagination.decode_cursor(cursor), limit=2)
+        self.assertEqual([(p['flight'], p['passport']) for p in page], [('F1', 'C3'), ('F2', 'A1')])
+        self.assertIsNone(cursor)
+
+    def test_cursor_is_stable_across_inserts(self):
+        _page, cursor = self.index.page(limit=2)
+        index = pagination.SortedIndex(self.records + [{'passport': 'A0', 'flight': 'F1'}])
+        page, _ = index.page(pagination.decode_cursor(cursor), limit=10)
+        self.assertEqual([p['passport'] for p in page], ['C3', 'A1'])
+
+    def test_filters_and_projection(self):
+        filters = pagination.parse_filters({'checked_in': 'false', 'flight': 'F1'})
+        page, _ = self.index.page(filters=filters)
+        self.assertEqual([p['passport'] for p in page], ['A1', 'C3'])
+        self.assertEqual(pagination.project(page[0], ['passport', 'missing']), {'passport': 'A1'})
+        with self.assertRaises(ValueError):
+            pagination.parse_filters({'baggage_paid': 'maybe'})
+        with self.assertRaises(ValueError):
+            pagination.decode_cursor('not-a-cursor')
+
+
+class PaginationApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+        self.added = [{'passport': f'PG{i:03d}', 'flight': 'PG-1', 'name': f'P{i}', 'checked_in': i % 2 == 0} for i in range(5)]
+        passengers.extend(self.added)
+        save_passengers(*self.added)
+
+    def tearDown(self):
+        passengers[:] = [p for p in passengers if p.get('flight') != 'PG-1']
+        save_passengers()
+
+    def test_bookings_walk_all_pages(self):
+        seen, cursor = [], None
+        while True:
+            url = '/api/bookings?flight=PG-1&limit=2&fields=passport,_flight_time'
+            if cursor:
+                url += '&cursor=' + cursor
+            body = self.client.get(url, headers=self.headers).get_json()
+            seen.extend(body['bookings'])
+            cursor = body['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual([b['passport'] for b in seen], [p['passport'] for p in self.added])
+        self.assertEqual(set(seen[0]), {'passport'})
+
+    def test_flight_passengers_filter(self):
+        body = self.client.get('/api/flights/PG-1/passengers?checked_in=true&fields=passport', headers=self.headers).get_json()
+        self.assertEqual(body['passengers'], [{'passport': 'PG000'}, {'passport': 'PG002'}, {'passport': 'PG004'}])
+        self.assertIsNone(body['next_cursor'])
+
+    def test_passengers_array_with_cursor_header(self):
+        res = self.client.get('/api/passengers?flight=PG-1&limit=3&fields=passport')
+        self.assertEqual(len(res.get_json()), 3)
+        self.assertIn('X-Next-Cursor', res.headers)
+        res = self.client.get('/api/passengers?flight=PG-1&cursor=' + res.headers['X-Next-Cursor'])
+        self.assertEqual([p['passport'] for p in res.get_json()], ['PG003', 'PG004'])
+        self.assertEqual(self.client.get('/api/passengers?limit=x').status_code, 400)
+        # no list params keeps the original full array
+        self.assertEqual(len(self.client.get('/api/passengers').get_json()), len(passengers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import bcrypt
+import app as app_module
+from app import app
+from password_hasher import PasswordHasher, HasherBusy
+
+
+class TestPasswordHasher(unittest.TestCase):
+    def test_verify_and_rehash_detection(self):
+        hasher = PasswordHasher(workers=1, max_pending=4, rounds=4)
+        stored = hasher.hash('s3cret')
+        self.assertTrue(hasher.verify('s3cret', stored))
+        self.assertFalse(hasher.verify('wrong', stored))
+        self.assertFalse(hasher.needs_rehash(stored))
+        self.assertTrue(PasswordHasher(rounds=5).needs_rehash(stored))
+        self.assertTrue(hasher.needs_rehash('plaintext'))
+        self.assertTrue(hasher.verify('plaintext', 'plaintext'))
+        metrics = hasher.metrics()
+        self.assertEqual(metrics['verified'], 3)
+        self.assertIsNotNone(metrics['hash_ms']['p50'])
+
+    def test_admission_control_fails_fast(self):
+        hasher = PasswordHasher(workers=1, max_pending=1, rounds=4)
+        release = threading.Event()
+        blocker = hasher._submit(release.wait, 5)
+        try:
+            with self.assertRaises(HasherBusy):
+                hasher.verify('pw', '$2b$04$' + 'a' * 53)
+            self.assertEqual(hasher.metrics()['rejected_busy'], 1)
+        finally:
+            release.set()
+            blocker.result(5)
+
+    def test_timed_out_queued_check_frees_its_slot(self):
+        hasher = PasswordHasher(workers=1, max_pending=2, rounds=4, timeout=0.05)
+        release = threading.Event()
+        blocker = hasher._submit(release.wait, 5)
+        try:
+            with self.assertRaises(HasherBusy):
+                hasher.verify('pw', '$2b$04$' + 'a' * 53)
+            self.assertEqual(hasher.metrics()['timed_out'], 1)
+        finally:
+            release.set()
+            blocker.result(5)
+        self.assertEqual(hasher.metrics()['pending'], 0)
+        stored = hasher.hash('pw')
+        self.assertTrue(hasher.verify('pw', stored))
+
+
+class AdminLoginHasherTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        # work on a copy of the admin users file; the tracked one must never gain test accounts
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        users_file = os.path.join(tmp.name, 'admin_users.json')
+        with open(users_file, 'w') as f:
+            json.dump(app_module._load_admin_users(), f)
+        for patcher in (mock.patch.object(app_module, 'ADMIN_USERS_FILE', users_file),
+                        mock.patch.dict(app_module._admin_users_cache, {'stamp': None, 'users': {}})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _drop_user(self, username):
+        users = app_module._load_admin_users()
+        if users.pop(username, None) is not None:
+            app_module._save_admin_users(users)
+
+    def test_login_rehashes_outdated_work_factor(self):
+        users = app_module._load_admin_users()
+        users['rehash-me'] = {'password_hash': bcrypt.hashpw(b'Passw0rd!', bcrypt.gensalt(4)).decode()}
+        app_module._save_admin_users(users)
+        self.addCleanup(self._drop_user, 'rehash-me')
+        with mock.patch.object(app_module.password_hasher, 'rounds', 5):
+            res = self.client.post('/api/admin/login', json={'username': 'rehash-me', 'password': 'Passw0rd!'})
+            self.assertEqual(res.status_code, 200)
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                if app_module._load_admin_users()['rehash-me']['password_hash'].startswith('$2b$05$'):
+                    break
+                time.sleep(0.02)
+        self.assertTrue(app_module._load_admin_users()['rehash-me']['password_hash'].startswith('$2b$05$'))
+        res = self.client.post('/api/admin/login', json={'username': 'rehash-me', 'password': 'nope'})
+        self.assertEqual(res.status_code, 401)
+
+    def test_busy_hasher_returns_503(self):
+        with mock.patch.object(app_module.password_hasher, 'verify', side_effect=HasherBusy()):
+            res = self.client.post('/api/admin/login', json={'username': 'admin', 'password': 'x'})
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.headers.get('Retry-After'), '1')
+
+    def test_slow_hasher_returns_503(self):
+        hasher = PasswordHasher(workers=1, max_pending=2, rounds=4, timeout=0.05)
+        release = threading.Event()
+        with mock.patch.object(hasher, '_check', side_effect=lambda *a: release.wait(5)), \
+                mock.patch.object(app_module, 'password_hasher', hasher):
+            res = self.client.post('/api/admin/login', json={'username': 'admin', 'password': 'x'})
+        release.set()
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(hasher.metrics()['timed_out'], 1)
+
+    def test_metrics_endpoint(self):
+        token = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'}).get_json()['token']
+        body = self.client.get('/api/admin/auth/metrics', headers={'X-SESSION': token}).get_json()
+        self.assertIn('hash_ms', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
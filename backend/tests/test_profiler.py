@@ -0,0 +1,79 @@
+import marshal
+import os
+import time
+import unittest
+from app import app, profiler
+from profiler import Profiler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestProfiler(unittest.TestCase):
+    def test_off_by_default_and_route_filter(self):
+        p = Profiler()
+        self.assertFalse(p.active)
+        p.start(mode='cprofile', route='/api/x')
+        self.assertIsNone(p.begin('/api/y'))
+        token = p.begin('/api/x')
+        busy(0.01)
+        p.end(token)
+        p.stop()
+        self.assertEqual(p.status()['profiled_requests'], 1)
+        self.assertIn('busy', p.text())
+        self.assertIn('busy', p.collapsed())
+        self.assertIsInstance(marshal.loads(p.dump()), dict)
+
+    def test_sampler_collects_stacks(self):
+        p = Profiler()
+        p.start(mode='sample', interval=0.001)
+        token = p.begin('/api/x')
+        busy(0.1)
+        p.end(token)
+        p.stop()
+        self.assertGreater(p.status()['samples'], 0)
+        self.assertIn('test_profiler.py:busy', p.collapsed())
+
+    def test_stops_after_max_requests(self):
+        p = Profiler()
+        p.start(mode='cprofile', max_requests=1)
+        p.end(p.begin('/a'))
+        self.assertIsNone(p.begin('/a'))
+        self.assertFalse(p.active)
+        with self.assertRaises(ValueError):
+            p.start(mode='perf')
+
+
+class ProfilerApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+
+    def tearDown(self):
+        profiler.reset()
+
+    def test_profile_a_route(self):
+        res = self.client.post('/api/admin/profile', json={'action': 'start', 'mode': 'cprofile', 'route': '/api/flights'}, headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.get_json()['active'])
+        self.client.get('/api/flights')
+        self.client.get('/api/openapi.json').close()
+        self.client.post('/api/admin/profile', json={'action': 'stop'}, headers=self.headers)
+        status = self.client.get('/api/admin/profile', headers=self.headers).get_json()
+        self.assertEqual(status['profiled_requests'], 1)
+        text = self.client.get('/api/admin/profile/report', headers=self.headers).get_data(as_text=True)
+        self.assertIn('api_flights', text)
+        res = self.client.get('/api/admin/profile/report?format=pstats', headers=self.headers)
+        self.assertEqual(res.mimetype, 'application/octet-stream')
+        bad = self.client.post('/api/admin/profile', json={'action': 'start', 'sample_rate': 2}, headers=self.headers)
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/profile').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
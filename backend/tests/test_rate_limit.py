@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from app import app
+import app as app_module
+import rate_limit
+from rate_limit import TokenBucket, SlidingWindow, MemoryBackend, SQLiteBackend, RateLimiter, parse_limit
+
+
+class TestAlgorithms(unittest.TestCase):
+    def test_token_bucket_burst_and_refill(self):
+        bucket = TokenBucket(3, 3)  # 1 token per second
+        state = None
+        for _ in range(3):
+            state, allowed, _ = bucket.apply(state, 100.0, 1, True)
+            self.assertTrue(allowed)
+        state, allowed, retry = bucket.apply(state, 100.0, 1, True)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry, 1.0)
+        state, allowed, _ = bucket.apply(state, 101.0, 1, True)
+        self.assertTrue(allowed)
+
+    def test_sliding_window_weights_previous_window(self):
+        win = SlidingWindow(4, 10)
+        state = None
+        for _ in range(4):
+            state, allowed, _ = win.apply(state, 5.0, 1, True)
+            self.assertTrue(allowed)
+        state, allowed, retry = win.apply(state, 9.0, 1, True)
+        self.assertFalse(allowed)
+        self.assertGreater(retry, 0)
+        # halfway through the next window the old 4 count as 2
+        state, allowed, _ = win.apply(state, 15.0, 1, True)
+        self.assertTrue(allowed)
+        state, allowed, _ = win.apply(state, 15.0, 1, True)
+        self.assertTrue(allowed)
+        state, allowed, _ = win.apply(state, 15.0, 1, True)
+        self.assertFalse(allowed)
+
+    def test_check_does_not_consume(self):
+        limiter = RateLimiter('t', TokenBucket(1, 60), MemoryBackend())
+        self.assertTrue(limiter.check('k')[0])
+        self.assertTrue(limiter.check('k')[0])
+        self.assertTrue(limiter.hit('k')[0])
+        self.assertFalse(limiter.check('k')[0])
+
+    def test_parse_limit(self):
+        self.assertEqual(parse_limit('30/60'), (30.0, 60.0))
+
+
+class TestBackends(unittest.TestCase):
+    def test_memory_backend_is_capped(self):
+        backend = MemoryBackend(max_keys=100)
+        limiter = RateLimiter('t', TokenBucket(5, 60), backend)
+        for i in range(1000):
+            limiter.hit(f'10.0.{i // 256}.{i % 256}')
+        self.assertEqual(len(backend), 100)
+
+    def test_memory_backend_expires_idle_keys(self):
+        backend = MemoryBackend()
+        limiter = RateLimiter('t', TokenBucket(1, 1), backend)
+        with mock.patch('rate_limit.time.time', return_value=1000.0):
+            limiter.hit('a')
+        with mock.patch('rate_limit.time.time', return_value=1005.0):
+            self.assertTrue(limiter.hit('b')[0])
+        self.assertEqual(len(backend), 1)
+
+    def test_lockout_state_has_its_own_pool(self):
+        self.assertIsNot(rate_limit.get_backend('lockout'), rate_limit.get_backend())
+        self.assertIs(app_module.security_manager.login_failures.backend, rate_limit.get_backend('lockout'))
+        self.assertIs(app_module.face_verify_limiter.backend, rate_limit.get_backend())
+
+    def test_sqlite_backend_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rl.db')
+            a = RateLimiter('login', TokenBucket(2, 60), SQLiteBackend(path))
+            b = RateLimiter('login', TokenBucket(2, 60), SQLiteBackend(path))
+            self.assertTrue(a.hit('1.2.3.4')[0])
+            self.assertTrue(b.hit('1.2.3.4')[0])
+            self.assertFalse(a.hit('1.2.3.4')[0])
+            self.assertTrue(b.hit('5.6.7.8')[0])
+
+
+class RateLimitApiTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_login_throttled_with_retry_after(self):
+        limiter = RateLimiter('login', TokenBucket(2, 60), MemoryBackend())
+        with mock.patch.object(app_module, 'login_limiter', limiter):
+            for _ in range(2):
+                res = self.client.post('/api/login', json={'role': 'nobody'})
+                self.assertEqual(res.status_code, 400)
+            res = self.client.post('/api/login', json={'role': 'nobody'})
+        self.assertEqual(res.status_code, 429)
+        self.assertGreaterEqual(int(res.headers['Retry-After']), 1)
+
+    def test_admin_lockout_after_failed_attempts(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        failures = RateLimiter('login_failures', SlidingWindow(3, 900), MemoryBackend())
+        with mock.patch.object(app_module.security_manager, 'login_failures', failures):
+            for _ in range(3):
+                res = self.client.post('/api/login', json={'role': 'admin', 'password': 'wrong'})
+                self.assertEqual(res.status_code, 403)
+            res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.assertEqual(res.status_code, 429)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from sanitizer import sanitize_input, sanitize_fields, sanitize_text, TEXT
+from security_utils import sanitize_input as reexported
+
+
+class TestSanitizer(unittest.TestCase):
+    def test_plain_strings_untouched(self):
+        value = 'Chloé García'
+        self.assertIs(sanitize_text(value), value)
+
+    def test_tags_scripts_and_escapes(self):
+        self.assertEqual(sanitize_text('Ana<script type="x">alert(1)</script> B'), 'Ana B')
+        self.assertEqual(sanitize_text('<b>bold</b> & co'), 'bold &amp; co')
+        self.assertEqual(sanitize_text('a < b'), 'a &lt; b')
+        self.assertEqual(sanitize_text('a > b'), 'a &gt; b')
+        self.assertEqual(sanitize_text('<SCRIPT>x</SCRIPT>'), 'x')
+        self.assertEqual(sanitize_text('&amp;'), '&amp;amp;')
+
+    def test_recursive(self):
+        data = {'name': '<i>Ana</i>', 'bags': [{'d': 'a&b'}], 'count': 2}
+        self.assertEqual(sanitize_input(data), {'name': 'Ana', 'bags': [{'d': 'a&amp;b'}], 'count': 2})
+        self.assertIs(reexported, sanitize_input)
+
+    def test_schema_only_touches_declared_fields(self):
+        data = {'name': '<i>Ana</i>', 'raw': '<keep>', 'tags': ['<x>y'], 'bags': [{'description': 'a&b', 'tag': '<t>'}]}
+        out = sanitize_fields(data, {'name': TEXT, 'tags': [TEXT], 'bags': [{'description': TEXT}]})
+        self.assertEqual(out['name'], 'Ana')
+        self.assertEqual(out['raw'], '<keep>')
+        self.assertEqual(out['tags'], ['y'])
+        self.assertEqual(out['bags'], [{'description': 'a&amp;b', 'tag': '<t>'}])
+        self.assertEqual(data['name'], '<i>Ana</i>')
+
+
+if __name__ == '__main__':
+    unittest.main()
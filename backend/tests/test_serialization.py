@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from app import app, passengers, save_passengers
+import compression
+import serialization
+
+
+class TestSerialization(unittest.TestCase):
+    def test_dumps_matches_stdlib(self):
+        obj = {'name': 'Zoë', 'n': [1, 2.5, None, True], 'nested': {'a': 'b'}}
+        self.assertEqual(json.loads(serialization.dumps(obj)), obj)
+        self.assertEqual(json.loads(serialization.dumps(obj, indent=4)), obj)
+        # non-string keys and integers wider than 64 bits still encode
+        self.assertEqual(json.loads(serialization.dumps({1: 'x'})), {'1': 'x'})
+        self.assertEqual(json.loads(serialization.dumps({'big': 2 ** 70})), {'big': 2 ** 70})
+
+    def test_file_round_trip(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            serialization.dump_file([{'a': 1}], path)
+            self.assertEqual(serialization.load_file(path), [{'a': 1}])
+            with open(path, 'w') as f:
+                f.write('{broken')
+            self.assertEqual(serialization.load_file(path, []), [])
+            with self.assertRaises(ValueError):
+                serialization.load_file(path, [], strict=True)
+        finally:
+            os.unlink(path)
+        self.assertIsNone(serialization.load_file(path))
+        self.assertEqual(serialization.load_file(path, [], strict=True), [])
+
+    def test_dump_file_replaces_atomically(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'store.json')
+            serialization.dump_file({'v': 1}, path)
+            os.chmod(path, 0o640)
+            with mock.patch('serialization.os.replace', side_effect=OSError('disk full')):
+                with self.assertRaises(OSError):
+                    serialization.dump_file({'v': 2}, path)
+            # the failed write left the old store intact and no temp file behind
+            self.assertEqual(serialization.load_file(path), {'v': 1})
+            self.assertEqual(os.listdir(tmp), ['store.json'])
+            serialization.dump_file({'v': 3}, path)
+            self.assertEqual(serialization.load_file(path), {'v': 3})
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+            self.assertEqual(os.listdir(tmp), ['store.json'])
+
+
+class TestCompression(unittest.TestCase):
+    def test_negotiate(self):
+        self.assertEqual(compression.negotiate('gzip, deflate', ('br', 'gzip')), 'gzip')
+        self.assertEqual(compression.negotiate('gzip;q=0.5, br', ('br', 'gzip')), 'br')
+        self.assertEqual(compression.negotiate('br;q=0, gzip;q=0.1', ('br', 'gzip')), 'gzip')
+        self.assertEqual(compression.negotiate('*', ('br', 'gzip')), 'br')
+        self.assertIsNone(compression.negotiate('identity', ('br', 'gzip')))
+        self.assertIsNone(compression.negotiate('', ('gzip',)))
+
+
+class CompressionApiTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.added = [{'passport': f'CZ{i:04d}', 'flight': 'CZ-1', 'name': f'Passenger {i}'} for i in range(100)]
+        passengers.extend(self.added)
+        save_passengers(*self.added)
+
+    def tearDown(self):
+        passengers[:] = [p for p in passengers if p.get('flight') != 'CZ-1']
+        save_passengers()
+
+    def test_large_json_is_gzipped(self):
+        res = self.client.get('/api/passengers?flight=CZ-1', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(res.headers.get('Content-Encoding'), 'gzip')
+        self.assertIn('Accept-Encoding', res.headers.get('Vary', ''))
+        body = json.loads(gzip.decompress(res.get_data()))
+        self.assertEqual(len(body), 100)
+        plain = self.client.get('/api/passengers?flight=CZ-1')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(json.loads(plain.get_data()), body)
+
+    def test_small_body_left_alone(self):
+        res = self.client.get('/api/passengers?flight=CZ-1&limit=1', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', res.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
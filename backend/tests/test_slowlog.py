@@ -0,0 +1,76 @@
+import os
+import time
+import unittest
+from app import app, slow_log
+import metrics
+import slowlog
+
+
+class TestSlowLog(unittest.TestCase):
+    def test_stage_breakdown_and_threshold(self):
+        log = slowlog.SlowLog(threshold_ms=5, capacity=2)
+        token = slowlog.begin()
+        with metrics.timed('outer_stage'):
+            with metrics.timed('inner_stage'):
+                time.sleep(0.01)
+        time.sleep(0.01)
+        trace = slowlog.finish(token)
+        entry = log.record(trace, 0.03, 'GET', '/api/x', 200)
+        self.assertEqual(list(entry['stages']), ['outer_stage', 'inner_stage'])
+        self.assertEqual(entry['stages']['inner_stage']['count'], 1)
+        # only the outer stage counts as covered time; the rest is unattributed
+        self.assertAlmostEqual(entry['unattributed_ms'], 30 - entry['stages']['outer_stage']['ms'], places=2)
+        self.assertIsNone(log.record(slowlog.Trace(), 0.001, 'GET', '/api/x', 200))
+
+    def test_buffer_is_bounded_and_newest_first(self):
+        log = slowlog.SlowLog(threshold_ms=0, capacity=2)
+        for route in ('/a', '/b', '/c'):
+            log.record(slowlog.Trace(), 0.01, 'GET', route, 200)
+        self.assertEqual([e['route'] for e in log.entries()], ['/c', '/b'])
+        self.assertEqual(log.recorded, 3)
+        self.assertEqual(log.entries(route='/b')[0]['route'], '/b')
+
+    def test_no_trace_outside_requests(self):
+        with metrics.timed('unit_test_stage'):
+            pass
+        self.assertIsNone(slowlog.enter())
+
+
+class SlowRequestsApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+        self.threshold = slow_log.threshold_ms
+        slow_log.clear()
+
+    def tearDown(self):
+        slow_log.threshold_ms = self.threshold
+        slow_log.clear()
+
+    def test_slow_requests_are_recorded_with_stages(self):
+        res = self.client.post('/api/admin/slow-requests', json={'threshold_ms': 0}, headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        self.client.get('/api/flights/NO-SUCH/seats')
+        body = self.client.get('/api/admin/slow-requests?route=/api/flights/<flight_id>/seats', headers=self.headers).get_json()
+        self.assertEqual(len(body['entries']), 1)
+        entry = body['entries'][0]
+        self.assertEqual(entry['status'], 404)
+        self.assertIn('load_flights', entry['stages'])
+        self.assertIn('load_flights', body['stage_totals_ms'])
+        body = self.client.get('/api/admin/slow-requests', headers=self.headers).get_json()
+        self.assertIn('session', body['entries'][0]['stages'])
+
+    def test_threshold_and_auth(self):
+        self.client.post('/api/admin/slow-requests', json={'threshold_ms': 60000}, headers=self.headers)
+        self.client.get('/api/flights')
+        body = self.client.get('/api/admin/slow-requests', headers=self.headers).get_json()
+        self.assertEqual(body['entries'], [])
+        bad = self.client.post('/api/admin/slow-requests', json={'threshold_ms': 'x'}, headers=self.headers)
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/slow-requests').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import smtplib
+import unittest
+from unittest import mock
+from smtp_pool import SMTPPool
+
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = 0
+        self.closed = False
+        self.fail_next = None
+        FakeSMTP.instances.append(self)
+
+    def ehlo(self):
+        return (250, b'ok')
+
+    def noop(self):
+        return (421, b'closing') if self.closed else (250, b'ok')
+
+    def send_message(self, msg):
+        if self.fail_next:
+            exc, self.fail_next = self.fail_next, None
+            raise exc
+        self.sent += 1
+
+    def quit(self):
+        self.closed = True
+
+
+class TestSMTPPool(unittest.TestCase):
+    def setUp(self):
+        FakeSMTP.instances = []
+        patcher = mock.patch('smtp_pool.smtplib.SMTP', FakeSMTP)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reuses_connection(self):
+        pool = SMTPPool('localhost', 25, max_size=2)
+        for _ in range(5):
+            pool.send(object())
+        self.assertEqual(len(FakeSMTP.instances), 1)
+        self.assertEqual(pool.stats['messages_sent'], 5)
+
+    def test_recycles_after_max_messages(self):
+        pool = SMTPPool('localhost', 25, max_messages=2)
+        for _ in range(5):
+            pool.send(object())
+        self.assertEqual(len(FakeSMTP.instances), 3)
+        self.assertEqual(pool.stats['connections_recycled'], 2)
+
+    def test_reconnects_on_dropped_connection(self):
+        pool = SMTPPool('localhost', 25)
+        pool.send(object())
+        FakeSMTP.instances[0].fail_next = smtplib.SMTPServerDisconnected('gone')
+        pool.send(object())
+        self.assertEqual(len(FakeSMTP.instances), 2)
+        self.assertEqual(pool.stats['reconnects'], 1)
+
+    def test_recipient_rejection_keeps_connection(self):
+        pool = SMTPPool('localhost', 25)
+        pool.send(object())
+        FakeSMTP.instances[0].fail_next = smtplib.SMTPRecipientsRefused({})
+        with self.assertRaises(smtplib.SMTPRecipientsRefused):
+            pool.send(object())
+        pool.send(object())
+        self.assertEqual(len(FakeSMTP.instances), 1)
+
+    def test_stale_idle_connection_is_replaced(self):
+        pool = SMTPPool('localhost', 25, idle_check_seconds=0)
+        pool.send(object())
+        FakeSMTP.instances[0].closed = True
+        pool.send(object())
+        self.assertEqual(len(FakeSMTP.instances), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from flask import request
+from app import app, static_assets
+from static_assets import StaticAssets, IMMUTABLE, IMMUTABLE_PRIVATE
+
+
+class TestStaticAssets(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, 'css'))
+        with open(os.path.join(self.root, 'css', 'site.css'), 'w') as f:
+            f.write('body { color: red; }\n' * 50)
+        with open(os.path.join(self.root, 'index.html'), 'w') as f:
+            f.write('<link href="css/site.css"><link href="/css/site.css"><a href="https://x/css/site.css"></a>')
+        with open(os.path.join(self.root, '.hidden'), 'w') as f:
+            f.write('x')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_manifest_and_rewrite(self):
+        assets = StaticAssets(self.root).build()
+        css = assets.assets['css/site.css']
+        self.assertRegex(css.fingerprinted, r'^css/site\.[0-9a-f]{12}\.css$')
+        self.assertIn('gzip', css.variants)
+        self.assertEqual(gzip.decompress(css.variants['gzip']), css.body)
+        html = assets.assets['index.html'].body.decode()
+        self.assertIn(f'href="{css.fingerprinted}"', html)
+        self.assertIn(f'href="/{css.fingerprinted}"', html)
+        self.assertIn('https://x/css/site.css', html)
+        self.assertNotIn('.hidden', assets.assets)
+        self.assertEqual(assets.url_for('/css/site.css'), '/' + css.fingerprinted)
+        # pages are not reachable under a fingerprint
+        self.assertEqual(assets.lookup(assets.assets['index.html'].fingerprinted), (None, False))
+
+    def test_reload_picks_up_changes(self):
+        assets = StaticAssets(self.root, reload=True).build()
+        old = assets.assets['css/site.css']
+        path = os.path.join(self.root, 'css', 'site.css')
+        with open(path, 'w') as f:
+            f.write('body { color: blue; }')
+        os.utime(path, ns=(old.mtime_ns + 10 ** 9, old.mtime_ns + 10 ** 9))
+        fresh, immutable = assets.lookup(old.fingerprinted)
+        self.assertFalse(immutable)
+        self.assertEqual(fresh.body, b'body { color: blue; }')
+
+    def test_private_callers_keep_private_on_fingerprinted_urls(self):
+        assets = StaticAssets(self.root).build()
+        url = assets.assets['css/site.css'].fingerprinted
+        with app.test_request_context('/' + url):
+            self.assertEqual(assets.response(url, request, cache_control='private, no-cache').headers['Cache-Control'], IMMUTABLE_PRIVATE)
+            self.assertEqual(assets.response(url, request).headers['Cache-Control'], IMMUTABLE)
+
+    def test_debug_mode_is_checked_per_request(self):
+        assets = StaticAssets(self.root).build()
+        url = assets.assets['css/site.css'].fingerprinted
+        debug = app.debug
+        app.debug = True
+        try:
+            with app.test_request_context('/'):
+                self.assertFalse(assets.lookup(url)[1])
+        finally:
+            app.debug = debug
+        self.assertTrue(assets.lookup(url)[1])
+
+
+class StaticServingTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_fingerprinted_css_is_immutable_and_precompressed(self):
+        url = static_assets.url_for('style.css')
+        res = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers['Cache-Control'], IMMUTABLE)
+        self.assertEqual(res.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(res.get_data()), static_assets.assets['style.css'].body)
+
+    def test_pages_revalidate(self):
+        res = self.client.get('/checkin')
+        self.assertEqual(res.headers['Cache-Control'], 'no-cache')
+        self.assertIn(static_assets.url_for('style.css').encode(), res.get_data())
+        again = self.client.get('/checkin', headers={'If-None-Match': res.headers['ETag']})
+        self.assertEqual(again.status_code, 304)
+        # unknown paths still fall back to index.html
+        self.assertEqual(self.client.get('/no/such/page').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
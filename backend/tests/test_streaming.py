@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import app as app_module
+from app import app, passengers, save_passengers
+import streaming
+
+
+def failing_source():
+    yield {'i': 0}
+    raise ValueError('unterminated JSON array')
+
+
+class TestStreaming(unittest.TestCase):
+    def test_encoders_round_trip(self):
+        records = [{'i': i, 'name': 'x' * i} for i in range(50)]
+        body = ''.join(streaming.encode(iter(records), 'json', key='items', chunk_size=64))
+        self.assertEqual(json.loads(body), {'items': records})
+        body = ''.join(streaming.encode(iter(records), 'json', chunk_size=64))
+        self.assertEqual(json.loads(body), records)
+        self.assertEqual(''.join(streaming.encode(iter([]), 'json')), '[]')
+        lines = ''.join(streaming.encode(iter(records), 'ndjson', chunk_size=64)).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], records)
+
+    def test_failure_mid_stream_is_marked(self):
+        body = ''.join(streaming.encode(failing_source(), 'json'))
+        with self.assertRaises(ValueError):
+            json.loads(body)
+        self.assertIn('"_export_error"', body)
+        lines = ''.join(streaming.encode(failing_source(), 'ndjson')).splitlines()
+        self.assertIn(streaming.ERROR_KEY, json.loads(lines[-1]))
+        # prime() surfaces a source that fails before its first record
+        with self.assertRaises(ValueError):
+            streaming.prime(streaming.iter_file_array(__file__))
+        self.assertEqual(next(streaming.prime(failing_source())), {'i': 0})
+
+    def test_file_reader_small_buffer(self):
+        records = [{'a': 1, 'nested': {'s': 'v,]' * 20}}, 7, 12345.5, 'str', None, True, [1, [2]]]
+        fd, path = tempfile.mkstemp(suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(records, f, indent=2)
+            self.assertEqual(list(streaming.iter_file_array(path, read_size=7)), records)
+            with open(path, 'w') as f:
+                f.write('[{"a": 1}, {"a"')
+            with self.assertRaises(ValueError):
+                list(streaming.iter_file_array(path, read_size=4))
+        finally:
+            os.unlink(path)
+        self.assertEqual(list(streaming.iter_file_array(path)), [])
+
+
+class ExportApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+        self.added = [{'passport': f'EX{i:03d}', 'flight': 'EX-1', 'name': f'E{i}', 'checked_in': i == 0} for i in range(3)]
+        passengers.extend(self.added)
+        save_passengers(*self.added)
+
+    def tearDown(self):
+        passengers[:] = [p for p in passengers if p.get('flight') != 'EX-1']
+        save_passengers()
+
+    def test_export_passengers_ndjson(self):
+        res = self.client.get('/api/admin/export/passengers?format=ndjson&flight=EX-1&fields=passport', headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.is_streamed)
+        self.assertEqual(res.mimetype, 'application/x-ndjson')
+        rows = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+        self.assertEqual(rows, [{'passport': 'EX000'}, {'passport': 'EX001'}, {'passport': 'EX002'}])
+
+    def test_export_of_corrupt_events_is_not_a_complete_document(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'events.json')
+            with mock.patch.object(app_module, 'EVENTS_FILE', path):
+                with open(path, 'w') as f:
+                    f.write('{"not": "an array"}')
+                self.assertEqual(self.client.get('/api/admin/export/events', headers=self.headers).status_code, 500)
+                with open(path, 'w') as f:
+                    f.write('[{"type": "a"}, {"type"')
+                res = self.client.get('/api/admin/export/events', headers=self.headers)
+                body = res.get_data(as_text=True)
+        self.assertIn('_export_error', body)
+        with self.assertRaises(ValueError):
+            json.loads(body)
+
+    def test_export_bookings_and_events_json(self):
+        body = json.loads(self.client.get('/api/admin/export/bookings?flight=EX-1&checked_in=false', headers=self.headers).get_data())
+        self.assertEqual([b['passport'] for b in body], ['EX001', 'EX002'])
+        res = self.client.get('/api/admin/export/events', headers=self.headers)
+        self.assertIsInstance(json.loads(res.get_data()), list)
+        self.assertEqual(self.client.get('/api/admin/export/events?format=xml', headers=self.headers).status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/export/sessions', headers=self.headers).status_code, 404)
+        self.assertEqual(self.client.get('/api/admin/export/events').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import unittest
+from app import app, log_event
+from timeseries import RingSeries, TimeSeriesStore
+
+
+class TestRingSeries(unittest.TestCase):
+    def test_ring_wraps_and_clears_stale_slots(self):
+        ring = RingSeries(step=60, slots=5)
+        ring.add(0)
+        ring.add(30)
+        ring.add(130)
+        start, values = ring.window(now=250, points=5)
+        self.assertEqual(start, 0)
+        self.assertEqual(values, [2, 0, 1, 0, 0])
+        ring.add(300)  # reuses slot 0
+        start, values = ring.window(now=300, points=5)
+        self.assertEqual(start, 60)
+        self.assertEqual(values, [0, 1, 0, 0, 1])
+
+    def test_store_totals_and_per_flight(self):
+        store = TimeSeriesStore(resolutions=(('1m', 60, 10),))
+        store.record('checkins', 'F1', ts=600)
+        store.record('checkins', 'F2', ts=610)
+        store.record('checkins', None, ts=620)
+        self.assertEqual(store.query('checkins', resolution='1m', points=2, now=620)['values'], [0, 3])
+        self.assertEqual(store.query('checkins', 'F1', '1m', 1, now=620)['values'], [1])
+        self.assertEqual(store.query('verifies', 'F1', '1m', 3, now=620)['values'], [0, 0, 0])
+
+    def test_series_cap_keeps_totals(self):
+        store = TimeSeriesStore(resolutions=(('1s', 1, 4),), max_series=3)
+        for i in range(10):
+            store.record('checkins', f'F{i}', ts=1)
+        self.assertLessEqual(sum(len(v) for v in store.metrics().values()), 3)
+        self.assertEqual(store.query('checkins', resolution='1s', points=1, now=1)['values'], [10])
+
+
+class TimeseriesApiTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.headers = {'X-SESSION': res.get_json().get('token')}
+
+    def test_logged_events_show_up(self):
+        before = self.client.get('/api/admin/metrics/timeseries?metric=checkins&flight=TS-1&resolution=1s&points=5', headers=self.headers).get_json()
+        log_event({'type': 'checkin', 'passport': 'X', 'flight': 'TS-1'})
+        log_event({'type': 'boarding_action', 'flight': 'TS-1', 'action': 'mark_boarded'})
+        body = self.client.get('/api/admin/metrics/timeseries?flight=TS-1&resolution=1s&points=5', headers=self.headers).get_json()
+        self.assertEqual(sum(body['series']['checkins']) - sum(before['series']['checkins']), 1)
+        self.assertEqual(sum(body['series']['boardings']), 1)
+        self.assertEqual(len(body['series']['verifies']), 5)
+        res = self.client.get('/api/admin/metrics/timeseries?resolution=5m', headers=self.headers)
+        self.assertEqual(res.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
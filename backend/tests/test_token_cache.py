@@ -0,0 +1,91 @@
+import json
+import os
+import time
+import unittest
+import jwt
+import app as app_module
+import security_utils
+from security_utils import SecurityManager, TokenCache
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.sm = SecurityManager()
+        self.original_secret = security_utils.SECRET_KEY
+
+    def tearDown(self):
+        self.sm.rotate_secret(self.original_secret)
+
+    def test_second_verify_is_a_hit(self):
+        token, _ = self.sm.generate_token({'user_id': 'u1', 'role': 'admin'})
+        ok, data = self.sm.verify_token(token)
+        self.assertTrue(ok)
+        ok, again = self.sm.verify_token(token)
+        self.assertTrue(ok)
+        self.assertEqual(again['role'], 'admin')
+        stats = self.sm.token_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_entry_bounded_by_exp(self):
+        cache = TokenCache(max_entries=10, max_ttl=300)
+        cache.put('t', {'exp': time.time() - 1})
+        self.assertIsNone(cache.get('t'))
+        cache.put('t', {'exp': time.time() + 0.05})
+        self.assertIsNotNone(cache.get('t'))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('t'))
+
+    def test_lru_eviction(self):
+        cache = TokenCache(max_entries=2)
+        cache.put('a', {})
+        cache.put('b', {})
+        cache.get('a')
+        cache.put('c', {})
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+
+    def test_rotation_invalidates_cached_tokens(self):
+        token, _ = self.sm.generate_token({'user_id': 'u1', 'role': 'admin'})
+        self.assertTrue(self.sm.verify_token(token)[0])
+        self.sm.rotate_secret('a-brand-new-secret')
+        self.assertEqual(self.sm.verify_token(token), (False, 'Invalid token'))
+
+    def test_tampered_token_not_served_from_cache(self):
+        token, _ = self.sm.generate_token({'user_id': 'u1', 'role': 'staff'})
+        self.sm.verify_token(token)
+        forged = jwt.encode({'user_id': 'u1', 'role': 'admin'}, 'wrong', algorithm='HS256')
+        self.assertFalse(self.sm.verify_token(forged)[0])
+
+
+class SessionCacheTests(unittest.TestCase):
+    def setUp(self):
+        os.environ['MASTER_ACCESS'] = 'testmaster'
+        self.client = app_module.app.test_client()
+        res = self.client.post('/api/login', json={'role': 'admin', 'password': 'testmaster'})
+        self.token = res.get_json()['token']
+        self.headers = {'X-SESSION': self.token}
+
+    def test_repeat_requests_hit_the_cache(self):
+        self.client.get('/api/admin/auth/metrics', headers=self.headers)
+        before = app_module.session_cache.stats()['hits']
+        body = self.client.get('/api/admin/auth/metrics', headers=self.headers).get_json()
+        self.assertGreater(body['session_cache']['hits'], before)
+
+    def test_logout_drops_cached_session(self):
+        self.assertEqual(self.client.get('/api/admin/auth/metrics', headers=self.headers).status_code, 200)
+        self.client.post('/api/logout', headers=self.headers)
+        self.assertEqual(self.client.get('/api/admin/auth/metrics', headers=self.headers).status_code, 401)
+
+    def test_external_edit_to_sessions_file_invalidates(self):
+        self.assertEqual(self.client.get('/api/admin/auth/metrics', headers=self.headers).status_code, 200)
+        # another worker revokes the session by rewriting sessions.json
+        with open(app_module.SESSIONS_FILE) as f:
+            sessions = json.load(f)
+        sessions.pop(self.token)
+        with open(app_module.SESSIONS_FILE, 'w') as f:
+            json.dump(sessions, f)
+        self.assertEqual(self.client.get('/api/admin/auth/metrics', headers=self.headers).status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""In-process throughput time series on fixed-size ring buffers.
+
+Each (metric, flight) pair keeps one ring per resolution. A ring is two
+parallel arrays of `slots` entries: the bucket number each slot currently
+holds and its count. Recording is O(1): find the slot for the bucket, reset
+it if it still holds an older bucket, add. Memory per series is fixed no
+matter how long the process runs.
+
+Default resolutions:
+
+    1s  x 600   last 10 minutes
+    1m  x 1440  last 24 hours
+    1h  x 168   last 7 days
+
+Every event is also counted under the '*' flight so totals need no summing.
+"""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+ALL = '*'
+DEFAULT_RESOLUTIONS = (('1s', 1, 600), ('1m', 60, 1440), ('1h', 3600, 168))
+
+
+class RingSeries:
+    def __init__(self, step: int, slots: int):
+        self.step = step
+        self.slots = slots
+        self._buckets = array('q', [-1]) * slots
+        self._counts = array('q', [0]) * slots
+
+    def add(self, ts: float, n: int = 1):
+        bucket = int(ts // self.step)
+        pos = bucket % self.slots
+        if self._buckets[pos] != bucket:
+            self._buckets[pos] = bucket
+            self._counts[pos] = 0
+        self._counts[pos] += n
+
+    def window(self, now: float, points: int):
+        """(start_epoch, counts) for the last `points` buckets up to now, oldest first."""
+        points = max(1, min(points, self.slots))
+        last = int(now // self.step)
+        first = last - points + 1
+        values = []
+        for bucket in range(first, last + 1):
+            pos = bucket % self.slots
+            values.append(self._counts[pos] if self._buckets[pos] == bucket else 0)
+        return first * self.step, values
+
+
+class TimeSeriesStore:
+    def __init__(self, resolutions=DEFAULT_RESOLUTIONS, max_series: int = 2000):
+        self.resolutions = {name: (step, slots) for name, step, slots in resolutions}
+        self.max_series = max_series
+        self._series = OrderedDict()   # (metric, flight) -> {resolution: RingSeries}
+        self._lock = threading.Lock()
+
+    def _get(self, metric, flight):
+        key = (metric, flight)
+        series = self._series.get(key)
+        if series is None:
+            series = {name: RingSeries(step, slots) for name, (step, slots) in self.resolutions.items()}
+            self._series[key] = series
+            while len(self._series) > self.max_series:
+                # drop the least recently updated per-flight series; '*' totals are kept
+                victim = next((k for k in self._series if k[1] != ALL), None)
+                if victim is None:
+                    break
+                del self._series[victim]
+        else:
+            self._series.move_to_end(key)
+        return series
+
+    def record(self, metric: str, flight: str = None, n: int = 1, ts: float = None):
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            keys = [ALL] if not flight else [ALL, flight]
+            for f in keys:
+                for ring in self._get(metric, f).values():
+                    ring.add(ts, n)
+
+    def query(self, metric: str, flight: str = None, resolution: str = '1m', points: int = 60, now: float = None):
+        """{'start', 'step', 'values'} for one series; values are zeros if nothing was recorded."""
+        if resolution not in self.resolutions:
+            raise KeyError(resolution)
+        now = time.time() if now is None else now
+        step, _slots = self.resolutions[resolution]
+        with self._lock:
+            series = self._series.get((metric, flight or ALL))
+            if series is None:
+                points = max(1, min(points, _slots))
+                start = (int(now // step) - points + 1) * step
+                return {'start': start, 'step': step, 'values': [0] * points}
+            start, values = series[resolution].window(now, points)
+        return {'start': start, 'step': step, 'values': values}
+
+    def metrics(self):
+        with self._lock:
+            out = {}
+            for metric, flight in self._series:
+                out.setdefault(metric, []).append(flight)
+            return out
@@ -1,11 +1,26 @@
 #!/usr/bin/env python3
-"""RQ worker tasks for the Intelligent Airport check-in system.
+"""Background worker for the Intelligent Airport check-in system.
 
-This module exposes functions that the RQ worker will import and execute.
-It keeps tasks minimal and re-uses the server's send function where possible.
+Drains the durable SQLite job queue (jobqueue.py) with a fixed-size worker
+pool. Run the web app with JOBS_INPROCESS=0 when using a separate worker so
+jobs are only processed here. Redis/RQ remains available as an optional
+backend with --rq.
+
+    python worker.py                  # SQLite queue, JOBS_WORKERS threads (default 2)
+    python worker.py --workers 8
+    python worker.py --rq             # RQ worker on REDIS_URL, 'default' queue
+    python worker.py --stats          # job counts per status
+    python worker.py --dead           # list dead-lettered jobs
+    python worker.py --requeue JOB_ID
+    python worker.py --purge          # delete completed jobs older than JOBS_PURGE_AFTER (default 1 day)
+    python worker.py --send PASSPORT  # dev/debug: send one boarding pass now
 """
+import argparse
+import json
 import os
+import signal
 import sys
+import threading
 from pathlib import Path
 
 # Ensure backend package imports work when run inside container or locally
@@ -13,27 +28,61 @@ ROOT = Path(__file__).resolve().parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app import send_boarding_pass_email  # re-use existing function
+# This process is the worker; keep the app from starting its own in-process pool
+os.environ.setdefault('JOBS_INPROCESS', '0')
 
+import app  # noqa: E402
+from jobqueue import WorkerPool  # noqa: E402
 
-def enqueue_send_boarding_pass(passport: str, email: str = None):
-    """Wrapper task to call the send_boarding_pass_email function from the app.
-    RQ will execute this function with provided args.
-    """
-    # send_boarding_pass_email may expect more context; call defensively
-    try:
-        send_boarding_pass_email(passport, email=email)
-    except TypeError:
-        # older signature: send_boarding_pass_email(passport)
-        send_boarding_pass_email(passport)
 
+def run_rq():
+    import redis
+    from rq import Queue, Worker
+    conn = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    Worker([Queue('default', connection=conn)], connection=conn).work()
 
-if __name__ == '__main__':
-    # Convenience: allow running a single task from CLI for dev/debug
-    if len(sys.argv) >= 2:
-        passport = sys.argv[1]
-        email = sys.argv[2] if len(sys.argv) >= 3 else None
-        print(f"Running enqueue_send_boarding_pass(passport={passport}, email={email})")
-        enqueue_send_boarding_pass(passport, email)
+
+def run_local(workers):
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    pool = WorkerPool(app.job_queue, workers=workers, purge_after=float(os.getenv('JOBS_PURGE_AFTER') or 86400)).start()
+    print(f"worker {pool.name}: {workers} threads on {app.job_queue.path}")
+    stop.wait()
+    pool.stop()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Background job worker')
+    ap.add_argument('--workers', type=int, default=int(os.getenv('JOBS_WORKERS') or 2))
+    ap.add_argument('--rq', action='store_true', help='run an RQ worker instead of the SQLite queue')
+    ap.add_argument('--stats', action='store_true')
+    ap.add_argument('--dead', action='store_true')
+    ap.add_argument('--requeue', metavar='JOB_ID')
+    ap.add_argument('--purge', action='store_true')
+    ap.add_argument('--send', metavar='PASSPORT')
+    args = ap.parse_args(argv)
+
+    if args.stats:
+        print(json.dumps(app.job_queue.stats(), indent=2))
+    elif args.dead:
+        print(json.dumps(app.job_queue.dead_letters(), indent=2))
+    elif args.requeue:
+        print('requeued' if app.job_queue.requeue(args.requeue) else 'not found')
+    elif args.purge:
+        print(f"purged {app.job_queue.purge(float(os.getenv('JOBS_PURGE_AFTER') or 86400))} jobs")
+    elif args.send:
+        passenger = next((p for p in app.passengers if p.get('passport') == args.send), None)
+        if not passenger:
+            print(f"passenger {args.send} not found")
+            return 1
+        app.send_boarding_email_job(passenger)
+    elif args.rq:
+        run_rq()
     else:
-        print("This script is intended to be used by RQ workers or invoked with a passport argument.")
+        run_local(args.workers)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())